@@ -0,0 +1,61 @@
+# Gunicorn ayarları (Procfile ve nixpacks.toml: `gunicorn -c gunicorn.conf.py`)
+# Tüm değerler ortam değişkenleriyle değiştirilebilir.
+#
+# Sıfır kesintili yeniden yükleme: `kill -HUP <master pid>` yeni işçileri başlatır, eskiler
+# ellerindeki istekleri GUNICORN_GRACEFUL_TIMEOUT süresi içinde bitirip kapanır.
+import multiprocessing
+import os
+
+# ASGI (varsayılan): her işçi bir olay döngüsü çalıştırır, okuma sorguları async görünümde işlenir.
+# WSGI için GUNICORN_WORKER_CLASS=gthread verilir; istekler GUNICORN_THREADS iş parçacığında işlenir.
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'uvicorn_worker.UvicornWorker')
+wsgi_app = 'yemeksepeti_clone.wsgi:application' if worker_class in ('sync', 'gthread') else 'yemeksepeti_clone.asgi:application'
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+
+# Önbellek sürümleri, yanıt önbelleği, yetkiler, kayıtlı sorgular ve otomatik tamamlama/konum günlükleri
+# önbellekte tutulur. Paylaşılan önbellek (CACHE_URL=redis://...) yoksa her işçi kendi kopyasını görür ve
+# bir işçideki yazma diğerlerinde eski veri bırakır; bu durumda tek işçi çalıştırılır.
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yemeksepeti_clone.settings')
+from yemeksepeti_clone.cache import is_shared_cache  # noqa: E402
+
+shared_cache = is_shared_cache()
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1 if shared_cache else 1))
+if workers > 1 and not shared_cache:
+    raise RuntimeError(
+        f"WEB_CONCURRENCY={workers} için paylaşılan bir önbellek gerekir (ör. CACHE_URL=redis://localhost:6379/1); "
+        "işlem içi önbellekle sadece tek işçi çalıştırılabilir."
+    )
+threads = int(os.environ.get('GUNICORN_THREADS', 4))  # sadece gthread
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 1000))
+
+# Uygulama master işlemde bir kez yüklenir; işçiler fork ile kopyalanır ve belleği (copy-on-write) paylaşır
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'true').lower() == 'true'
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))  # bu süreden uzun cevap vermeyen işçi yeniden başlatılır
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+# Bellek sızıntılarına karşı işçiler belirli sayıda istekten sonra sırayla yenilenir
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 10000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 1000))
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG') or None
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+forwarded_allow_ips = os.environ.get('FORWARDED_ALLOW_IPS', '127.0.0.1')
+
+
+# preload sırasında açılmış bir veritabanı bağlantısı varsa işçiler arasında paylaşılmaması için kapatılır
+def post_fork(server, worker):
+    from django.db import connections
+    connections.close_all()
+
+
+# Bellekteki yapılar ilk istekten önce yüklenir: otomatik tamamlama ağacı (anlık görüntüden, yoksa
+# veritabanından) ve konum indeksi
+def post_worker_init(worker):
+    from restaurants import geo
+    from search import autocomplete
+    autocomplete.warm()
+    geo.warm()
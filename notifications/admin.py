@@ -0,0 +1,8 @@
+from django.contrib import admin
+from .models import EmailJob
+
+@admin.register(EmailJob)
+class EmailJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'subject', 'status', 'attempts', 'available_at', 'sent_at', 'created_at')
+    list_filter = ('status', 'created_at')
+    search_fields = ('subject', 'recipients')
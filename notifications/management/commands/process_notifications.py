@@ -0,0 +1,32 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from notifications.queue import process_batch, queue_metrics
+
+
+class Command(BaseCommand):
+    help = "E-posta kuyruğunu işler (harici bir broker gerektirmez)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Kuyruk boşalınca çık")
+        parser.add_argument('--batch-size', type=int, default=settings.NOTIFICATION_BATCH_SIZE)
+        parser.add_argument('--interval', type=float, default=settings.NOTIFICATION_POLL_INTERVAL, help="Kuyruk boşken bekleme süresi (saniye)")
+        parser.add_argument('--metrics-every', type=float, default=60.0, help="Metriklerin yazdırılma aralığı (saniye)")
+
+    def handle(self, *args, **options):
+        last_metrics = 0.0
+        while True:
+            sent, failed = process_batch(options['batch_size'])
+            if sent or failed:
+                self.stdout.write(f"{len(sent)} gönderildi, {len(failed)} başarısız")
+                for job, error in failed:
+                    self.stderr.write(f"  #{job.pk} ({job.attempts}. deneme, {job.status}): {error}")
+
+            if time.monotonic() - last_metrics >= options['metrics_every']:
+                self.stdout.write(f"kuyruk: {queue_metrics()}")
+                last_metrics = time.monotonic()
+
+            if not sent and not failed:
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
@@ -0,0 +1,38 @@
+from django.db import models
+from django.utils import timezone
+
+
+# Gönderilecek e-postalar için kalıcı iş kuyruğu; `process_notifications` komutu tarafından işlenir
+class EmailJob(models.Model):
+    PENDING = 'pending'
+    SENDING = 'sending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Bekliyor'),
+        (SENDING, 'Gönderiliyor'),
+        (SENT, 'Gönderildi'),
+        (FAILED, 'Başarısız'),
+    ]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=255)
+    recipients = models.JSONField()  # Alıcı e-posta adresleri listesi
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    available_at = models.DateTimeField(default=timezone.now)  # Tekrar denemeler bu zamandan sonra alınır
+    locked_at = models.DateTimeField(null=True, blank=True)  # İşçi tarafından alındığı zaman
+    sent_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # İşçi sıradaki işleri (status, available_at) ile seçer
+            models.Index(fields=['status', 'available_at'], name='emailjob_status_available_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.subject} -> {", ".join(self.recipients)} ({self.status})'
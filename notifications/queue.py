@@ -0,0 +1,97 @@
+import statistics
+from datetime import timedelta
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Min, Q
+from django.utils import timezone
+from notifications.models import EmailJob
+
+
+# İstek içinden çağrılır: e-posta sadece kuyruğa yazılır, gönderim işçi tarafından yapılır.
+# Çağıranın transaction'ı geri alınırsa iş de kuyruğa girmez.
+def enqueue_email(subject, body, recipients, from_email=None):
+    return EmailJob.objects.create(
+        subject=subject,
+        body=body,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        recipients=list(recipients),
+    )
+
+
+def retry_delay(attempts):
+    return min(settings.NOTIFICATION_RETRY_BACKOFF * 2 ** (attempts - 1), settings.NOTIFICATION_RETRY_BACKOFF_MAX)
+
+
+# Sıradaki işleri kilitleyip 'sending' olarak işaretler; başka işçiler aynı işleri almaz.
+# Uzun süre 'sending' kalan işler (işçi çöktüyse) tekrar alınır.
+def claim_batch(batch_size):
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.NOTIFICATION_LOCK_TIMEOUT)
+    with transaction.atomic():
+        jobs = list(
+            EmailJob.objects.select_for_update(skip_locked=True)
+            .filter(Q(status=EmailJob.PENDING, available_at__lte=now) | Q(status=EmailJob.SENDING, locked_at__lt=stale))
+            .order_by('available_at', 'id')[:batch_size]
+        )
+        EmailJob.objects.filter(pk__in=[job.pk for job in jobs]).update(status=EmailJob.SENDING, locked_at=now)
+    return jobs
+
+
+# Bir grup iş tek SMTP bağlantısı üzerinden gönderilir
+def send_batch(jobs):
+    sent, failed = [], []
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as e:
+        # Bağlantı açılamazsa gruptaki tüm işler tekrar denenecek
+        failed = [(job, e) for job in jobs]
+    else:
+        try:
+            for job in jobs:
+                message = EmailMessage(job.subject, job.body, job.from_email, job.recipients, connection=connection)
+                try:
+                    message.send()
+                    sent.append(job)
+                except Exception as e:
+                    failed.append((job, e))
+        finally:
+            connection.close()
+
+    now = timezone.now()
+    EmailJob.objects.filter(pk__in=[job.pk for job in sent]).update(status=EmailJob.SENT, sent_at=now, locked_at=None)
+    for job, error in failed:
+        job.attempts += 1
+        job.last_error = str(error)
+        job.locked_at = None
+        if job.attempts >= settings.NOTIFICATION_MAX_ATTEMPTS:
+            job.status = EmailJob.FAILED
+        else:
+            job.status = EmailJob.PENDING
+            job.available_at = now + timedelta(seconds=retry_delay(job.attempts))
+        job.save(update_fields=['attempts', 'last_error', 'locked_at', 'status', 'available_at', 'updated_at'])
+    return sent, failed
+
+
+def process_batch(batch_size=None):
+    jobs = claim_batch(batch_size or settings.NOTIFICATION_BATCH_SIZE)
+    if not jobs:
+        return [], []
+    return send_batch(jobs)
+
+
+# Kuyruk derinliği ve son gönderimlerin teslim gecikmesi (saniye)
+def queue_metrics(window=500):
+    now = timezone.now()
+    pending = EmailJob.objects.filter(status__in=[EmailJob.PENDING, EmailJob.SENDING])
+    oldest = pending.aggregate(oldest=Min('created_at'))['oldest']
+    recent = EmailJob.objects.filter(status=EmailJob.SENT).order_by('-sent_at').values_list('created_at', 'sent_at')[:window]
+    latencies = sorted((sent_at - created_at).total_seconds() for created_at, sent_at in recent)
+    return {
+        'depth': pending.count(),
+        'failed': EmailJob.objects.filter(status=EmailJob.FAILED).count(),
+        'oldest_pending_seconds': (now - oldest).total_seconds() if oldest else 0.0,
+        'delivery_p50_seconds': statistics.median(latencies) if latencies else 0.0,
+        'delivery_max_seconds': latencies[-1] if latencies else 0.0,
+    }
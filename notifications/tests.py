@@ -0,0 +1,67 @@
+from datetime import timedelta
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from notifications.models import EmailJob
+from notifications.queue import enqueue_email, process_batch, queue_metrics
+from users.models import User
+
+
+# Açılan bağlantıları sayar; 'hata@' ile başlayan alıcılar için gönderim hatası verir
+class CountingBackend(EmailBackend):
+    opened = 0
+
+    def open(self):
+        CountingBackend.opened += 1
+        return True
+
+    def send_messages(self, messages):
+        if any(address.startswith('hata@') for message in messages for address in message.to):
+            raise ConnectionError("SMTP hatası")
+        return super().send_messages(messages)
+
+
+@override_settings(EMAIL_BACKEND='notifications.tests.CountingBackend', NOTIFICATION_MAX_ATTEMPTS=2, NOTIFICATION_RETRY_BACKOFF=60)
+class EmailQueueTestCase(TestCase):
+    def setUp(self):
+        CountingBackend.opened = 0
+
+    def test_batch_is_sent_over_one_connection(self):
+        """Kuyruktaki e-postalar tek bağlantı üzerinden toplu gönderilmeli"""
+        for i in range(5):
+            enqueue_email(f"Konu {i}", "İçerik", [f"kisi{i}@example.com"])
+        self.assertEqual(len(mail.outbox), 0)
+
+        sent, failed = process_batch()
+        self.assertEqual((len(sent), len(failed)), (5, 0))
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(CountingBackend.opened, 1)
+        self.assertEqual(EmailJob.objects.filter(status=EmailJob.SENT).count(), 5)
+        self.assertEqual(queue_metrics()['depth'], 0)
+
+    def test_failed_job_is_retried_with_backoff(self):
+        """Başarısız gönderim ileri bir zamana ertelenmeli, deneme hakkı bitince 'failed' olmalı"""
+        job = enqueue_email("Konu", "İçerik", ["hata@example.com"])
+        process_batch()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (EmailJob.PENDING, 1))
+        self.assertGreater(job.available_at, timezone.now() + timedelta(seconds=30))
+
+        self.assertEqual(process_batch(), ([], []))  # Bekleme süresi dolmadan tekrar alınmaz
+
+        EmailJob.objects.filter(pk=job.pk).update(available_at=timezone.now())
+        process_batch()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (EmailJob.FAILED, 2))
+        self.assertEqual(queue_metrics()['failed'], 1)
+
+
+class PasswordResetQueueTestCase(TestCase):
+    def test_password_reset_enqueues_email(self):
+        """Şifre sıfırlama e-postası istek içinde gönderilmemeli, kuyruğa yazılmalı"""
+        User.objects.create_user(email="musteri@example.com", password="Parola123!", firstName="Ali", lastName="Veli")
+        response = self.client.post('/users/password-reset/', {'contact_method': 'email', 'email': "musteri@example.com"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(EmailJob.objects.get().recipients, ["musteri@example.com"])
@@ -0,0 +1,102 @@
+import random
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from orders.models import Order, OrderItem, Cart, CartItem
+from restaurants.models import Restaurant, MenuItem, MenuItemCategory
+from users.models import User
+
+BENCH_EMAIL = 'bench-{}@example.com'
+
+
+class Command(BaseCommand):
+    # Karşılaştırma için index'ler olmadan: `migrate orders 0006 && migrate restaurants 0008 && migrate users 0007`
+    help = "Sıcak sorguların planlarını (EXPLAIN) ve sürelerini gösterir; --seed ile test verisi üretir."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', action='store_true', help="Önce benchmark verisi oluştur")
+        parser.add_argument('--orders', type=int, default=1_000_000, help="Oluşturulacak sipariş sayısı")
+        parser.add_argument('--users', type=int, default=10_000, help="Siparişlerin dağıtılacağı kullanıcı sayısı")
+        parser.add_argument('--batch-size', type=int, default=10_000)
+        parser.add_argument('--repeat', type=int, default=100, help="Her sorgunun kaç kez çalıştırılacağı")
+
+    def handle(self, *args, **options):
+        if options['seed']:
+            self.seed(options['orders'], options['users'], options['batch_size'])
+
+        user = User.objects.filter(email=BENCH_EMAIL.format(0)).first()
+        if user is None:
+            raise Exception("Benchmark verisi bulunamadı, önce --seed ile çalıştırın.")
+        order_item = OrderItem.objects.filter(order__user=user).first()
+        cart_item = CartItem.objects.filter(cart__user=user).select_related('product').first()
+        restaurant = Restaurant.objects.filter(name='Bench Restoran 0').first()
+
+        # (açıklama, queryset, beklenen index adları); SQLite unique kısıtlara kendi adını verir
+        queries = [
+            ("Kullanıcının siparişleri (tarihe göre)", Order.objects.filter(user=user).order_by('-created_at', '-id')[:20], ('order_user_created_idx',)),
+            ("Sipariş öğesi (pk + kullanıcı)", OrderItem.objects.filter(pk=order_item.pk, order__user=user), None),
+            ("Sepet öğesi (pk + kullanıcı)", CartItem.objects.filter(pk=cart_item.pk, cart__user=user), None),
+            ("Sepette ürün (cart, product)", CartItem.objects.filter(cart_id=cart_item.cart_id, product_id=cart_item.product_id), ('unique_cart_product', 'sqlite_autoindex_orders_cartitem')),
+            ("Restoran menüsü (kategoriye göre)", MenuItem.objects.filter(restaurant=restaurant).order_by('category'), ('menuitem_rest_category_idx',)),
+            ("Telefon ile kullanıcı", User.objects.filter(phone_number=user.phone_number), ('user_phone_number_idx',)),
+        ]
+        for label, queryset, index_names in queries:
+            plan = queryset.explain()
+            started = time.perf_counter()
+            for _ in range(options['repeat']):
+                list(queryset.all())
+            elapsed_ms = (time.perf_counter() - started) * 1000 / options['repeat']
+            if index_names is None:
+                verdict = "PK"
+            else:
+                verdict = "INDEX" if any(name in plan for name in index_names) else "SCAN?"
+            self.stdout.write(f"[{verdict}] {label}: {elapsed_ms:.3f} ms")
+            self.stdout.write(f"    {plan}".replace('\n', '\n    '))
+
+    # MySQL bulk_create sonrası birincil anahtarları döndürmez; kayıtlar her adımda yeniden okunur
+    def seed(self, order_count, user_count, batch_size):
+        self.stdout.write(f"{user_count} kullanıcı ve {order_count} sipariş oluşturuluyor ({connection.vendor})...")
+        with transaction.atomic():
+            category = MenuItemCategory.objects.create(name='Bench Kategori')
+            Restaurant.objects.bulk_create(
+                Restaurant(name=f'Bench Restoran {i}', address='Adres', phone='5550000000') for i in range(100)
+            )
+            restaurants = Restaurant.objects.filter(name__startswith='Bench Restoran ')
+            MenuItem.objects.bulk_create(
+                MenuItem(restaurant=restaurant, category=category, name=f'Yemek {j}', price=10 + j)
+                for restaurant in restaurants for j in range(20)
+            )
+            menu_items = list(MenuItem.objects.filter(category=category).only('id', 'price'))
+            User.objects.bulk_create(
+                (
+                    User(email=BENCH_EMAIL.format(i), firstName='Bench', lastName=str(i), phone_number=f'5{i:09d}')
+                    for i in range(user_count)
+                ),
+                batch_size=batch_size,
+            )
+            user_ids = list(User.objects.filter(email__startswith='bench-').order_by('id').values_list('id', flat=True))
+            Cart.objects.bulk_create((Cart(user_id=user_id) for user_id in user_ids), batch_size=batch_size)
+            cart_ids = Cart.objects.filter(user_id__in=user_ids).values_list('id', flat=True).iterator()
+            CartItem.objects.bulk_create(
+                (
+                    CartItem(cart_id=cart_id, product=product, quantity=1, price=product.price)
+                    for cart_id in cart_ids for product in random.sample(menu_items, 3)
+                ),
+                batch_size=batch_size,
+            )
+            Cart.refresh_totals(*Cart.objects.filter(user_id__in=user_ids).values_list('id', flat=True))
+
+        # Siparişler parça parça eklenir; save() çağrılmadığından toplamlar doğrudan yazılır
+        last_id = Order.objects.order_by('-id').values_list('id', flat=True).first() or 0
+        for start in range(0, order_count, batch_size):
+            with transaction.atomic():
+                Order.objects.bulk_create(
+                    Order(user_id=user_ids[i % len(user_ids)], total_price=20)
+                    for i in range(start, min(start + batch_size, order_count))
+                )
+                order_ids = list(Order.objects.filter(pk__gt=last_id).order_by('id').values_list('id', flat=True))
+                OrderItem.objects.bulk_create(
+                    OrderItem(order_id=order_id, product_name='Yemek', quantity=2, price=10) for order_id in order_ids[::100]
+                )
+            last_id = order_ids[-1]
+            self.stdout.write(f"  {min(start + batch_size, order_count)}/{order_count}")
@@ -0,0 +1,38 @@
+# Generated by Django 5.1 on 2026-10-18 10:36
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+# Kısıt eklenmeden önce aynı sepetteki aynı ürünün tekrarlanan satırları tek satırda birleştirilir
+def merge_duplicate_cart_items(apps, schema_editor):
+    CartItem = apps.get_model('orders', 'CartItem')
+    duplicates = (
+        CartItem.objects.values('cart_id', 'product_id')
+        .annotate(rows=Count('id'), total_quantity=Sum('quantity'))
+        .filter(rows__gt=1)
+    )
+    for duplicate in duplicates:
+        items = list(CartItem.objects.filter(cart_id=duplicate['cart_id'], product_id=duplicate['product_id']).order_by('id'))
+        keep = items[0]
+        unit_price = keep.price / keep.quantity if keep.quantity else 0
+        keep.quantity = duplicate['total_quantity']
+        keep.price = unit_price * keep.quantity
+        keep.save(update_fields=['quantity', 'price'])
+        CartItem.objects.filter(pk__in=[item.pk for item in items[1:]]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0004_rename_createdat_cart_created_at_and_more'),
+        ('restaurants', '0008_rename_createdat_menuitem_created_at_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_cart_items, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='cartitem',
+            constraint=models.UniqueConstraint(fields=('cart', 'product'), name='unique_cart_product'),
+        ),
+    ]
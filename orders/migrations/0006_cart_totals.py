@@ -0,0 +1,38 @@
+# Generated by Django 5.1 on 2026-10-18 10:39
+
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+# Mevcut sepetlerin toplamları satırlardan doldurulur (geçmiş sipariş toplamlarına dokunulmaz)
+def backfill_cart_totals(apps, schema_editor):
+    Cart = apps.get_model('orders', 'Cart')
+    CartItem = apps.get_model('orders', 'CartItem')
+    for row in CartItem.objects.values('cart_id').annotate(total=Sum('price'), item_count=Sum('quantity')):
+        Cart.objects.filter(pk=row['cart_id']).update(total=row['total'] or 0, item_count=row['item_count'] or 0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0005_cartitem_unique_cart_product'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cart',
+            name='item_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='cart',
+            name='total',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10),
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='total_price',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10),
+        ),
+        migrations.RunPython(backfill_cart_totals, migrations.RunPython.noop),
+    ]
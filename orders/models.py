@@ -1,21 +1,48 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Sum
 from users.models import User  # Kullanıcı modelini kullanmak için import
 from restaurants.models import MenuItem  # MenuItem modelini doğru yerden import
 
 
+# Veritabanından okunan değerleri saklar; kaydetme/silme sırasında toplamlara uygulanacak fark buradan hesaplanır
+class LoadedValuesMixin:
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def get_loaded_values(self, *field_names):
+        if self._state.adding:
+            return {name: 0 for name in field_names}
+        loaded = getattr(self, '_loaded_values', {})
+        if any(name not in loaded or loaded[name] is models.DEFERRED for name in field_names):
+            loaded = type(self).objects.filter(pk=self.pk).values(*field_names).first() or {name: 0 for name in field_names}
+        return {name: loaded[name] for name in field_names}
+
+    def set_loaded_values(self, *field_names):
+        self._loaded_values = {name: getattr(self, name) for name in field_names}
+
+
 # Sipariş Modeli
 class Order(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
-    total_price = models.DecimalField(max_digits=10, decimal_places=2)
+    total_price = models.DecimalField(max_digits=10, decimal_places=2, default=0)  # Sipariş öğeleri değiştikçe güncellenir
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Kullanıcının siparişleri tarihe göre (keyset: created_at, id) sayfalanır
+            models.Index(fields=['user', 'created_at', 'id'], name='order_user_created_idx'),
+        ]
+
     def __str__(self):
         return f'Order {self.id} by {self.user.email}'
 
 
 # Sipariş Öğesi Modeli
-class OrderItem(models.Model):
+class OrderItem(LoadedValuesMixin, models.Model):
     order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='items')
     product_name = models.CharField(max_length=255)
     quantity = models.PositiveIntegerField()
@@ -26,32 +53,85 @@ class OrderItem(models.Model):
     def __str__(self):
         return f'{self.product_name} x {self.quantity}'
 
+    # Sipariş toplamı, satırın eski ve yeni tutarı arasındaki fark kadar güncellenir
+    def save(self, *args, **kwargs):
+        old = self.get_loaded_values('price', 'quantity')
+        delta = self.price * self.quantity - old['price'] * old['quantity']
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if delta:
+                Order.objects.filter(pk=self.order_id).update(total_price=F('total_price') + delta)
+        self.set_loaded_values('price', 'quantity')
+
+    def delete(self, *args, **kwargs):
+        old = self.get_loaded_values('price', 'quantity')
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            Order.objects.filter(pk=self.order_id).update(total_price=F('total_price') - old['price'] * old['quantity'])
+        return result
+
 
 # Sepet Modeli
 class Cart(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
+    total = models.DecimalField(max_digits=10, decimal_places=2, default=0)  # Sepet öğeleri değiştikçe güncellenir
+    item_count = models.PositiveIntegerField(default=0)  # Sepetteki toplam ürün adedi
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f'Cart for {self.user.email}'
 
+    # Toplu işlemlerden (bulk_create/bulk_update/queryset.delete) sonra toplamlar satırlardan yeniden hesaplanır
+    @classmethod
+    def refresh_totals(cls, *cart_ids):
+        totals = {
+            row['cart']: row
+            for row in CartItem.objects.filter(cart__in=cart_ids).values('cart').annotate(total=Sum('price'), item_count=Sum('quantity'))
+        }
+        for cart_id in cart_ids:
+            row = totals.get(cart_id, {})
+            cls.objects.filter(pk=cart_id).update(total=row.get('total') or 0, item_count=row.get('item_count') or 0)
+
+    # Tek satırlık değişikliklerde toplamlar sadece fark kadar artırılır/azaltılır
+    @classmethod
+    def apply_delta(cls, cart_id, total, item_count):
+        if total or item_count:
+            cls.objects.filter(pk=cart_id).update(total=F('total') + total, item_count=F('item_count') + item_count)
+
 
 # Sepet Öğesi Modeli
-class CartItem(models.Model):
+class CartItem(LoadedValuesMixin, models.Model):
     cart = models.ForeignKey(Cart, on_delete=models.CASCADE, related_name='items')
     product = models.ForeignKey(MenuItem, on_delete=models.CASCADE)  # MenuItem ile bağlantı
     quantity = models.PositiveIntegerField(null=False)  # null=False ekleniyor
-    price = models.DecimalField(max_digits=10, decimal_places=2, default=0)  # Fiyat doğrudan MenuItem'dan alınmalı
+    price = models.DecimalField(max_digits=10, decimal_places=2, default=0)  # Satır toplamı: ürün fiyatı x adet
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        constraints = [
+            # Sepette her ürün tek satırda tutulur; eşzamanlı eklemeler aynı satırı artırır
+            models.UniqueConstraint(fields=['cart', 'product'], name='unique_cart_product'),
+        ]
+
     def __str__(self):
-        return f'{self.product.name} x {self.quantity} - {self.product.price * self.quantity} total'
-
-   # Sepet öğesi kaydedildiğinde ürün fiyatını güncelle
-def save(self, *args, **kwargs):
-    if self.product.price is None:
-        raise ValueError("Ürün fiyatı tanımlı değil.")  # Ürün fiyatı tanımsızsa hata verir
-    self.price = self.product.price * self.quantity  # Fiyatı, ürünün fiyatı ile çarp
-    super().save(*args, **kwargs)
+        return f'{self.product.name} x {self.quantity} - {self.price} total'
+
+    # Sepet öğesi kaydedildiğinde satır tutarı ürün fiyatından hesaplanır ve sepet toplamı farkla güncellenir
+    def save(self, *args, **kwargs):
+        if self.product.price is None:
+            raise ValueError("Ürün fiyatı tanımlı değil.")  # Ürün fiyatı tanımsızsa hata verir
+        self.price = self.product.price * self.quantity  # Fiyatı, ürünün fiyatı ile çarp
+        old = self.get_loaded_values('price', 'quantity')
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            Cart.apply_delta(self.cart_id, self.price - old['price'], self.quantity - old['quantity'])
+        self.set_loaded_values('price', 'quantity')
+
+    def delete(self, *args, **kwargs):
+        old = self.get_loaded_values('price', 'quantity')
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            Cart.apply_delta(self.cart_id, -old['price'], -old['quantity'])
+        return result
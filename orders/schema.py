@@ -1,9 +1,16 @@
+from decimal import Decimal
 import graphene
 from graphene_django import DjangoObjectType
 from orders.models import Order, OrderItem, Cart, CartItem
 from restaurants.models import MenuItem
+from notifications.queue import enqueue_email
 from yemeksepeti_clone.decorator import roles_required
-from decimal import Decimal
+from yemeksepeti_clone.loaders import fetch_one, get_loaders
+from yemeksepeti_clone.optimizer import optimize
+from yemeksepeti_clone.pagination import paginate
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+from django.utils import timezone
 
 
 
@@ -13,17 +20,39 @@ class OrderType(DjangoObjectType):
         model = Order
         fields = ("id", "user", "total_price", "created_at", "updated_at", "items")
 
+    def resolve_user(self, info):
+        return get_loaders(info).user.load(self.user_id)
+
+    # Sipariş öğeleri tüm siparişler için tek sorguda yüklenir
+    def resolve_items(self, info):
+        return get_loaders(info).order_items_by_order.load(self.id)
+
+# Sayfalı sipariş listesi için Relay connection tipi
+class OrderConnection(graphene.relay.Connection):
+    class Meta:
+        node = OrderType
+
 # Sipariş öğesi modelini GraphQL için tanımlama
 class OrderItemType(DjangoObjectType):
     class Meta:
         model = OrderItem
         fields = ("id", "order", "product_name", "quantity", "price", "created_at", "updated_at")
 
+    def resolve_order(self, info):
+        return get_loaders(info).order.load(self.order_id)
+
 # Sepet modeli için GraphQL tanımı
 class CartType(DjangoObjectType):
     class Meta:
         model = Cart
-        fields = ("id", "user", "items", "created_at", "updated_at")
+        fields = ("id", "user", "items", "total", "item_count", "created_at", "updated_at")
+
+    def resolve_user(self, info):
+        return get_loaders(info).user.load(self.user_id)
+
+    # Sepet öğeleri tek sorguda yüklenir
+    def resolve_items(self, info):
+        return get_loaders(info).cart_items_by_cart.load(self.id)
 
 # Sepet öğesi modeli için GraphQL tanımı
 class CartItemType(DjangoObjectType):
@@ -31,16 +60,23 @@ class CartItemType(DjangoObjectType):
         model = CartItem
         fields = ("id", "cart", "product", "quantity", "price", "created_at", "updated_at")
 
+    def resolve_cart(self, info):
+        return get_loaders(info).cart.load(self.cart_id)
+
+    def resolve_product(self, info):
+        return get_loaders(info).menu_item.load(self.product_id)
+
 # Sorgular
 class Query(graphene.ObjectType):
     # Kullanıcının sadece kendi siparişlerini görmesi için
-    all_orders = graphene.List(OrderType)
+    all_orders = graphene.Field(OrderConnection, first=graphene.Int(), after=graphene.String())
     
+    # En yeni siparişler önce gelir
     @roles_required("CUSTOMER")
-    def resolve_all_orders(root, info):
+    def resolve_all_orders(root, info, first=None, after=None):
         user = info.context.user
         if user.is_authenticated:
-            return Order.objects.filter(user=user)
+            return paginate(Order.objects.filter(user=user), OrderConnection, info, first, after, descending=True)
         raise Exception("Giriş yapmalısınız.")
 
     # Belirli bir siparişi ID ile getirme
@@ -50,10 +86,7 @@ class Query(graphene.ObjectType):
     def resolve_order(root, info, id):
         user = info.context.user
         if user.is_authenticated:
-            try:
-                return Order.objects.get(pk=id, user=user)
-            except Order.DoesNotExist:
-                raise Exception("Sipariş bulunamadı.")
+            return fetch_one(info, optimize(Order.objects.all(), info).filter(pk=id, user=user), "Sipariş bulunamadı.")
         raise Exception("Giriş yapmalısınız.")
 
     # Kullanıcının sepetini getirme
@@ -63,27 +96,23 @@ class Query(graphene.ObjectType):
     def resolve_user_cart(self, info):
         user = info.context.user
         if user.is_authenticated:
-            try:
-                return Cart.objects.get(user=user)
-            except Cart.DoesNotExist:
-                raise Exception("Sepet bulunamadı.")
+            return fetch_one(info, optimize(Cart.objects.all(), info).filter(user=user), "Sepet bulunamadı.")
         raise Exception("Giriş yapmalısınız.")
 
 # Sipariş oluşturma mutasyonu
 class CreateOrder(graphene.Mutation):
     class Arguments:
-        total_price = graphene.Float(required=True) 
+        # Geriye dönük uyumluluk için duruyor; toplam sipariş öğelerinden sunucuda hesaplanır
+        total_price = graphene.Float(description="Kullanılmıyor, toplam sipariş öğelerinden hesaplanır.")
 
     order = graphene.Field(OrderType)
 
     @roles_required("CUSTOMER")
-    def mutate(self, info, total_price):
+    def mutate(self, info, total_price=None):
         user = info.context.user
         if not user.is_authenticated:
             raise Exception("Giriş yapmalısınız.")
-        if total_price <= 0:
-            raise Exception("Geçersiz toplam fiyat.")
-        order = Order.objects.create(user=user, total_price=Decimal(total_price))  # total_price olarak düzeltildi
+        order = Order.objects.create(user=user)  # Toplam, sipariş öğeleri eklendikçe artar
         return CreateOrder(order=order)
 
 
@@ -92,7 +121,8 @@ class CreateOrder(graphene.Mutation):
 class UpdateOrder(graphene.Mutation):
     class Arguments:
         id = graphene.ID(required=True)
-        total_price = graphene.Float()
+        # Geriye dönük uyumluluk için duruyor; toplam sipariş öğelerinden sunucuda hesaplanır
+        total_price = graphene.Float(description="Kullanılmıyor, toplam sipariş öğelerinden hesaplanır.")
 
     order = graphene.Field(OrderType)
 
@@ -106,10 +136,8 @@ class UpdateOrder(graphene.Mutation):
         except Order.DoesNotExist:
             raise Exception("Sipariş bulunamadı.")
         
-        if total_price is not None and total_price > 0:
-            order.total_price = total_price
-        
-        order.save()
+        # total_price tüm satır yazılırsa eşzamanlı öğe değişiklikleri ezilebilir
+        order.save(update_fields=['updated_at'])
         return UpdateOrder(order=order)
 
 
@@ -159,7 +187,8 @@ class UpdateOrderItem(graphene.Mutation):
         if quantity is not None and quantity > 0:
             order_item.quantity = quantity
         if price is not None and price > 0:
-            order_item.price = price
+            # GraphQL Float'ı alanla aynı hassasiyette Decimal'e çevrilir; sipariş toplamı bu değerle güncellenir
+            order_item.price = Decimal(str(price)).quantize(Decimal('0.01'))
         
         order_item.save()
         return UpdateOrderItem(order_item=order_item)
@@ -216,6 +245,105 @@ class CreateOrderItem(graphene.Mutation):
 
 
 
+# Sepeti siparişe dönüştürme mutasyonu (tek istek, tek transaction)
+class Checkout(graphene.Mutation):
+    order = graphene.Field(OrderType)
+
+    @roles_required("CUSTOMER")
+    def mutate(self, info):
+        user = info.context.user
+        if not user.is_authenticated:
+            raise Exception("Giriş yapmalısınız.")
+        with transaction.atomic():
+            # Aynı sepetle eşzamanlı checkout yapılmasını engellemek için sepet satırı kilitlenir
+            cart = Cart.objects.select_for_update().filter(user=user).first()
+            if cart is None:
+                raise Exception("Sepet bulunamadı.")
+            cart_items = list(CartItem.objects.filter(cart=cart).select_related('product'))
+            if not cart_items:
+                raise Exception("Sepetiniz boş.")
+
+            # Toplam tutar istemciden alınmaz, güncel ürün fiyatlarından hesaplanır
+            total_price = sum(item.product.price * item.quantity for item in cart_items)
+            order = Order.objects.create(user=user, total_price=total_price)
+            OrderItem.objects.bulk_create([
+                OrderItem(order=order, product_name=item.product.name, quantity=item.quantity, price=item.product.price)
+                for item in cart_items
+            ])
+            CartItem.objects.filter(cart=cart).delete()
+            Cart.objects.filter(pk=cart.pk).update(total=0, item_count=0)
+            # Onay e-postası siparişle aynı transaction'da kuyruğa yazılır, işçi tarafından gönderilir
+            lines = '\n'.join(f'{item.product.name} x {item.quantity}' for item in cart_items)
+            enqueue_email(
+                f'Siparişiniz alındı (#{order.id})',
+                f'{lines}\n\nToplam: {total_price} TL',
+                [user.email],
+            )
+        return Checkout(order=order)
+
+
+# Toplu sepet güncellemesi için girdi tipi
+class CartItemInput(graphene.InputObjectType):
+    product_id = graphene.ID(required=True)
+    quantity = graphene.Int(required=True)  # 0 verilirse satır sepetten silinir
+
+# Sepeti tek istekte senkronize etme mutasyonu (satır sayısından bağımsız, sabit sayıda sorgu)
+class SetCartItems(graphene.Mutation):
+    class Arguments:
+        items = graphene.List(graphene.NonNull(CartItemInput), required=True)
+        replace = graphene.Boolean(default_value=False)  # True ise listede olmayan satırlar silinir
+
+    cart = graphene.Field(CartType)
+
+    @roles_required("CUSTOMER")
+    def mutate(self, info, items, replace=False):
+        user = info.context.user
+        if not user.is_authenticated:
+            raise Exception("Giriş yapmalısınız.")
+
+        quantities = {}
+        for item in items:
+            try:
+                product_id = int(item.product_id)
+            except ValueError:
+                raise Exception("Geçersiz ürün bilgileri.")
+            if item.quantity < 0:
+                raise Exception("Geçersiz ürün bilgileri.")
+            quantities[product_id] = item.quantity
+
+        products = MenuItem.objects.only('id', 'price').in_bulk(list(quantities))
+        if len(products) != len(quantities):
+            raise Exception("Ürün bulunamadı.")
+
+        with transaction.atomic():
+            cart, _ = Cart.objects.select_for_update().get_or_create(user=user)
+            # addCartItem sepeti kilitlemez; aynı satırı araya ekleyen bir istek (cart, product) çakışmasıyla
+            # hata vermez, satır tek INSERT ... ON CONFLICT/ON DUPLICATE KEY UPDATE ile güncellenir.
+            # MySQL çakışma hedefi almaz (ON DUPLICATE KEY tüm benzersiz anahtarlara bakar)
+            to_upsert = [
+                CartItem(cart=cart, product_id=product_id, quantity=quantity, price=products[product_id].price * quantity)
+                for product_id, quantity in quantities.items() if quantity > 0
+            ]
+            if to_upsert:
+                unique_fields = ['cart', 'product'] if connection.features.supports_update_conflicts_with_target else None
+                CartItem.objects.bulk_create(
+                    to_upsert, update_conflicts=True, unique_fields=unique_fields, update_fields=['quantity', 'price', 'updated_at'],
+                )
+            to_delete = [product_id for product_id, quantity in quantities.items() if quantity == 0]
+            stale = CartItem.objects.filter(cart=cart)
+            if replace:
+                stale = stale.exclude(product_id__in=[product_id for product_id, quantity in quantities.items() if quantity > 0])
+            else:
+                stale = stale.filter(product_id__in=to_delete)
+            if replace or to_delete:
+                stale.delete()
+            # Toplu işlemler save() çağırmadığı için sepet toplamları burada yeniden hesaplanır
+            Cart.refresh_totals(cart.pk)
+            cart.refresh_from_db(fields=['total', 'item_count'])
+
+        return SetCartItems(cart=cart)
+
+
 # Sepet öğesi güncelleme mutasyonu
 class UpdateCartItem(graphene.Mutation):
     class Arguments:
@@ -230,7 +358,7 @@ class UpdateCartItem(graphene.Mutation):
         if not user.is_authenticated:
             raise Exception("Giriş yapmalısınız.")
         try:
-            cart_item = CartItem.objects.get(pk=cart_item_id, cart__user=user)
+            cart_item = CartItem.objects.select_related('product').get(pk=cart_item_id, cart__user=user)
             cart_item.quantity = quantity
             cart_item.save()
             return UpdateCartItem(cart_item=cart_item)
@@ -269,17 +397,41 @@ class AddCartItem(graphene.Mutation):
         user = info.context.user
         if not user.is_authenticated:
             raise Exception("Giriş yapmalısınız.")
+        if quantity <= 0:
+            raise Exception("Geçersiz ürün bilgileri.")
+        try:
+            product = MenuItem.objects.only('id', 'price').get(id=product_id)
+        except MenuItem.DoesNotExist:
+            raise Exception("Ürün bulunamadı.")
         cart, created = Cart.objects.get_or_create(user=user)
-        product = MenuItem.objects.get(id=product_id)
-        cart_item, item_created = CartItem.objects.get_or_create(cart=cart, product=product, defaults={"quantity":quantity})
-        
-        if not item_created:
-            cart_item.quantity += quantity
 
-        # Ürün fiyatını hesapla ve kaydet
-        cart_item.price = product.price * cart_item.quantity  
-        cart_item.save()
-        
+        # Artış veritabanında tek bir UPDATE ile yapılır, eşzamanlı istekler birbirinin artışını ezmez.
+        # Satıra sadece yeni adetlerin tutarı eklenir (sepet toplamıyla aynı fark); önceki adetler
+        # eklendikleri fiyatla kalır, menü fiyatı değişse de satır toplamı sepet toplamından ayrışmaz.
+        def increment():
+            return CartItem.objects.filter(cart=cart, product=product).update(
+                price=F('price') + quantity * product.price,
+                quantity=F('quantity') + quantity,
+                updated_at=timezone.now(),
+            )
+
+        def increment_with_totals():
+            updated = increment()
+            if updated:
+                Cart.apply_delta(cart.pk, product.price * quantity, quantity)
+            return updated
+
+        with transaction.atomic():
+            if not increment_with_totals():
+                try:
+                    with transaction.atomic():
+                        # save() satır tutarını hesaplar ve sepet toplamını günceller
+                        CartItem.objects.create(cart=cart, product=product, quantity=quantity)
+                except IntegrityError:
+                    # Aynı ürün başka bir istek tarafından az önce eklendi (unique cart+product), artışa dön
+                    increment_with_totals()
+
+        cart_item = CartItem.objects.get(cart=cart, product=product)
         return AddCartItem(cart_item=cart_item)
 
     
@@ -290,6 +442,7 @@ class Mutation(graphene.ObjectType):
     create_order = CreateOrder.Field()
     update_order = UpdateOrder.Field()
     delete_order = DeleteOrder.Field()
+    checkout = Checkout.Field()  # Sepeti siparişe dönüştürme
     
     # Sipariş öğesi işlemleri
     create_order_item = CreateOrderItem.Field()
@@ -298,5 +451,6 @@ class Mutation(graphene.ObjectType):
     
     # Sepet işlemleri
     add_cart_item = AddCartItem.Field()
+    set_cart_items = SetCartItems.Field()
     update_cart_item = UpdateCartItem.Field()
     delete_cart_item = DeleteCartItem.Field()
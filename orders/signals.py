@@ -0,0 +1,18 @@
+from django.db.models.signals import post_delete, pre_delete
+from django.dispatch import receiver
+from restaurants.models import MenuItem
+from orders.models import Cart, CartItem
+
+
+# Menü öğesi silinince sepet satırları CASCADE ile toplu silinir (CartItem.delete çağrılmaz);
+# etkilenen sepetlerin toplamları silme sonrasında yeniden hesaplanır
+@receiver(pre_delete, sender=MenuItem)
+def collect_affected_carts(sender, instance, **kwargs):
+    instance._affected_cart_ids = list(CartItem.objects.filter(product=instance).values_list('cart_id', flat=True))
+
+
+@receiver(post_delete, sender=MenuItem)
+def refresh_affected_carts(sender, instance, **kwargs):
+    cart_ids = getattr(instance, '_affected_cart_ids', None)
+    if cart_ids:
+        Cart.refresh_totals(*cart_ids)
@@ -1,2 +1,320 @@
-from django.test import TestCase
+import time
+from decimal import Decimal
+from concurrent.futures import ThreadPoolExecutor
+from django.test import TestCase, TransactionTestCase, RequestFactory, skipUnlessDBFeature
+from django.core.cache import cache
+from django.db import connection, connections
+from django.test.utils import CaptureQueriesContext
+from users.models import User
+from restaurants.models import Restaurant, MenuItem
+from notifications.models import EmailJob
+from orders.models import Order, OrderItem, Cart, CartItem
+from yemeksepeti_clone.schema import schema
 
+
+class OrderQueryTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="musteri@example.com", password="Parola123!", firstName="Ali", lastName="Veli", is_customer=True
+        )
+        self.restaurant = Restaurant.objects.create(name="Restoran", address="Adres", phone="5551234567")
+
+    def execute(self, query):
+        request = RequestFactory().post('/graphql/')
+        request.user = self.user
+        cache.clear()  # Her ölçüm rol önbelleği soğukken yapılır
+        with CaptureQueriesContext(connection) as captured:
+            result = schema.execute(query, context_value=request)
+        self.assertIsNone(result.errors)
+        return len(captured), result.data
+
+    def create_orders(self, count, items_per_order=3):
+        for i in range(count):
+            order = Order.objects.create(user=self.user, total_price=30)
+            for j in range(items_per_order):
+                OrderItem.objects.create(order=order, product_name=f"Yemek {j}", quantity=1, price=10)
+
+    def test_all_orders_query_count_is_flat(self):
+        """Sipariş sayısı artsa da sorgu sayısı sabit kalmalı"""
+        query = '{ allOrders(first: 50) { edges { node { id user { email } items { productName order { id } } } } } }'
+        self.create_orders(2)
+        small_count, data = self.execute(query)
+        self.assertEqual(len(data['allOrders']['edges']), 2)
+
+        self.create_orders(15)
+        large_count, data = self.execute(query)
+        self.assertEqual(len(data['allOrders']['edges']), 17)
+        self.assertEqual(small_count, large_count)
+        for order in [edge['node'] for edge in data['allOrders']['edges']]:
+            self.assertEqual(len(order['items']), 3)
+            self.assertTrue(all(item['order']['id'] == order['id'] for item in order['items']))
+
+    def test_user_cart_query_count_is_flat(self):
+        """Sepetteki ürün sayısı artsa da sorgu sayısı sabit kalmalı"""
+        query = '{ userCart { id items { quantity product { name restaurant { name } } } } }'
+        cart = Cart.objects.create(user=self.user)
+        for i in range(2):
+            product = MenuItem.objects.create(restaurant=self.restaurant, name=f"Yemek {i}", price=10)
+            CartItem.objects.create(cart=cart, product=product, quantity=1)
+        small_count, data = self.execute(query)
+        self.assertEqual(len(data['userCart']['items']), 2)
+
+        for i in range(2, 12):
+            product = MenuItem.objects.create(restaurant=self.restaurant, name=f"Yemek {i}", price=10)
+            CartItem.objects.create(cart=cart, product=product, quantity=1)
+        large_count, data = self.execute(query)
+        self.assertEqual(len(data['userCart']['items']), 12)
+        self.assertEqual(small_count, large_count)
+
+    def test_all_orders_newest_first(self):
+        """Siparişler en yeniden eskiye doğru sayfalanmalı"""
+        self.create_orders(3, items_per_order=0)
+        _, data = self.execute('{ allOrders(first: 2) { edges { node { id } } pageInfo { hasNextPage endCursor } } }')
+        ids = [int(edge['node']['id']) for edge in data['allOrders']['edges']]
+        expected = list(Order.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(ids, expected[:2])
+        self.assertTrue(data['allOrders']['pageInfo']['hasNextPage'])
+
+        after = data['allOrders']['pageInfo']['endCursor']
+        _, data = self.execute('{ allOrders(first: 2, after: "%s") { edges { node { id } } pageInfo { hasNextPage } } }' % after)
+        self.assertEqual([int(edge['node']['id']) for edge in data['allOrders']['edges']], expected[2:])
+        self.assertFalse(data['allOrders']['pageInfo']['hasNextPage'])
+
+
+class CheckoutTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="musteri@example.com", password="Parola123!", firstName="Ali", lastName="Veli", is_customer=True
+        )
+        self.restaurant = Restaurant.objects.create(name="Restoran", address="Adres", phone="5551234567")
+        self.cart = Cart.objects.create(user=self.user)
+
+    def fill_cart(self, count):
+        for i in range(count):
+            product = MenuItem.objects.create(restaurant=self.restaurant, name=f"Yemek {i}", price=10 + i)
+            CartItem.objects.create(cart=self.cart, product=product, quantity=2)
+
+    def checkout(self):
+        request = RequestFactory().post('/graphql/')
+        request.user = self.user
+        cache.clear()
+        with CaptureQueriesContext(connection) as captured:
+            result = schema.execute('mutation { checkout { order { id totalPrice } } }', context_value=request)
+        return len(captured), result
+
+    def test_checkout_creates_order_and_clears_cart(self):
+        """Checkout sepeti siparişe çevirmeli, toplamı sunucuda hesaplamalı ve sepeti boşaltmalı"""
+        self.fill_cart(3)
+        _, result = self.checkout()
+        self.assertIsNone(result.errors)
+        order = Order.objects.get(pk=result.data['checkout']['order']['id'])
+        self.assertEqual(order.total_price, (10 + 11 + 12) * 2)
+        self.assertEqual(order.items.count(), 3)
+        self.assertFalse(CartItem.objects.filter(cart=self.cart).exists())
+        self.assertEqual(EmailJob.objects.get().recipients, [self.user.email])  # Onay e-postası kuyrukta
+
+    def test_checkout_query_count_is_flat(self):
+        """Sepetteki ürün sayısı sorgu sayısını etkilememeli"""
+        self.fill_cart(2)
+        small_count, result = self.checkout()
+        self.assertIsNone(result.errors)
+
+        self.fill_cart(20)
+        large_count, result = self.checkout()
+        self.assertIsNone(result.errors)
+        self.assertEqual(small_count, large_count)
+
+    def test_checkout_with_empty_cart_fails(self):
+        """Boş sepetle sipariş oluşturulamamalı"""
+        _, result = self.checkout()
+        self.assertIsNotNone(result.errors)
+        self.assertFalse(Order.objects.exists())
+
+
+class SetCartItemsTestCase(TestCase):
+    mutation = '''
+        mutation($items: [CartItemInput!]!, $replace: Boolean) {
+            setCartItems(items: $items, replace: $replace) { cart { items { quantity price product { id } } } }
+        }
+    '''
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="musteri@example.com", password="Parola123!", firstName="Ali", lastName="Veli", is_customer=True
+        )
+        restaurant = Restaurant.objects.create(name="Restoran", address="Adres", phone="5551234567")
+        self.products = [MenuItem.objects.create(restaurant=restaurant, name=f"Yemek {i}", price=10) for i in range(30)]
+
+    def set_items(self, quantities, replace=False):
+        request = RequestFactory().post('/graphql/')
+        request.user = self.user
+        items = [{'productId': product.id, 'quantity': quantity} for product, quantity in quantities]
+        with CaptureQueriesContext(connection) as captured:
+            result = schema.execute(self.mutation, context_value=request, variable_values={'items': items, 'replace': replace})
+        self.assertIsNone(result.errors)
+        return len(captured), result.data
+
+    def cart_quantities(self):
+        return dict(CartItem.objects.filter(cart__user=self.user).values_list('product_id', 'quantity'))
+
+    def test_set_update_and_delete_lines(self):
+        """Satırlar eklenmeli, güncellenmeli ve 0 adetliler silinmeli"""
+        a, b, c = self.products[:3]
+        self.set_items([(a, 1), (b, 2)])
+        self.assertEqual(self.cart_quantities(), {a.id: 1, b.id: 2})
+
+        self.set_items([(a, 0), (b, 5), (c, 3)])
+        self.assertEqual(self.cart_quantities(), {b.id: 5, c.id: 3})
+        self.assertEqual(CartItem.objects.get(product=b).price, 50)
+
+        self.set_items([(c, 1)], replace=True)
+        self.assertEqual(self.cart_quantities(), {c.id: 1})
+
+    def test_invalid_product_id(self):
+        """Sayısal olmayan ürün kimliği kendi hata mesajıyla reddedilmeli"""
+        request = RequestFactory().post('/graphql/')
+        request.user = self.user
+        result = schema.execute(self.mutation, context_value=request, variable_values={'items': [{'productId': 'abc', 'quantity': 1}]})
+        self.assertEqual(result.errors[0].message, "Geçersiz ürün bilgileri.")
+
+    def test_query_count_is_flat(self):
+        """Satır sayısı artsa da sorgu sayısı sabit kalmalı"""
+        self.set_items([(product, 1) for product in self.products[:2]])
+        small_count, _ = self.set_items([(product, 2) for product in self.products[:2]] + [(product, 1) for product in self.products[2:4]])
+        self.set_items([(product, 1) for product in self.products[:15]])
+        large_count, _ = self.set_items([(product, 2) for product in self.products[:15]] + [(product, 1) for product in self.products[15:]])
+        self.assertEqual(small_count, large_count)
+
+
+class TotalsTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="musteri@example.com", password="Parola123!", firstName="Ali", lastName="Veli", is_customer=True
+        )
+        restaurant = Restaurant.objects.create(name="Restoran", address="Adres", phone="5551234567")
+        self.products = [MenuItem.objects.create(restaurant=restaurant, name=f"Yemek {i}", price=10 * (i + 1)) for i in range(3)]
+
+    def execute(self, query):
+        request = RequestFactory().post('/graphql/')
+        request.user = self.user
+        result = schema.execute(query, context_value=request)
+        self.assertIsNone(result.errors)
+        return result.data
+
+    def cart_totals(self):
+        cart = Cart.objects.get(user=self.user)
+        return cart.total, cart.item_count
+
+    def test_cart_totals_follow_mutations(self):
+        """Sepet toplamı ve adet sayısı her değişiklikte güncel kalmalı"""
+        a, b, c = self.products
+        self.execute('mutation { addCartItem(productId: %d, quantity: 2) { cartItem { id } } }' % a.id)
+        self.execute('mutation { addCartItem(productId: %d, quantity: 1) { cartItem { id } } }' % a.id)
+        self.assertEqual(self.cart_totals(), (30, 3))
+
+        data = self.execute('mutation { addCartItem(productId: %d, quantity: 1) { cartItem { id } } }' % b.id)
+        self.assertEqual(self.cart_totals(), (50, 4))
+
+        self.execute('mutation { updateCartItem(cartItemId: %s, quantity: 4) { cartItem { id } } }' % data['addCartItem']['cartItem']['id'])
+        self.assertEqual(self.cart_totals(), (110, 7))
+
+        data = self.execute('mutation { setCartItems(items: [{productId: %d, quantity: 0}, {productId: %d, quantity: 2}]) { cart { total itemCount } } }' % (a.id, c.id))
+        self.assertEqual(data['setCartItems']['cart'], {'total': '140.00', 'itemCount': 6})
+
+        b.delete()  # Ürün silinince sepet satırı CASCADE ile silinir
+        self.assertEqual(self.cart_totals(), (60, 2))
+
+        self.execute('mutation { checkout { order { id } } }')
+        self.assertEqual(self.cart_totals(), (0, 0))
+
+    def test_price_change_between_adds(self):
+        """Menü fiyatı eklemeler arasında değişirse satır tutarı ve sepet toplamı aynı kalmalı"""
+        product = self.products[0]
+        self.execute('mutation { addCartItem(productId: %d, quantity: 1) { cartItem { id } } }' % product.id)
+        product.price = 20
+        product.save()
+        self.execute('mutation { addCartItem(productId: %d, quantity: 1) { cartItem { id } } }' % product.id)
+
+        cart_item = CartItem.objects.get(cart__user=self.user, product=product)
+        self.assertEqual((cart_item.quantity, cart_item.price), (2, 30))
+        self.assertEqual(self.cart_totals(), (30, 2))
+
+    def test_repeated_adds_keep_every_increment(self):
+        """Aynı ürün art arda eklenince her artış satıra ve sepete yansımalı (paralel sürümü MySQL'de çalışır)"""
+        product = self.products[0]
+        for _ in range(20):
+            self.execute('mutation { addCartItem(productId: %d, quantity: 1) { cartItem { id } } }' % product.id)
+
+        cart_item = CartItem.objects.get(cart__user=self.user, product=product)
+        self.assertEqual((cart_item.quantity, cart_item.price), (20, 200))
+        self.assertEqual(self.cart_totals(), (200, 20))
+
+    def test_update_order_item_price_moves_order_total(self):
+        """updateOrderItem ile fiyat değişince sipariş toplamı satırın farkı kadar değişmeli"""
+        order = Order.objects.create(user=self.user)
+        item = OrderItem.objects.create(order=order, product_name="Yemek", quantity=2, price=15)
+        OrderItem.objects.create(order=order, product_name="İçecek", quantity=1, price=5)
+
+        data = self.execute('mutation { updateOrderItem(id: %d, price: 12.5) { orderItem { price } } }' % item.id)
+        self.assertEqual(data['updateOrderItem']['orderItem']['price'], '12.50')
+        order.refresh_from_db()
+        self.assertEqual(order.total_price, Decimal('30.00'))
+
+    def test_order_total_follows_items(self):
+        """Sipariş toplamı sipariş öğelerinden hesaplanmalı"""
+        order = Order.objects.create(user=self.user)
+        item = OrderItem.objects.create(order=order, product_name="Yemek", quantity=2, price=15)
+        OrderItem.objects.create(order=order, product_name="İçecek", quantity=1, price=5)
+        order.refresh_from_db()
+        self.assertEqual(order.total_price, 35)
+
+        item.quantity = 3
+        item.save()
+        order.refresh_from_db()
+        self.assertEqual(order.total_price, 50)
+
+        item.delete()
+        order.refresh_from_db()
+        self.assertEqual(order.total_price, 5)
+
+
+# Satır kilidi olan bir veritabanı (MySQL) gerektirir; SQLite paylaşımlı bellek modunda tabloyu kilitler
+@skipUnlessDBFeature('has_select_for_update')
+class AddCartItemConcurrencyTestCase(TransactionTestCase):
+    workers = 8
+    calls = 80
+    p99_limit = 1.0  # saniye
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="musteri@example.com", password="Parola123!", firstName="Ali", lastName="Veli", is_customer=True
+        )
+        restaurant = Restaurant.objects.create(name="Restoran", address="Adres", phone="5551234567")
+        self.product = MenuItem.objects.create(restaurant=restaurant, name="Lahmacun", price=10)
+
+    def add_cart_item(self, _):
+        request = RequestFactory().post('/graphql/')
+        request.user = self.user
+        started = time.perf_counter()
+        try:
+            result = schema.execute(
+                'mutation { addCartItem(productId: %d, quantity: 1) { cartItem { quantity } } }' % self.product.id,
+                context_value=request,
+            )
+        finally:
+            connections.close_all()
+        return time.perf_counter() - started, result.errors
+
+    def test_parallel_add_cart_item(self):
+        """Eşzamanlı eklemelerde hiçbir artış kaybolmamalı ve p99 gecikme sınırın altında kalmalı"""
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            results = list(executor.map(self.add_cart_item, range(self.calls)))
+
+        self.assertEqual([errors for _, errors in results if errors], [])
+        cart_item = CartItem.objects.get(cart__user=self.user, product=self.product)
+        self.assertEqual(cart_item.quantity, self.calls)
+        self.assertEqual(cart_item.price, self.product.price * self.calls)
+
+        latencies = sorted(latency for latency, _ in results)
+        p99 = latencies[int(len(latencies) * 0.99) - 1]
+        self.assertLess(p99, self.p99_limit)
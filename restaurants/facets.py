@@ -0,0 +1,125 @@
+from django.db import IntegrityError, transaction
+from django.db.models import BooleanField, Count, ExpressionWrapper, F, Q
+from restaurants.models import MenuFacet, MenuItem, Restaurant, RestaurantFacet
+from yemeksepeti_clone.cache import aquery_cache_key, aread_through, query_cache_key, read_through
+from yemeksepeti_clone.loaders import is_async
+
+# Sayaçlarını etkileyen alanlar; update_fields bunlardan birini içermiyorsa sayaçlara dokunulmaz
+MENU_ITEM_FIELDS = {'restaurant', 'category', 'image'}
+RESTAURANT_FIELDS = {'category'}
+
+# Görsel alanı boş dize veya NULL olabilir
+HAS_IMAGE = Q(image__isnull=False) & ~Q(image='')
+
+
+def menu_item_key(menu_item):
+    if menu_item.category_id is None:
+        return None
+    return menu_item.restaurant_id, menu_item.category_id, bool(menu_item.image)
+
+
+# Sayaç satırı yoksa oluşturulur; aynı anda oluşturan iki yazmadan biri benzersizlik hatası alır ve güncellemeye döner
+def _bump(model, counter, lookup, delta):
+    if not delta:
+        return
+    if model.objects.filter(**lookup).update(**{counter: F(counter) + delta}) or delta < 0:
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **{counter: delta})
+    except IntegrityError:
+        model.objects.filter(**lookup).update(**{counter: F(counter) + delta})
+
+
+def bump_menu(key, delta):
+    if key is not None:
+        restaurant_id, category_id, image = key
+        _bump(MenuFacet, 'item_count', {'restaurant_id': restaurant_id, 'category_id': category_id, 'has_image': image}, delta)
+
+
+def bump_restaurant(category_id, delta):
+    if category_id is not None:
+        _bump(RestaurantFacet, 'restaurant_count', {'category_id': category_id}, delta)
+
+
+# Sayaçlar baştan hesaplanır: sinyal çalıştırmayan toplu yazmalardan (bulk_create, queryset.update) sonra
+# veya tutarlılık kontrolü için. restaurant_ids verilirse sadece bu restoranların menü sayaçları yenilenir.
+@transaction.atomic
+def rebuild(restaurant_ids=None):
+    menu_items = MenuItem.objects.filter(category__isnull=False)
+    menu_facets = MenuFacet.objects.all()
+    if restaurant_ids is not None:
+        menu_items = menu_items.filter(restaurant_id__in=restaurant_ids)
+        menu_facets = menu_facets.filter(restaurant_id__in=restaurant_ids)
+    menu_facets.delete()
+    rows = (
+        menu_items
+        .annotate(with_image=ExpressionWrapper(HAS_IMAGE, output_field=BooleanField()))
+        .values('restaurant_id', 'category_id', 'with_image')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+    MenuFacet.objects.bulk_create(
+        (MenuFacet(restaurant_id=row['restaurant_id'], category_id=row['category_id'], has_image=row['with_image'], item_count=row['count'])
+         for row in rows.iterator()),
+        batch_size=1000,
+    )
+
+    if restaurant_ids is None:
+        RestaurantFacet.objects.all().delete()
+        rows = Restaurant.objects.filter(category__isnull=False).values('category_id').annotate(count=Count('id')).order_by()
+        RestaurantFacet.objects.bulk_create(
+            RestaurantFacet(category_id=row['category_id'], restaurant_count=row['count']) for row in rows
+        )
+
+
+def restaurant_facets():
+    return (
+        RestaurantFacet.objects.filter(restaurant_count__gt=0)
+        .values_list('category_id', 'category__name', 'restaurant_count')
+    )
+
+
+# Görsel filtresi verilmemişse görselli ve görselsiz satırlar toplanır
+def menu_facets(restaurant_id, image=None):
+    rows = MenuFacet.objects.filter(restaurant_id=restaurant_id, item_count__gt=0)
+    if image is not None:
+        rows = rows.filter(has_image=image)
+    return rows.values_list('category_id', 'category__name', 'item_count')
+
+
+def to_facets(rows):
+    counts = {}
+    for category_id, name, count in rows:
+        facet = counts.setdefault(category_id, {'id': category_id, 'name': name, 'count': 0})
+        facet['count'] += count
+    return sorted(counts.values(), key=lambda facet: (-facet['count'], facet['name']))
+
+
+# Sayfalı listeye yüzeyler bağlanır; sadece `facets` alanı istenirse okunur.
+# Yüzeyler de listeyle aynı kapsamlarda önbelleğe alınır.
+def attach(info, connection, rows, cache_scopes, *parts):
+    def attach_to(connection):
+        connection.load_facets = lambda info: resolve_facets(info, rows, cache_scopes, *parts)
+        return connection
+
+    if is_async(info):
+        async def aattach():
+            return attach_to(await connection)
+        return aattach()
+    return attach_to(connection)
+
+
+def resolve_facets(info, rows, cache_scopes, *parts):
+    if is_async(info):
+        return _aresolve_facets(info, rows, cache_scopes, parts)
+    key = query_cache_key(info, cache_scopes, *parts)
+    return read_through(key, lambda: to_facets(rows))
+
+
+async def _aresolve_facets(info, rows, cache_scopes, parts):
+    async def fetch_facets():
+        return to_facets([row async for row in rows])
+
+    key = await aquery_cache_key(info, cache_scopes, *parts)
+    return await aread_through(key, fetch_facets)
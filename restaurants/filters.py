@@ -0,0 +1,39 @@
+import django_filters
+from restaurants.facets import HAS_IMAGE
+from restaurants.models import MenuFacet, MenuItem, Restaurant
+
+
+class RestaurantFilter(django_filters.FilterSet):
+    category_id = django_filters.NumberFilter(field_name='category_id')
+    # Menüsünde bu kategoriden öğe olan restoranlar; menü öğeleri yerine sayaç tablosundan okunur
+    menu_category_id = django_filters.NumberFilter(method='filter_menu_category')
+
+    class Meta:
+        model = Restaurant
+        fields = []
+
+    def filter_menu_category(self, queryset, name, value):
+        restaurant_ids = MenuFacet.objects.filter(category_id=value, item_count__gt=0).values('restaurant_id')
+        return queryset.filter(pk__in=restaurant_ids)
+
+
+class MenuItemFilter(django_filters.FilterSet):
+    category_id = django_filters.NumberFilter(field_name='category_id')
+    min_price = django_filters.NumberFilter(field_name='price', lookup_expr='gte')
+    max_price = django_filters.NumberFilter(field_name='price', lookup_expr='lte')
+    has_image = django_filters.BooleanFilter(method='filter_has_image')
+
+    class Meta:
+        model = MenuItem
+        fields = []
+
+    def filter_has_image(self, queryset, name, value):
+        return queryset.filter(HAS_IMAGE) if value else queryset.exclude(HAS_IMAGE)
+
+
+# GraphQL argümanları FilterSet'e verilir; verilmeyen (None) argümanlar filtrelenmez
+def apply_filter(filterset_class, queryset, **arguments):
+    filterset = filterset_class({name: value for name, value in arguments.items() if value is not None}, queryset=queryset)
+    if not filterset.is_valid():
+        raise Exception("Geçersiz filtre: " + ", ".join(filterset.errors))
+    return filterset.qs
@@ -0,0 +1,174 @@
+import heapq
+import math
+from itertools import chain
+from django.conf import settings
+from restaurants.models import Restaurant
+from yemeksepeti_clone.journal import Journal, JournaledState
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180  # enlemde 1 derece ~111 km
+
+LOCATION_FIELDS = ('id', 'latitude', 'longitude', 'delivery_radius_km', 'delivery_area')
+
+
+def distance_km(lat1, lng1, lat2, lng2):
+    # Haversine: küre üzerinde iki nokta arası en kısa mesafe
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(a, 1.0)))
+
+
+# Işın atma: noktadan çıkan yatay ışının çokgen kenarlarını kaç kez kestiği (tek sayı ise içeride)
+def point_in_polygon(lat, lng, polygon):
+    inside = False
+    for (lat1, lng1), (lat2, lng2) in zip(polygon, polygon[1:] + polygon[:1]):
+        if (lat1 > lat) != (lat2 > lat) and lng < lng1 + (lat - lat1) * (lng2 - lng1) / (lat2 - lat1):
+            inside = not inside
+    return inside
+
+
+def validate_location(latitude=None, longitude=None, delivery_radius_km=None, delivery_area=None):
+    if latitude is not None and not -90 <= latitude <= 90:
+        raise Exception("Enlem -90 ile 90 arasında olmalıdır.")
+    if longitude is not None and not -180 <= longitude <= 180:
+        raise Exception("Boylam -180 ile 180 arasında olmalıdır.")
+    if delivery_radius_km is not None and not 0 < delivery_radius_km <= settings.GEO_MAX_RADIUS_KM:
+        raise Exception(f"Teslimat yarıçapı 0 ile {settings.GEO_MAX_RADIUS_KM} km arasında olmalıdır.")
+    if delivery_area:
+        if len(delivery_area) < 3 or any(len(point) != 2 for point in delivery_area):
+            raise Exception("Teslimat alanı en az 3 [enlem, boylam] noktasından oluşmalıdır.")
+        for latitude, longitude in delivery_area:
+            validate_location(latitude, longitude)
+
+
+class Place:
+    __slots__ = ('id', 'latitude', 'longitude', 'delivery_radius_km', 'delivery_area')
+
+    def __init__(self, id, latitude, longitude, delivery_radius_km, delivery_area):
+        self.id = id
+        self.latitude = latitude
+        self.longitude = longitude
+        self.delivery_radius_km = delivery_radius_km
+        self.delivery_area = delivery_area
+
+    def delivers_to(self, latitude, longitude, distance):
+        if self.delivery_area:
+            return point_in_polygon(latitude, longitude, self.delivery_area)
+        return distance <= self.delivery_radius_km
+
+
+class GridIndex:
+    """
+    Konumlu restoranların bellekteki ızgara indeksi: dünya GEO_CELL_DEGREES derecelik hücrelere bölünür.
+    Sorgu sadece arama dairesini çevreleyen kutudaki hücreleri dolaşır, mesafe sadece bu adaylar için hesaplanır.
+    (Boylam ±180'de sarmalanmaz; hizmet bölgesi için gerekmez.)
+    """
+
+    def __init__(self, cell_degrees):
+        self.cell_degrees = cell_degrees
+        self.cells = {}  # (satır, sütun) -> {id: Place}
+        self.places = {}  # id -> Place
+        self.sequence = 0
+
+    def __len__(self):
+        return len(self.places)
+
+    def _cell(self, latitude, longitude):
+        return math.floor(latitude / self.cell_degrees), math.floor(longitude / self.cell_degrees)
+
+    def put(self, place):
+        self.remove(place.id)
+        self.places[place.id] = place
+        self.cells.setdefault(self._cell(place.latitude, place.longitude), {})[place.id] = place
+
+    def remove(self, place_id):
+        place = self.places.pop(place_id, None)
+        if place is None:
+            return
+        cell = self._cell(place.latitude, place.longitude)
+        del self.cells[cell][place_id]
+        if not self.cells[cell]:
+            del self.cells[cell]
+
+    # Yarıçap içindeki en yakın `first` restoran: [(mesafe km, id, teslimat yapıyor mu), ...].
+    # Hücreler noktaya en yakın kenarlarının uzaklığına göre sırayla dolaşılır; `first` sonuç bulunduktan
+    # sonra sıradaki hücrenin en yakın kenarı bile en uzak sonuçtan uzaksa arama biter. Yoğun bölgelerde
+    # (İstanbul merkezi) sadece noktanın çevresindeki birkaç hücre okunur.
+    def near(self, latitude, longitude, radius_km, first, delivers_only=False):
+        if first <= 0:
+            return []
+        size = self.cell_degrees
+        lat_span = radius_km / KM_PER_DEGREE
+        # Boylam derecesi kutba yaklaştıkça kısalır; alandaki en kısa değer kullanılır (hücre uzaklığı alt sınır kalır)
+        lng_km = KM_PER_DEGREE * max(math.cos(math.radians(min(abs(latitude) + lat_span, 90))), 0.01)
+        row_min, col_min = self._cell(latitude - lat_span, longitude - radius_km / lng_km)
+        row_max, col_max = self._cell(latitude + lat_span, longitude + radius_km / lng_km)
+
+        cells = []
+        for row in range(row_min, row_max + 1):
+            lat_gap = max(row * size - latitude, latitude - (row + 1) * size, 0) * KM_PER_DEGREE
+            for col in range(col_min, col_max + 1):
+                if (row, col) in self.cells:
+                    lng_gap = max(col * size - longitude, longitude - (col + 1) * size, 0) * lng_km
+                    bound = math.hypot(lat_gap, lng_gap)
+                    if bound <= radius_km:
+                        cells.append((bound, row, col))
+        cells.sort()
+
+        best = []  # en uzak sonuç başta: (-mesafe, -id, teslimat)
+        for bound, row, col in cells:
+            if len(best) >= first and bound > -best[0][0]:
+                break
+            for place in self.cells[(row, col)].values():
+                distance = distance_km(latitude, longitude, place.latitude, place.longitude)
+                if distance > radius_km:
+                    continue
+                delivers = place.delivers_to(latitude, longitude, distance)
+                if delivers_only and not delivers:
+                    continue
+                hit = (-distance, -place.id, delivers)
+                if len(best) < first:
+                    heapq.heappush(best, hit)
+                elif hit > best[0]:
+                    heapq.heapreplace(best, hit)
+        return sorted((-distance, -place_id, delivers) for distance, place_id, delivers in best)
+
+
+def build():
+    index = GridIndex(settings.GEO_CELL_DEGREES)
+    # Günlük sırası veriden önce okunur; arada değişen restoranlar yüklemeden sonra tekrar okunur
+    index.sequence = _journal.sequence()
+    rows = Restaurant.objects.filter(latitude__isnull=False, longitude__isnull=False).values_list(*LOCATION_FIELDS)
+    for row in rows.iterator(chunk_size=settings.GEO_BUILD_BATCH_SIZE):
+        index.put(Place(*row))
+    return index
+
+
+# Günlükte sadece değişen restoranların id'leri tutulur; işçi bu restoranları tek sorguda yeniden okur
+def _apply(index, payloads):
+    ids = set(chain.from_iterable(payloads))
+    for place_id in ids:
+        index.remove(place_id)
+    for row in Restaurant.objects.filter(pk__in=ids, latitude__isnull=False, longitude__isnull=False).values_list(*LOCATION_FIELDS):
+        index.put(Place(*row))
+
+
+_journal = Journal('geo', 'GEO')
+_state = JournaledState(_journal, build=build, apply=_apply)
+
+
+def publish(restaurant_ids):
+    if restaurant_ids:
+        _state.publish(list(restaurant_ids))
+
+
+def near(latitude, longitude, radius_km, first, delivers_only=False):
+    return _state.get().near(latitude, longitude, radius_km, first, delivers_only)
+
+
+def warm():
+    _state.load()
+
+
+def reset():
+    _state.reset()
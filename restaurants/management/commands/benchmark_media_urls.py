@@ -0,0 +1,38 @@
+import time
+from django.core.files.storage import storages
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from restaurants.models import MenuItem
+from yemeksepeti_clone.media import media_url
+
+
+class Command(BaseCommand):
+    help = "Menü listesi için 1.000 öğe başına görsel URL üretme CPU süresini ölçer (depolama backend'i ve MEDIA_URL)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, default=1000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        items = [
+            MenuItem(id=i, image=f'Proje_Yemekleri/Bench_Restoran/yemek {i}.3f2a9c1b7d4e.jpg')
+            for i in range(options['items'])
+        ]
+        storage = type(storages['default'])
+        self.stdout.write(f"Depolama: {storage.__module__}.{storage.__name__}, {len(items)} öğe")
+
+        def through_storage(request):
+            return [request.build_absolute_uri(item.image.storage.url(item.image.name)) for item in items]
+
+        def precomputed(request):
+            return [media_url(request, item.image.name) for item in items]
+
+        for label, build in (("storage.url + build_absolute_uri", through_storage), ("MEDIA_URL + anahtar", precomputed)):
+            timings = []
+            for _ in range(options['repeat']):
+                request = RequestFactory().get('/graphql/', SERVER_NAME='localhost')
+                started = time.process_time()
+                urls = build(request)
+                timings.append(time.process_time() - started)
+            per_thousand = min(timings) * 1000 / len(items) * 1000
+            self.stdout.write(f"  {label:<36} {per_thousand:8.2f} ms CPU / 1.000 öğe   örnek: {urls[0]}")
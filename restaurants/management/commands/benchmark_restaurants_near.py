@@ -0,0 +1,99 @@
+import math
+import random
+import statistics
+import time
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from restaurants import geo
+from restaurants.models import Restaurant
+from yemeksepeti_clone.schema import schema
+
+# (enlem, boylam, pay): restoranların çoğu büyük şehirlerde toplanır, kalanı ülkeye dağılır
+CITIES = [(41.01, 28.97, 0.5), (39.93, 32.85, 0.2), (38.42, 27.14, 0.15)]
+COUNTRY = ((36.0, 42.0), (26.0, 45.0))
+
+QUERY = '''
+    query($lat: Float!, $lng: Float!, $radius: Float, $first: Int) {
+        restaurantsNear(lat: $lat, lng: $lng, radiusKm: $radius, first: $first) { distanceKm delivers restaurant { id name } }
+    }
+'''
+
+
+def random_point(rng):
+    pick = rng.random()
+    for latitude, longitude, share in CITIES:
+        if pick < share:
+            return rng.gauss(latitude, 0.15), rng.gauss(longitude, 0.2)
+        pick -= share
+    return rng.uniform(*COUNTRY[0]), rng.uniform(*COUNTRY[1])
+
+
+class Command(BaseCommand):
+    help = "restaurantsNear gecikmesini (p50/p95/p99) ölçer; --seed ile konumlu restoran üretir."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0, help="Oluşturulacak restoran sayısı (ör. 100000)")
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--repeat', type=int, default=1000)
+        parser.add_argument('--radius', type=float, default=5.0)
+        parser.add_argument('--first', type=int, default=20)
+        parser.add_argument('--baseline', type=int, default=20, help="Enlem/boylam aralık sorgusu karşılaştırması (0: kapalı)")
+
+    def handle(self, *args, **options):
+        rng = random.Random(0)
+        if options['seed']:
+            self.seed(rng, options['seed'], options['batch_size'])
+
+        started = time.perf_counter()
+        geo.reset()
+        geo.warm()
+        self.stdout.write(f"{Restaurant.objects.filter(latitude__isnull=False).count()} konumlu restoran, indeks {time.perf_counter() - started:.2f}s")
+
+        points = [random_point(rng) for _ in range(options['repeat'])]
+        radius, first = options['radius'], options['first']
+        self.report("indeks", [self.timed(geo.near, lat, lng, radius, first) for lat, lng in points])
+
+        def graphql(lat, lng):
+            request = RequestFactory().post('/graphql/')
+            request.user = AnonymousUser()
+            result = schema.execute(QUERY, context_value=request, variable_values={'lat': lat, 'lng': lng, 'radius': radius, 'first': first})
+            assert not result.errors, result.errors
+
+        self.report("GraphQL (restoranlar dahil)", [self.timed(graphql, lat, lng) for lat, lng in points])
+
+        if options['baseline']:
+            # İndeks olmadan: enlem/boylam aralığıyla veritabanından okuyup mesafeyi uygulamada hesaplamak
+            def bounding_box(lat, lng):
+                lat_span = radius / geo.KM_PER_DEGREE
+                lng_span = radius / (geo.KM_PER_DEGREE * math.cos(math.radians(lat)))
+                rows = Restaurant.objects.filter(
+                    latitude__range=(lat - lat_span, lat + lat_span), longitude__range=(lng - lng_span, lng + lng_span),
+                ).values_list('id', 'latitude', 'longitude')
+                return sorted((geo.distance_km(lat, lng, row[1], row[2]), row[0]) for row in rows)[:first]
+
+            self.report("enlem/boylam aralık sorgusu", [self.timed(bounding_box, lat, lng) for lat, lng in points[:options['baseline']]])
+
+    @staticmethod
+    def timed(function, *args):
+        started = time.perf_counter()
+        function(*args)
+        return (time.perf_counter() - started) * 1000
+
+    def report(self, label, timings):
+        percentiles = statistics.quantiles(timings, n=100) if len(timings) > 1 else timings * 99
+        self.stdout.write(
+            f"  {label}: p50={percentiles[49]:.2f} ms p95={percentiles[94]:.2f} ms p99={percentiles[98]:.2f} ms ({len(timings)} sorgu)"
+        )
+
+    def seed(self, rng, count, batch_size):
+        self.stdout.write(f"{count} restoran oluşturuluyor...")
+        for start in range(0, count, batch_size):
+            restaurants = []
+            for i in range(start, min(start + batch_size, count)):
+                latitude, longitude = random_point(rng)
+                restaurants.append(Restaurant(
+                    name=f'Konum Restoran {i}', address='Adres', phone='5550000000',
+                    latitude=latitude, longitude=longitude, delivery_radius_km=rng.choice((2, 3, 5, 8)),
+                ))
+            Restaurant.objects.bulk_create(restaurants)
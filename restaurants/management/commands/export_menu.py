@@ -0,0 +1,36 @@
+import sys
+import time
+from django.core.management.base import BaseCommand
+from restaurants.menu_io import FORMATS, detect_format, export_menu, write_rows
+
+
+class Command(BaseCommand):
+    help = "Menü öğelerini import_menu ile tekrar içe aktarılabilecek CSV veya JSONL olarak (parça parça okuyarak) dışa aktarır."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default='-', help="Dosya yolu; varsayılan standart çıktı")
+        parser.add_argument('--format', choices=FORMATS, help="Varsayılan: dosya uzantısından (.jsonl) veya csv")
+        parser.add_argument('--restaurant', type=int, action='append', dest='restaurant_ids', help="Sadece bu restoranın menüsü (tekrarlanabilir)")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        format = options['format'] or detect_format(path)
+        started = time.perf_counter()
+        count = 0
+
+        def counted(rows):
+            nonlocal count
+            for count, row in enumerate(rows, 1):
+                yield row
+
+        stream = sys.stdout if path == '-' else open(path, 'w', newline='', encoding='utf-8')
+        try:
+            write_rows(stream, counted(export_menu(options['restaurant_ids'])), format)
+        finally:
+            if stream is not sys.stdout:
+                stream.close()
+
+        elapsed = time.perf_counter() - started
+        # Standart çıktıya veri yazılıyorsa özet stderr'e yazılır
+        output = self.stderr if path == '-' else self.stdout
+        output.write(f"{count} menü öğesi ({elapsed:.1f}s, {count / elapsed if elapsed else 0:.0f} satır/s)")
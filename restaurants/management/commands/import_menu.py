@@ -0,0 +1,44 @@
+import sys
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from restaurants.menu_io import FORMATS, MenuImporter, detect_format, read_rows
+
+
+class Command(BaseCommand):
+    help = "Menü öğelerini CSV veya JSONL dosyasından (satır satır okuyarak) toplu içe aktarır."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Dosya yolu; '-' standart girdi")
+        parser.add_argument('--format', choices=FORMATS, help="Varsayılan: dosya uzantısından (.jsonl) veya csv")
+        parser.add_argument('--restaurant', type=int, help="Tüm satırlar bu restorana eklenir (dosyada restaurant_id gerekmez)")
+        parser.add_argument('--batch-size', type=int, default=settings.MENU_IMPORT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        format = options['format'] or detect_format(path)
+        started = time.perf_counter()
+        reported = 0
+
+        def progress(count):
+            nonlocal reported
+            # Yaklaşık her 100.000 satırda bir ilerleme yazılır
+            if count - reported >= 100000:
+                reported = count
+                self.stdout.write(f"  {count} satır ({count / (time.perf_counter() - started):.0f} satır/s)")
+
+        importer = MenuImporter(options['restaurant'], options['batch_size'], progress)
+        stream = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8')
+        try:
+            count = importer.run(read_rows(stream, format))
+        except Exception as error:
+            raise CommandError(f"İçe aktarma geri alındı: {error}")
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"{count} menü öğesi, {len(importer.restaurant_ids)} restoran, {importer.categories_created} yeni kategori "
+            f"({elapsed:.1f}s, {count / elapsed if elapsed else 0:.0f} satır/s)"
+        )
@@ -0,0 +1,32 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from restaurants.models import MenuItem
+from restaurants.thumbnails import process_pending
+
+
+class Command(BaseCommand):
+    help = "Yüklenen menü görsellerinin WebP/JPEG küçük boyutlu varyantlarını üretir."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Bekleyen görsel kalmayınca çık")
+        parser.add_argument('--batch-size', type=int, default=settings.MENU_IMAGE_BATCH_SIZE)
+        parser.add_argument('--interval', type=float, default=settings.MENU_IMAGE_POLL_INTERVAL, help="Bekleyen yokken bekleme süresi (saniye)")
+        parser.add_argument('--rebuild', action='store_true', help="Tüm görselleri yeniden işle (ör. MENU_IMAGE_WIDTHS değiştiğinde)")
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            count = MenuItem.objects.exclude(image='').exclude(image__isnull=True).update(thumbnails_pending=True)
+            self.stdout.write(f"{count} görsel yeniden işlenecek")
+
+        while True:
+            started = time.perf_counter()
+            processed, failed = process_pending(options['batch_size'])
+            if processed or failed:
+                self.stdout.write(f"{len(processed)} görsel işlendi, {len(failed)} hatalı ({time.perf_counter() - started:.2f}s)")
+                for item, error in failed:
+                    self.stderr.write(f"  menü öğesi #{item.pk}: {error}")
+            elif options['once']:
+                break
+            else:
+                time.sleep(options['interval'])
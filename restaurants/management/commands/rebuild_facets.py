@@ -0,0 +1,22 @@
+import time
+from django.core.management.base import BaseCommand
+from restaurants import facets
+from restaurants.models import MenuFacet, RestaurantFacet
+from yemeksepeti_clone.cache import invalidate_restaurant
+
+
+class Command(BaseCommand):
+    help = "Filtre yüzeyi sayaçlarını baştan hesaplar (sinyal çalıştırmayan toplu yazmalardan sonra)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--restaurant', type=int, action='append', dest='restaurant_ids', help="Sadece bu restoranın menü sayaçları (tekrarlanabilir)")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        facets.rebuild(options['restaurant_ids'])
+        # Tüm sayaçlar yenilendiğinde önbellekteki menü yüzeyleri GRAPHQL_CACHE_TIMEOUT ile düşer
+        for restaurant_id in options['restaurant_ids'] or [None]:
+            invalidate_restaurant(restaurant_id)
+        self.stdout.write(
+            f"{MenuFacet.objects.count()} menü, {RestaurantFacet.objects.count()} restoran sayacı ({time.perf_counter() - started:.1f}s)"
+        )
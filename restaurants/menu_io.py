@@ -0,0 +1,165 @@
+import csv
+import json
+from decimal import Decimal, InvalidOperation
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+from restaurants import facets
+from restaurants.models import MenuItem, MenuItemCategory, Restaurant
+from restaurants.signals import menu_items_imported
+from yemeksepeti_clone.cache import invalidate_restaurant
+
+# Dışa aktarılan dosya aynı sütunlarla tekrar içe aktarılabilir (kategori adıyla taşınır)
+FIELDS = ('restaurant_id', 'category', 'name', 'description', 'price')
+FORMATS = ('csv', 'jsonl')
+MAX_PRICE = Decimal('99999999.99')  # DecimalField(max_digits=10, decimal_places=2)
+CENT = Decimal('0.01')
+
+
+def detect_format(path):
+    return 'jsonl' if path.endswith(('.jsonl', '.ndjson', '.json')) else 'csv'
+
+
+# Satırlar dosyadan tek tek okunur; dosyanın tamamı belleğe alınmaz
+def read_rows(stream, format):
+    if format == 'csv':
+        yield from csv.DictReader(stream)
+        return
+    for number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        if not isinstance(row, dict):
+            raise Exception(f"{number}. satır geçerli bir JSON nesnesi değil.")
+        yield row
+
+
+def write_rows(stream, rows, format):
+    if format == 'csv':
+        writer = csv.DictWriter(stream, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+        return
+    for row in rows:
+        stream.write(json.dumps(row, ensure_ascii=False) + '\n')
+
+
+# (restaurant_id, id) sırasıyla partiler halinde okunur; MySQL sürücüsü iterator() ile bile sonucun
+# tamamını belleğe aldığı için tek sorgu yerine keyset sayfalama kullanılır
+def export_menu(restaurant_ids=None, batch_size=None):
+    batch_size = batch_size or settings.MENU_IMPORT_BATCH_SIZE
+    menu_items = MenuItem.objects.order_by('restaurant_id', 'id')
+    if restaurant_ids:
+        menu_items = menu_items.filter(restaurant_id__in=restaurant_ids)
+    menu_items = menu_items.values_list('restaurant_id', 'id', 'category__name', 'name', 'description', 'price')
+    batch = menu_items[:batch_size]
+    while batch:
+        rows = list(batch)
+        for restaurant_id, _, category, name, description, price in rows:
+            yield {'restaurant_id': restaurant_id, 'category': category or '', 'name': name, 'description': description, 'price': str(price)}
+        if len(rows) < batch_size:
+            break
+        restaurant_id, last_id = rows[-1][:2]
+        # restaurant_id >= r aralık taraması yapılabilir; (r > ... OR r = ... AND id > ...) tüm indeksi tarar
+        batch = menu_items.filter(restaurant_id__gte=restaurant_id).exclude(restaurant_id=restaurant_id, id__lte=last_id)[:batch_size]
+
+
+def _category_key(name):
+    return name.strip().casefold()
+
+
+class MenuImporter:
+    """
+    Menü öğelerini MENU_IMPORT_BATCH_SIZE'lık partilerle bulk_create ile tek işlemde ekler; bir satır hatalıysa
+    hiçbir satır eklenmez. Kategoriler başta tek sorguyla okunan ad -> id eşlemesinden bulunur (olmayan kategori
+    oluşturulur), restoranlar parti başına tek sorguyla doğrulanır. bulk_create kayıt sinyallerini çalıştırmadığı
+    için filtre sayaçları sonda yeniden hesaplanır, arama ve otomatik tamamlama menu_items_imported ile güncellenir.
+    restaurant_id verilirse tüm satırlar bu restorana eklenir (satırdaki restaurant_id başka olamaz).
+    """
+
+    def __init__(self, restaurant_id=None, batch_size=None, progress=None):
+        self.restaurant_id = int(restaurant_id) if restaurant_id is not None else None
+        self.batch_size = batch_size or settings.MENU_IMPORT_BATCH_SIZE
+        self.progress = progress  # her partiden sonra toplam satır sayısıyla çağrılır
+        self.categories = {}  # _category_key(ad) -> id
+        self.restaurant_ids = set()  # doğrulanmış restoranlar
+        self.count = 0
+        self.categories_created = 0
+
+    def run(self, rows):
+        with transaction.atomic():
+            # Sonradan eklenen öğeler bu id'den büyüktür (bulk_create her veritabanında id döndürmez)
+            last_id = MenuItem.objects.aggregate(last=Max('id'))['last'] or 0
+            # Aynı adlı birden fazla kategori varsa en eskisi kullanılır
+            for pk, name in MenuItemCategory.objects.order_by('-pk').values_list('pk', 'name'):
+                self.categories[_category_key(name)] = pk
+
+            batch = []
+            for number, row in enumerate(rows, 1):
+                batch.append(self.parse(number, row))
+                if len(batch) >= self.batch_size:
+                    self.write(batch)
+                    batch = []
+            if batch:
+                self.write(batch)
+
+            restaurant_ids = sorted(self.restaurant_ids)
+            for i in range(0, len(restaurant_ids), self.batch_size):
+                facets.rebuild(restaurant_ids[i:i + self.batch_size])
+            menu_items_imported.send(sender=MenuItem, menu_items=MenuItem.objects.filter(pk__gt=last_id))
+
+        for restaurant_id in self.restaurant_ids:
+            invalidate_restaurant(restaurant_id)
+        return self.count
+
+    def parse(self, number, row):
+        def field(name):
+            value = row.get(name)
+            return '' if value is None else str(value).strip()
+
+        restaurant_id = field('restaurant_id')
+        try:
+            restaurant_id = int(restaurant_id) if restaurant_id else self.restaurant_id
+        except ValueError:
+            raise Exception(f"{number}. satır: geçersiz restoran.")
+        if restaurant_id is None or (self.restaurant_id is not None and restaurant_id != self.restaurant_id):
+            raise Exception(f"{number}. satır: geçersiz restoran.")
+
+        name = field('name')
+        if not name or len(name) > MenuItem._meta.get_field('name').max_length:
+            raise Exception(f"{number}. satır: geçersiz ürün adı.")
+        try:
+            price = Decimal(field('price')).quantize(CENT)
+        except InvalidOperation:
+            price = None
+        if price is None or not price.is_finite() or not 0 < price <= MAX_PRICE:
+            raise Exception(f"{number}. satır: geçersiz fiyat.")
+
+        return MenuItem(
+            restaurant_id=restaurant_id, category_id=self.category_id(field('category')),
+            name=name, description=field('description'), price=price,
+        )
+
+    def category_id(self, name):
+        if not name:
+            return None
+        key = _category_key(name)
+        if key not in self.categories:
+            self.categories[key] = MenuItemCategory.objects.create(name=name).pk
+            self.categories_created += 1
+        return self.categories[key]
+
+    def write(self, batch):
+        unknown = {item.restaurant_id for item in batch} - self.restaurant_ids
+        if unknown:
+            found = set(Restaurant.objects.filter(pk__in=unknown).values_list('pk', flat=True))
+            if unknown - found:
+                raise Exception(f"Restoran bulunamadı: {min(unknown - found)}")
+            self.restaurant_ids |= found
+        MenuItem.objects.bulk_create(batch)
+        self.count += len(batch)
+        if self.progress is not None:
+            self.progress(self.count)
@@ -0,0 +1,25 @@
+# Generated by Django 5.1 on 2026-10-18 10:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurants', '0008_rename_createdat_menuitem_created_at_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='menuitem',
+            index=models.Index(fields=['restaurant', 'category'], name='menuitem_rest_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='menuitem',
+            index=models.Index(fields=['restaurant', 'created_at', 'id'], name='menuitem_rest_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='restaurant',
+            index=models.Index(fields=['created_at', 'id'], name='restaurant_created_idx'),
+        ),
+    ]
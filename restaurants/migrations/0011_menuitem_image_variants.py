@@ -0,0 +1,29 @@
+# Generated by Django 5.1 on 2026-10-18 11:01
+
+from django.db import migrations, models
+
+
+# Mevcut görseller process_thumbnails işçisi tarafından işlenmek üzere işaretlenir
+def mark_existing_images(apps, schema_editor):
+    MenuItem = apps.get_model('restaurants', 'MenuItem')
+    MenuItem.objects.exclude(image='').exclude(image__isnull=True).update(thumbnails_pending=True)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurants', '0010_restaurant_owner'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='menuitem',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='menuitem',
+            name='thumbnails_pending',
+            field=models.BooleanField(db_index=True, default=False),
+        ),
+        migrations.RunPython(mark_existing_images, migrations.RunPython.noop),
+    ]
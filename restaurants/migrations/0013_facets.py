@@ -0,0 +1,77 @@
+# Generated by Django 5.1 on 2026-10-18 12:12
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import BooleanField, Count, ExpressionWrapper, Q
+
+
+# Mevcut kayıtların sayaçları tek seferlik GROUP BY ile doldurulur; sonrasını sinyaller günceller
+def count_existing(apps, schema_editor):
+    MenuItem = apps.get_model('restaurants', 'MenuItem')
+    MenuFacet = apps.get_model('restaurants', 'MenuFacet')
+    Restaurant = apps.get_model('restaurants', 'Restaurant')
+    RestaurantFacet = apps.get_model('restaurants', 'RestaurantFacet')
+
+    with_image = ExpressionWrapper(Q(image__isnull=False) & ~Q(image=''), output_field=BooleanField())
+    rows = (
+        MenuItem.objects.filter(category__isnull=False).annotate(with_image=with_image)
+        .values('restaurant_id', 'category_id', 'with_image').annotate(count=Count('id')).order_by()
+    )
+    MenuFacet.objects.bulk_create(
+        (MenuFacet(restaurant_id=row['restaurant_id'], category_id=row['category_id'], has_image=row['with_image'], item_count=row['count'])
+         for row in rows.iterator()),
+        batch_size=1000,
+    )
+    rows = Restaurant.objects.filter(category__isnull=False).values('category_id').annotate(count=Count('id')).order_by()
+    RestaurantFacet.objects.bulk_create(RestaurantFacet(category_id=row['category_id'], restaurant_count=row['count']) for row in rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurants', '0012_restaurant_location'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MenuFacet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('has_image', models.BooleanField()),
+                ('item_count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RestaurantFacet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('restaurant_count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='restaurant',
+            index=models.Index(fields=['category', 'created_at', 'id'], name='restaurant_cat_created_idx'),
+        ),
+        migrations.AddField(
+            model_name='menufacet',
+            name='category',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='menu_facets', to='restaurants.menuitemcategory'),
+        ),
+        migrations.AddField(
+            model_name='menufacet',
+            name='restaurant',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='menu_facets', to='restaurants.restaurant'),
+        ),
+        migrations.AddField(
+            model_name='restaurantfacet',
+            name='category',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='facet', to='restaurants.restaurantcategory'),
+        ),
+        migrations.AddConstraint(
+            model_name='menufacet',
+            constraint=models.UniqueConstraint(fields=('restaurant', 'category', 'has_image'), name='menufacet_unique'),
+        ),
+        migrations.RunPython(count_existing, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,7 @@
 import os
+from django.conf import settings
 from django.db import models
+from yemeksepeti_clone.media import hashed_name
 
 # Restoranlar için kategori modeli
 class RestaurantCategory(models.Model):
@@ -21,7 +23,7 @@ class MenuItemCategory(models.Model):
 # Dosya yolu fonksiyonu
 def upload_to(instance, filename):
     restaurant_name = instance.restaurant.name.replace(" ", "_")
-    filename_cleaned = filename.replace(" ", "_")
+    filename_cleaned = hashed_name(filename.replace(" ", "_"), instance.image)
     return f'Proje_Yemekleri/{restaurant_name}/{filename_cleaned}'
 
 
@@ -31,9 +33,24 @@ class Restaurant(models.Model):
     address = models.CharField(max_length=255)
     phone = models.CharField(max_length=15)
     category = models.ForeignKey(RestaurantCategory, on_delete=models.CASCADE, related_name='restaurants', null=True, blank=True)
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, related_name='owned_restaurants', null=True, blank=True)
+    # Konum (WGS84 derece) ve teslimat alanı: delivery_area ([[enlem, boylam], ...] çokgen) verilmişse
+    # teslimat onunla, verilmemişse konumdan delivery_radius_km yarıçapla belirlenir
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    delivery_radius_km = models.FloatField(default=5)
+    delivery_area = models.JSONField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # allRestaurants keyset sayfalaması (created_at, id) sırasıyla okur
+            models.Index(fields=['created_at', 'id'], name='restaurant_created_idx'),
+            # allRestaurants(categoryId) aynı sırayla kategori içinde okur
+            models.Index(fields=['category', 'created_at', 'id'], name='restaurant_cat_created_idx'),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -45,8 +62,61 @@ class MenuItem(models.Model):
     description = models.TextField(blank=True)
     price = models.DecimalField(max_digits=10, decimal_places=2)
     image = models.ImageField(upload_to=upload_to, null=True, blank=True)  # Özelleştirilmiş upload_to fonksiyonu
+    # Küçültülmüş kopyalar: {'source': görsel adı, 'widths': {'320': {'webp': yol, 'jpeg': yol}, ...}}
+    image_variants = models.JSONField(default=dict, blank=True)
+    thumbnails_pending = models.BooleanField(default=False, db_index=True)  # process_thumbnails işçisi bekleyenleri işler
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # GraphQL'de image alanı varyantlarla birlikte çözülür; optimizer only() listesine ekler
+    query_dependencies = {'image': ('image_variants',)}
+
+    class Meta:
+        indexes = [
+            # Restoran menüsü kategoriye göre gruplanır
+            models.Index(fields=['restaurant', 'category'], name='menuitem_rest_category_idx'),
+            # allMenuItems(restaurantId) keyset sayfalaması
+            models.Index(fields=['restaurant', 'created_at', 'id'], name='menuitem_rest_created_idx'),
+        ]
+
     def __str__(self):
         return self.name
+
+    # Yeni yüklenen görselin varyantları istek dışında (process_thumbnails) üretilir
+    def save(self, *args, **kwargs):
+        if self.image and not self.image._committed:
+            self.thumbnails_pending = True
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'thumbnails_pending'}
+        super().save(*args, **kwargs)
+
+    # İstenen genişliği karşılayan en küçük varyant (yoksa en büyüğü); varyant yoksa orijinal görsel
+    def image_variant(self, width, image_format):
+        variants = self.image_variants or {}
+        if width is None or variants.get('source') != self.image.name or not variants.get('widths'):
+            return self.image.name
+        widths = sorted(int(w) for w in variants['widths'])
+        chosen = next((w for w in widths if w >= width), widths[-1])
+        return variants['widths'][str(chosen)].get(image_format, self.image.name)
+
+
+# Filtre yüzeyleri (facet) için önceden hesaplanmış sayaçlar. Kayıtlar yazılırken sinyallerle F() farkıyla
+# güncellenir (restaurants/facets.py); listeleme her istekte COUNT(*) GROUP BY çalıştırmaz.
+# Kategorisiz kayıtlar sayılmaz.
+class RestaurantFacet(models.Model):
+    category = models.OneToOneField(RestaurantCategory, on_delete=models.CASCADE, related_name='facet')
+    restaurant_count = models.IntegerField(default=0)
+
+
+# Restoran menüsündeki kategori başına öğe sayısı, görselli/görselsiz ayrı satırlarda
+class MenuFacet(models.Model):
+    restaurant = models.ForeignKey(Restaurant, on_delete=models.CASCADE, related_name='menu_facets')
+    category = models.ForeignKey(MenuItemCategory, on_delete=models.CASCADE, related_name='menu_facets')
+    has_image = models.BooleanField()
+    item_count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['restaurant', 'category', 'has_image'], name='menufacet_unique'),
+        ]
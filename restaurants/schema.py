@@ -1,13 +1,33 @@
+import io
 import graphene
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from graphene_django import DjangoObjectType
+from restaurants import facets, geo
+from restaurants.filters import MenuItemFilter, RestaurantFilter, apply_filter
+from restaurants.menu_io import MenuImporter, read_rows
 from restaurants.models import Restaurant, MenuItem, RestaurantCategory, MenuItemCategory
 from yemeksepeti_clone.decorator import roles_required
+from yemeksepeti_clone.permissions import can_manage_restaurant
+from yemeksepeti_clone.loaders import get_loaders, is_async
+from yemeksepeti_clone.media import media_url
+from yemeksepeti_clone.optimizer import optimize
+from yemeksepeti_clone.pagination import paginate
+from yemeksepeti_clone.cache import aquery_cache_key, aread_through, query_cache_key, read_through, restaurant_scope, invalidate_restaurant
 
 # Restaurant modelini GraphQL için tanımlama
 class RestaurantType(DjangoObjectType):
     class Meta:
         model = Restaurant
-        fields = ("id", "name", "address", "phone", "menu_items")
+        fields = ("id", "name", "address", "phone", "menu_items", "latitude", "longitude", "delivery_radius_km", "delivery_area")
+
+    # Menü öğeleri tüm restoranlar için tek sorguda yüklenir
+    def resolve_menu_items(self, info):
+        return get_loaders(info).menu_items_by_restaurant.load(self.id)
+
+class ImageFormat(graphene.Enum):
+    WEBP = 'webp'
+    JPEG = 'jpeg'
 
 # Menü öğelerini GraphQL için tanımlama
 class MenuItemType(DjangoObjectType):
@@ -15,39 +35,169 @@ class MenuItemType(DjangoObjectType):
         model = MenuItem
         fields = ("id", "name", "description", "price", "restaurant", "category", "image")
 
-    def resolve_image(self, info):
+    # width verilirse bu genişliği karşılayan en küçük varyant, verilmezse orijinal görsel döner
+    image = graphene.String(width=graphene.Int(), format=ImageFormat(default_value=ImageFormat.WEBP.value))
+
+    def resolve_restaurant(self, info):
+        return get_loaders(info).restaurant.load(self.restaurant_id)
+
+    def resolve_category(self, info):
+        return get_loaders(info).menu_item_category.load(self.category_id)
+
+    def resolve_image(self, info, width=None, format=ImageFormat.WEBP.value):
         if self.image:
-            return info.context.build_absolute_uri(self.image.url)
+            return media_url(info.context, self.image_variant(width, getattr(format, 'value', format)))
         return None
 
+# Filtre yüzeyi: kategori ve bu kategorideki kayıt sayısı
+class CategoryFacetType(graphene.ObjectType):
+    id = graphene.ID()
+    name = graphene.String()
+    count = graphene.Int()
+
+# Sayfalı listeler için Relay connection tipleri
+class RestaurantConnection(graphene.relay.Connection):
+    class Meta:
+        node = RestaurantType
+
+    # Restoran kategorisi başına restoran sayısı (menü kategorisi filtresi sayılara yansımaz)
+    facets = graphene.List(CategoryFacetType)
+
+    def resolve_facets(self, info):
+        return self.load_facets(info)
+
+class MenuItemConnection(graphene.relay.Connection):
+    class Meta:
+        node = MenuItemType
+
+    # Menü kategorisi başına öğe sayısı; görsel filtresi yansır, fiyat aralığı ve seçili kategori yansımaz
+    facets = graphene.List(CategoryFacetType)
+
+    def resolve_facets(self, info):
+        return self.load_facets(info)
+
+# Konuma yakın restoran: uzaklık ve restoranın bu konuma teslimat yapıp yapmadığı
+class NearbyRestaurantType(graphene.ObjectType):
+    restaurant = graphene.Field(RestaurantType)
+    distance_km = graphene.Float()
+    delivers = graphene.Boolean()
+
+    def resolve_restaurant(self, info):
+        return get_loaders(info).restaurant.load(self['restaurant_id'])
+
 # Restoran kategorilerini GraphQL için tanımlama
 class RestaurantCategoryType(DjangoObjectType):
     class Meta:
         model = RestaurantCategory
         fields = ("id", "name")
 
+# Menü öğesi kategorilerini GraphQL için tanımlama
+class MenuItemCategoryType(DjangoObjectType):
+    class Meta:
+        model = MenuItemCategory
+        fields = ("id", "name")
+
 # Sorgular
 class Query(graphene.ObjectType):
     # Tüm restoranları listeleme (Kullanıcılar da görebilir)
-    all_restaurants = graphene.List(RestaurantType)
-
-    def resolve_all_restaurants(self, info):
-        return Restaurant.objects.all()
+    all_restaurants = graphene.Field(
+        RestaurantConnection, first=graphene.Int(), after=graphene.String(),
+        category_id=graphene.Int(), menu_category_id=graphene.Int(),
+    )
+
+    def resolve_all_restaurants(self, info, first=None, after=None, category_id=None, menu_category_id=None):
+        queryset = apply_filter(RestaurantFilter, Restaurant.objects.all(), category_id=category_id, menu_category_id=menu_category_id)
+        connection = paginate(
+            queryset, RestaurantConnection, info, first, after,
+            cache_scopes=['restaurants'], cache_parts=(category_id, menu_category_id),
+        )
+        return facets.attach(info, connection, facets.restaurant_facets(), ['restaurants'])
+
+    # Konuma yakın restoranlar, uzaklığa göre sıralı (Herkes görebilir). Adaylar bellekteki ızgara
+    # indeksinden bulunur, veritabanına sadece sonuç restoranlarını yüklemek için tek sorgu gider.
+    restaurants_near = graphene.List(
+        NearbyRestaurantType, lat=graphene.Float(required=True), lng=graphene.Float(required=True),
+        radius_km=graphene.Float(), first=graphene.Int(), delivers_only=graphene.Boolean(default_value=False),
+    )
+
+    def resolve_restaurants_near(self, info, lat, lng, radius_km=None, first=None, delivers_only=False):
+        geo.validate_location(lat, lng, radius_km)
+        radius_km = settings.GEO_DEFAULT_RADIUS_KM if radius_km is None else radius_km
+        first = min(settings.GRAPHQL_PAGE_SIZE if first is None else first, settings.GRAPHQL_MAX_PAGE_SIZE)
+        if first < 0:
+            raise Exception("first negatif olamaz.")
+        if first == 0:
+            return []
+        if is_async(info):
+            return Query.aresolve_restaurants_near(info, lat, lng, radius_km, first, delivers_only)
+        return to_nearby(info, geo.near(lat, lng, radius_km, first, delivers_only))
+
+    @staticmethod
+    async def aresolve_restaurants_near(info, lat, lng, radius_km, first, delivers_only):
+        # İndeks ilk kullanımda veya günlükte değişiklik varsa veritabanından okur
+        hits = await sync_to_async(geo.near)(lat, lng, radius_km, first, delivers_only)
+        return to_nearby(info, hits)
 
     # Belirli bir restoranı ID ile getirme (Herkes görebilir)
     restaurant = graphene.Field(RestaurantType, id=graphene.Int(required=True))
 
     def resolve_restaurant(self, info, id):
-        try:
-            return Restaurant.objects.get(pk=id)
-        except Restaurant.DoesNotExist:
+        if is_async(info):
+            return Query.aresolve_restaurant(info, id)
+
+        def fetch_restaurant():
+            return optimize(Restaurant.objects.all(), info).filter(pk=id).first()
+
+        key = query_cache_key(info, [restaurant_scope(id)], id)
+        restaurant = read_through(key, fetch_restaurant)
+        if restaurant is None:
             raise Exception("Restoran bulunamadı.")
+        get_loaders(info).register([restaurant])
+        return restaurant
 
-    # Menü öğelerini listeleme (Herkes görebilir)
-    all_menu_items = graphene.List(MenuItemType, restaurant_id=graphene.Int(required=True))
+    @staticmethod
+    async def aresolve_restaurant(info, id):
+        async def fetch_restaurant():
+            return await optimize(Restaurant.objects.all(), info).filter(pk=id).afirst()
 
-    def resolve_all_menu_items(root, info, restaurant_id):
-        return MenuItem.objects.filter(restaurant_id=restaurant_id)
+        key = await aquery_cache_key(info, [restaurant_scope(id)], id)
+        restaurant = await aread_through(key, fetch_restaurant)
+        if restaurant is None:
+            raise Exception("Restoran bulunamadı.")
+        get_loaders(info).register([restaurant])
+        return restaurant
+
+    # Menü öğelerini listeleme (Herkes görebilir)
+    all_menu_items = graphene.Field(
+        MenuItemConnection, restaurant_id=graphene.Int(required=True), first=graphene.Int(), after=graphene.String(),
+        category_id=graphene.Int(), min_price=graphene.Float(), max_price=graphene.Float(), has_image=graphene.Boolean(),
+    )
+
+    def resolve_all_menu_items(root, info, restaurant_id, first=None, after=None, category_id=None, min_price=None, max_price=None, has_image=None):
+        queryset = apply_filter(
+            MenuItemFilter, MenuItem.objects.filter(restaurant_id=restaurant_id),
+            category_id=category_id, min_price=min_price, max_price=max_price, has_image=has_image,
+        )
+        scopes = [restaurant_scope(restaurant_id)]
+        connection = paginate(
+            queryset, MenuItemConnection, info, first, after,
+            cache_scopes=scopes, cache_parts=(category_id, min_price, max_price, has_image),
+        )
+        return facets.attach(info, connection, facets.menu_facets(restaurant_id, has_image), scopes, has_image)
+
+# Sonuçlardaki restoranlar loader'a kuyruklanır; ilk restaurant alanı hepsini tek sorguda yükler
+def to_nearby(info, hits):
+    get_loaders(info).restaurant.schedule([restaurant_id for _, restaurant_id, _ in hits])
+    return [
+        {'restaurant_id': restaurant_id, 'distance_km': round(distance, 3), 'delivers': delivers}
+        for distance, restaurant_id, delivers in hits
+    ]
+
+def get_restaurant_category(category_id):
+    try:
+        return RestaurantCategory.objects.get(pk=category_id)
+    except RestaurantCategory.DoesNotExist:
+        raise Exception("Kategori bulunamadı.")
 
 # Restoran oluşturma mutasyonu (Sadece Restoran Sahipleri ve Admin)
 class CreateRestaurant(graphene.Mutation):
@@ -55,17 +205,26 @@ class CreateRestaurant(graphene.Mutation):
         name = graphene.String(required=True)
         address = graphene.String(required=True)
         phone = graphene.String(required=True)
+        latitude = graphene.Float()
+        longitude = graphene.Float()
+        delivery_radius_km = graphene.Float()
+        delivery_area = graphene.List(graphene.List(graphene.Float))  # [[enlem, boylam], ...]
+        category_id = graphene.ID()
 
     restaurant = graphene.Field(RestaurantType)
 
     @roles_required("RESTAURANT_OWNER")
-    def mutate(self, info, name, address, phone):
+    def mutate(self, info, name, address, phone, latitude=None, longitude=None, delivery_radius_km=None, delivery_area=None, category_id=None):
         user = info.context.user
-        # Restoran sahibi, sadece kendi restoranını oluşturabilir
-        if user.is_restaurant_owner:
-            restaurant = Restaurant.objects.create(name=name, address=address, phone=phone, owner=user)
-            return CreateRestaurant(restaurant=restaurant)
-        raise Exception("Bu işlemi yapma yetkiniz yok.")
+        geo.validate_location(latitude, longitude, delivery_radius_km, delivery_area)
+        location = {'latitude': latitude, 'longitude': longitude, 'delivery_area': delivery_area or None}
+        if delivery_radius_km is not None:
+            location['delivery_radius_km'] = delivery_radius_km
+        category = get_restaurant_category(category_id) if category_id else None
+        # Oluşturan kullanıcı restoranın sahibi olur (rol önbelleği sinyal ile yenilenir)
+        restaurant = Restaurant.objects.create(name=name, address=address, phone=phone, owner=user, category=category, **location)
+        invalidate_restaurant()
+        return CreateRestaurant(restaurant=restaurant)
 
 # Restoran güncelleme mutasyonu (Sadece Restoran Sahipleri ve Admin)
 class UpdateRestaurant(graphene.Mutation):
@@ -74,27 +233,43 @@ class UpdateRestaurant(graphene.Mutation):
         name = graphene.String()
         address = graphene.String()
         phone = graphene.String()
+        latitude = graphene.Float()
+        longitude = graphene.Float()
+        delivery_radius_km = graphene.Float()
+        delivery_area = graphene.List(graphene.List(graphene.Float))  # boş liste çokgeni kaldırır
+        category_id = graphene.ID()
 
     restaurant = graphene.Field(RestaurantType)
 
     @roles_required("RESTAURANT_OWNER")
-    def mutate(self, info, id, name=None, address=None, phone=None):
+    def mutate(self, info, id, name=None, address=None, phone=None, latitude=None, longitude=None, delivery_radius_km=None, delivery_area=None, category_id=None):
+        # Sahiplik istek başına hesaplanan yetki kümesinden kontrol edilir, restoran sorgulanmadan
+        if not can_manage_restaurant(info.context, id):
+            raise Exception("Bu restorana ait bilgileri güncelleme yetkiniz yok.")
         try:
             restaurant = Restaurant.objects.get(pk=id)
         except Restaurant.DoesNotExist:
             raise Exception("Restoran bulunamadı.")
         
-        user = info.context.user
-        if restaurant.owner != user and not user.isAdmin: 
-            raise Exception("Bu restorana ait bilgileri güncelleme yetkiniz yok.")
-        
         if name:
             restaurant.name = name
         if address:
             restaurant.address = address
         if phone:
             restaurant.phone = phone
+        geo.validate_location(latitude, longitude, delivery_radius_km, delivery_area)
+        if latitude is not None:
+            restaurant.latitude = latitude
+        if longitude is not None:
+            restaurant.longitude = longitude
+        if delivery_radius_km is not None:
+            restaurant.delivery_radius_km = delivery_radius_km
+        if delivery_area is not None:
+            restaurant.delivery_area = delivery_area or None
+        if category_id:
+            restaurant.category = get_restaurant_category(category_id)
         restaurant.save()
+        invalidate_restaurant(restaurant.id)
         return UpdateRestaurant(restaurant=restaurant)
 
 # Restoran silme mutasyonu (Sadece Admin)
@@ -109,6 +284,7 @@ class DeleteRestaurant(graphene.Mutation):
         try:
             restaurant = Restaurant.objects.get(pk=id)
             restaurant.delete()
+            invalidate_restaurant(id)
             return DeleteRestaurant(success=True)
         except Restaurant.DoesNotExist:
             raise Exception("Restoran bulunamadı.")
@@ -142,6 +318,7 @@ class UpdateCategory(graphene.Mutation):
         if name:
             category.name = name
         category.save()
+        invalidate_restaurant()  # restoran filtre yüzeylerinde kategori adı da döner
         return UpdateCategory(category=category)
 
 # Kategori silme mutasyonu (Sadece Admin)
@@ -156,6 +333,7 @@ class DeleteCategory(graphene.Mutation):
         try:
             category = RestaurantCategory.objects.get(pk=id)
             category.delete()
+            invalidate_restaurant()
             return DeleteCategory(success=True)
         except RestaurantCategory.DoesNotExist:
             raise Exception("Kategori bulunamadı.")
@@ -173,11 +351,10 @@ class CreateMenuItem(graphene.Mutation):
 
     @roles_required("RESTAURANT_OWNER")
     def mutate(self, info, restaurant_id, name, description, price, category_id):
-        user = info.context.user
+        if not can_manage_restaurant(info.context, restaurant_id):
+            raise Exception("Bu restorana ait menüye ekleme yapma yetkiniz yok.")
         try:
-            restaurant = Restaurant.objects.get(pk=restaurant_id)
-            if restaurant.owner != user and not user.isAdmin: 
-                raise Exception("Bu restorana ait menüye ekleme yapma yetkiniz yok.")
+            restaurant = Restaurant.objects.only('id').get(pk=restaurant_id)
         except Restaurant.DoesNotExist:
             raise Exception("Restoran bulunamadı.")
         
@@ -190,6 +367,7 @@ class CreateMenuItem(graphene.Mutation):
             raise Exception("Geçersiz ürün bilgileri.")
         
         menu_item = MenuItem.objects.create(restaurant=restaurant, category=category, name=name, description=description, price=price)
+        invalidate_restaurant(restaurant.id)
         return CreateMenuItem(menu_item=menu_item)
 
 # Menü öğesi güncelleme mutasyonu (Sadece Restoran Sahipleri ve Admin)
@@ -209,6 +387,8 @@ class UpdateMenuItem(graphene.Mutation):
             menu_item = MenuItem.objects.get(pk=id)
         except MenuItem.DoesNotExist:
             raise Exception("Menü öğesi bulunamadı.")
+        if not can_manage_restaurant(info.context, menu_item.restaurant_id):
+            raise Exception("Bu restorana ait menüyü güncelleme yetkiniz yok.")
         
         if name:
             menu_item.name = name
@@ -224,6 +404,7 @@ class UpdateMenuItem(graphene.Mutation):
                 raise Exception("Kategori bulunamadı.")
         
         menu_item.save()
+        invalidate_restaurant(menu_item.restaurant_id)
         return UpdateMenuItem(menu_item=menu_item)
 
 # Menü öğesi silme mutasyonu (Sadece Admin)
@@ -238,10 +419,37 @@ class DeleteMenuItem(graphene.Mutation):
         try:
             menu_item = MenuItem.objects.get(pk=id)
             menu_item.delete()
+            invalidate_restaurant(menu_item.restaurant_id)
             return DeleteMenuItem(success=True)
         except MenuItem.DoesNotExist:
             raise Exception("Menü öğesi bulunamadı.")
 
+class MenuFileFormat(graphene.Enum):
+    CSV = 'csv'
+    JSONL = 'jsonl'
+
+# Menüyü toplu içe aktarma (Sadece Restoran Sahipleri ve Admin). content: başlık satırlı CSV
+# (category,name,description,price) veya satır başına bir JSON nesnesi; hatalı satırda hiçbir öğe eklenmez.
+class ImportMenu(graphene.Mutation):
+    class Arguments:
+        restaurant_id = graphene.ID(required=True)
+        content = graphene.String(required=True)
+        format = MenuFileFormat(default_value=MenuFileFormat.CSV.value)
+
+    imported = graphene.Int()
+    categories_created = graphene.Int()
+
+    @roles_required("RESTAURANT_OWNER")
+    def mutate(self, info, restaurant_id, content, format=MenuFileFormat.CSV.value):
+        if not can_manage_restaurant(info.context, restaurant_id):
+            raise Exception("Bu restorana ait menüye ekleme yapma yetkiniz yok.")
+        try:
+            importer = MenuImporter(restaurant_id)
+        except ValueError:
+            raise Exception("Restoran bulunamadı.")
+        imported = importer.run(read_rows(io.StringIO(content), getattr(format, 'value', format)))
+        return ImportMenu(imported=imported, categories_created=importer.categories_created)
+
 # Mutation sınıfı
 class Mutation(graphene.ObjectType):
     # Restoran işlemleri
@@ -258,3 +466,4 @@ class Mutation(graphene.ObjectType):
     create_menu_item = CreateMenuItem.Field()
     update_menu_item = UpdateMenuItem.Field()
     delete_menu_item = DeleteMenuItem.Field()
+    import_menu = ImportMenu.Field()
@@ -0,0 +1,83 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import Signal, receiver
+from restaurants import facets, geo
+from restaurants.models import MenuItem, Restaurant
+from yemeksepeti_clone.permissions import invalidate_permissions
+
+# Toplu içe aktarma (bulk_create) kayıt sinyallerini çalıştırmaz; eklenen öğelerin queryset'i
+# (menu_items) işlem içinde bu sinyalle bildirilir
+menu_items_imported = Signal()
+
+
+# Sahip değişirse eski sahibin de rol önbelleği silinmeli; kategori değişirse eski kategorinin sayacı azalır
+@receiver(pre_save, sender=Restaurant)
+def remember_previous_owner(sender, instance, **kwargs):
+    if instance.pk is not None and not instance._state.adding:
+        instance._previous_owner_id, instance._previous_category_id = (
+            Restaurant.objects.filter(pk=instance.pk).values_list('owner_id', 'category_id').first() or (None, None)
+        )
+
+
+@receiver(post_save, sender=Restaurant)
+@receiver(post_delete, sender=Restaurant)
+def invalidate_owner_permissions(sender, instance, **kwargs):
+    invalidate_permissions(instance.owner_id, getattr(instance, '_previous_owner_id', None))
+
+
+# Konum indeksi: değişen restoranın id'si commit sonrası günlüğe yazılır, işçiler konumunu yeniden okur
+@receiver(post_save, sender=Restaurant)
+def publish_location(sender, instance, created, update_fields=None, **kwargs):
+    if created and instance.latitude is None:
+        return
+    if update_fields is None or not set(geo.LOCATION_FIELDS).isdisjoint(update_fields):
+        restaurant_id = instance.pk
+        transaction.on_commit(lambda: geo.publish([restaurant_id]))
+
+
+@receiver(post_delete, sender=Restaurant)
+def publish_removed_location(sender, instance, **kwargs):
+    restaurant_id = instance.pk  # silme sonrası instance.pk None olur
+    transaction.on_commit(lambda: geo.publish([restaurant_id]))
+
+
+# Filtre yüzeyi sayaçları yazmayla aynı işlemde güncellenir (geri alınan işlem sayacı da geri alır)
+@receiver(post_save, sender=Restaurant)
+def count_restaurant(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        facets.bump_restaurant(instance.category_id, 1)
+    elif update_fields is None or not facets.RESTAURANT_FIELDS.isdisjoint(update_fields):
+        previous = getattr(instance, '_previous_category_id', None)
+        if previous != instance.category_id:
+            facets.bump_restaurant(previous, -1)
+            facets.bump_restaurant(instance.category_id, 1)
+
+
+@receiver(post_delete, sender=Restaurant)
+def uncount_restaurant(sender, instance, **kwargs):
+    facets.bump_restaurant(instance.category_id, -1)
+
+
+@receiver(pre_save, sender=MenuItem)
+def remember_previous_facet(sender, instance, update_fields=None, **kwargs):
+    instance._previous_facet = None
+    if not instance._state.adding and (update_fields is None or not facets.MENU_ITEM_FIELDS.isdisjoint(update_fields)):
+        row = MenuItem.objects.filter(pk=instance.pk).values_list('restaurant_id', 'category_id', 'image').first()
+        if row is not None and row[1] is not None:
+            instance._previous_facet = (row[0], row[1], bool(row[2]))
+
+
+@receiver(post_save, sender=MenuItem)
+def count_menu_item(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        facets.bump_menu(facets.menu_item_key(instance), 1)
+    elif update_fields is None or not facets.MENU_ITEM_FIELDS.isdisjoint(update_fields):
+        previous, current = getattr(instance, '_previous_facet', None), facets.menu_item_key(instance)
+        if previous != current:
+            facets.bump_menu(previous, -1)
+            facets.bump_menu(current, 1)
+
+
+@receiver(post_delete, sender=MenuItem)
+def uncount_menu_item(sender, instance, **kwargs):
+    facets.bump_menu(facets.menu_item_key(instance), -1)
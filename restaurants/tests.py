@@ -1,2 +1,577 @@
-from django.test import TestCase
+import json
+import os
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+from PIL import Image
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, RequestFactory, override_settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from restaurants import facets, geo
+from restaurants.menu_io import export_menu
+from restaurants.models import Restaurant, MenuItem, MenuItemCategory, MenuFacet, RestaurantCategory
+from restaurants.thumbnails import process_pending
+from search.index import search
+from users.models import User
+from yemeksepeti_clone.schema import schema
 
+
+ALL_RESTAURANTS_QUERY = '''
+    query {
+        allRestaurants(first: 100) {
+            edges {
+                node {
+                    id
+                    name
+                    menuItems {
+                        name
+                        category { name }
+                        restaurant { name }
+                    }
+                }
+            }
+        }
+    }
+'''
+
+
+def nodes(connection_data):
+    return [edge['node'] for edge in connection_data['edges']]
+
+
+class RestaurantQueryTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.category = MenuItemCategory.objects.create(name="Kebap")
+
+    def create_restaurants(self, count, items_per_restaurant=3):
+        for i in range(count):
+            restaurant = Restaurant.objects.create(name=f"Restoran {i}", address="Adres", phone="5551234567")
+            for j in range(items_per_restaurant):
+                MenuItem.objects.create(restaurant=restaurant, category=self.category, name=f"Yemek {j}", price=10)
+
+    def execute(self, query, variables=None):
+        request = RequestFactory().post('/graphql/')
+        request.user = AnonymousUser()
+        result = schema.execute(query, context_value=request, variable_values=variables)
+        self.assertIsNone(result.errors)
+        return result.data
+
+    def count_queries(self, query):
+        cache.clear()  # Doğrudan ORM ile yapılan yazmalar önbelleği geçersiz kılmaz
+        with CaptureQueriesContext(connection) as captured:
+            data = self.execute(query)
+        return len(captured), data
+
+    def test_all_restaurants_query_count_is_flat(self):
+        """Restoran sayısı artsa da sorgu sayısı sabit kalmalı"""
+        self.create_restaurants(2)
+        small_count, data = self.count_queries(ALL_RESTAURANTS_QUERY)
+        self.assertEqual(len(nodes(data['allRestaurants'])), 2)
+
+        self.create_restaurants(20)
+        large_count, data = self.count_queries(ALL_RESTAURANTS_QUERY)
+        self.assertEqual(len(nodes(data['allRestaurants'])), 22)
+        self.assertEqual(small_count, large_count)
+
+    def test_menu_items_are_grouped_by_restaurant(self):
+        """Her restoran sadece kendi menü öğelerini döndürmeli"""
+        self.create_restaurants(3, items_per_restaurant=2)
+        data = self.execute(ALL_RESTAURANTS_QUERY)
+        for restaurant in nodes(data['allRestaurants']):
+            self.assertEqual(len(restaurant['menuItems']), 2)
+            for item in restaurant['menuItems']:
+                self.assertEqual(item['restaurant']['name'], restaurant['name'])
+                self.assertEqual(item['category']['name'], "Kebap")
+
+    def test_only_requested_columns_are_loaded(self):
+        """Sadece istenen alanlar veritabanından çekilmeli"""
+        self.create_restaurants(1)
+        restaurant = Restaurant.objects.get()
+        query = '{ allMenuItems(restaurantId: %d) { edges { node { name price } } } }' % restaurant.id
+        with CaptureQueriesContext(connection) as captured:
+            data = self.execute(query)
+        self.assertEqual(len(nodes(data['allMenuItems'])), 3)
+        self.assertEqual(len(captured), 1)
+        self.assertNotIn('description', captured[0]['sql'])
+
+    def test_nested_relations_are_joined(self):
+        """İç içe ilişkiler sorgu şekline göre JOIN/prefetch ile çekilmeli"""
+        self.create_restaurants(5)
+        count, data = self.count_queries(ALL_RESTAURANTS_QUERY)
+        self.assertEqual(len(nodes(data['allRestaurants'])), 5)
+        self.assertEqual(count, 2)
+
+
+class RestaurantPaginationTestCase(TestCase):
+    query = '''
+        query($first: Int, $after: String) {
+            allRestaurants(first: $first, after: $after) {
+                edges { cursor node { name } }
+                pageInfo { hasNextPage hasPreviousPage endCursor }
+            }
+        }
+    '''
+
+    def setUp(self):
+        cache.clear()
+        for i in range(7):
+            Restaurant.objects.create(name=f"Restoran {i}", address="Adres", phone="5551234567")
+
+    def execute(self, variables):
+        request = RequestFactory().post('/graphql/')
+        request.user = AnonymousUser()
+        return schema.execute(self.query, context_value=request, variable_values=variables)
+
+    def test_pages_follow_cursor(self):
+        """Cursor ile sayfalar tekrar etmeden ve sırayla gelmeli"""
+        names, after = [], None
+        while True:
+            result = self.execute({'first': 3, 'after': after})
+            self.assertIsNone(result.errors)
+            connection_data = result.data['allRestaurants']
+            names.extend(node['name'] for node in nodes(connection_data))
+            if not connection_data['pageInfo']['hasNextPage']:
+                break
+            after = connection_data['pageInfo']['endCursor']
+        self.assertEqual(names, [f"Restoran {i}" for i in range(7)])
+
+    @override_settings(GRAPHQL_MAX_PAGE_SIZE=5)
+    def test_page_size_is_capped(self):
+        """first değeri sunucu tarafındaki üst sınırı aşamamalı"""
+        result = self.execute({'first': 1000})
+        self.assertEqual(len(result.data['allRestaurants']['edges']), 5)
+        self.assertTrue(result.data['allRestaurants']['pageInfo']['hasNextPage'])
+
+    def test_invalid_cursor_is_rejected(self):
+        """Geçersiz cursor hata döndürmeli"""
+        result = self.execute({'first': 3, 'after': 'bozuk'})
+        self.assertIsNotNone(result.errors)
+
+
+class RestaurantCacheTestCase(TestCase):
+    menu_query = '{ allMenuItems(restaurantId: %d) { edges { node { name price } } } }'
+    restaurant_query = '{ restaurant(id: %d) { name menuItems { name } } }'
+
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(email="admin@example.com", password="Parola123!", firstName="Admin", lastName="Admin", isAdmin=True)
+        self.restaurant = Restaurant.objects.create(name="Restoran", address="Adres", phone="5551234567")
+        self.other = Restaurant.objects.create(name="Diğer", address="Adres", phone="5551234567")
+        self.menu_item = MenuItem.objects.create(restaurant=self.restaurant, name="Lahmacun", price=10)
+        MenuItem.objects.create(restaurant=self.other, name="Döner", price=20)
+
+    def execute(self, query, user=None):
+        request = RequestFactory().post('/graphql/')
+        request.user = user or AnonymousUser()
+        with CaptureQueriesContext(connection) as captured:
+            result = schema.execute(query, context_value=request)
+        self.assertIsNone(result.errors)
+        return len(captured), result.data
+
+    def test_repeated_reads_are_served_from_cache(self):
+        """Aynı sorgu ikinci kez veritabanına gitmemeli"""
+        for query in (self.menu_query, self.restaurant_query):
+            first_count, first_data = self.execute(query % self.restaurant.id)
+            second_count, second_data = self.execute(query % self.restaurant.id)
+            self.assertGreater(first_count, 0)
+            self.assertEqual(second_count, 0)
+            self.assertEqual(first_data, second_data)
+
+    def test_menu_mutation_invalidates_only_its_restaurant(self):
+        """Menü güncellemesi sadece ilgili restoranın önbelleğini geçersiz kılmalı"""
+        self.execute(self.menu_query % self.restaurant.id)
+        self.execute(self.menu_query % self.other.id)
+        self.execute(
+            'mutation { updateMenuItem(id: %d, name: "Fındık Lahmacun") { menuItem { id } } }' % self.menu_item.id,
+            user=self.admin,
+        )
+        count, data = self.execute(self.menu_query % self.restaurant.id)
+        self.assertGreater(count, 0)
+        self.assertEqual(data['allMenuItems']['edges'][0]['node']['name'], "Fındık Lahmacun")
+
+        count, _ = self.execute(self.menu_query % self.other.id)
+        self.assertEqual(count, 0)
+
+    def test_delete_restaurant_invalidates_cache(self):
+        """Silinen restoran önbellekten dönmemeli"""
+        self.execute(self.restaurant_query % self.restaurant.id)
+        self.execute('mutation { deleteRestaurant(id: %d) { success } }' % self.restaurant.id, user=self.admin)
+        request = RequestFactory().post('/graphql/')
+        request.user = AnonymousUser()
+        result = schema.execute(self.restaurant_query % self.restaurant.id, context_value=request)
+        self.assertIsNotNone(result.errors)
+
+
+class RestaurantPermissionTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.owner = User.objects.create_user(email="sahip@example.com", password="Parola123!", firstName="Sahip", lastName="Sahip", is_restaurant_owner=True)
+        self.restaurant = Restaurant.objects.create(name="Restoran", address="Adres", phone="5551234567", owner=self.owner)
+        self.other = Restaurant.objects.create(name="Diğer", address="Adres", phone="5551234567")
+
+    def execute(self, query, user):
+        request = RequestFactory().post('/graphql/')
+        request.user = user
+        return schema.execute(query, context_value=request)
+
+    def test_owner_can_only_update_own_restaurant(self):
+        """Restoran sahibi sadece kendi restoranını güncelleyebilmeli"""
+        result = self.execute('mutation { updateRestaurant(id: %d, name: "Yeni") { restaurant { name } } }' % self.restaurant.id, self.owner)
+        self.assertIsNone(result.errors)
+        result = self.execute('mutation { updateRestaurant(id: %d, name: "Yeni") { restaurant { name } } }' % self.other.id, self.owner)
+        self.assertIsNotNone(result.errors)
+        self.assertEqual(Restaurant.objects.get(pk=self.other.id).name, "Diğer")
+
+    def test_owner_without_restaurant_can_create_first_one(self):
+        """Restoranı olmayan restoran sahibi ilk restoranını oluşturabilmeli, bayrağı olmayan kullanıcı oluşturamamalı"""
+        query = 'mutation { createRestaurant(name: "İlk", address: "Adres", phone: "5551234567") { restaurant { name } } }'
+        customer = User.objects.create_user(email="musteri@example.com", password="Parola123!", firstName="Müşteri", lastName="Müşteri", is_customer=True)
+        self.assertIsNotNone(self.execute(query, customer).errors)
+
+        customer.is_restaurant_owner = True
+        customer.save()
+        result = self.execute(query, customer)
+        self.assertIsNone(result.errors)
+        self.assertEqual(Restaurant.objects.get(owner=customer).name, "İlk")
+
+    def test_malformed_restaurant_id_is_denied(self):
+        """Sayısal olmayan restoran kimliği ValueError yerine mutasyonun kendi hatasıyla reddedilmeli"""
+        result = self.execute('mutation { updateRestaurant(id: "abc", name: "Yeni") { restaurant { name } } }', self.owner)
+        self.assertEqual(result.errors[0].message, "Bu restorana ait bilgileri güncelleme yetkiniz yok.")
+        result = self.execute('mutation { importMenu(restaurantId: "abc", content: "") { imported } }', self.owner)
+        self.assertEqual(result.errors[0].message, "Bu restorana ait menüye ekleme yapma yetkiniz yok.")
+
+    def test_roles_are_resolved_once_and_cached(self):
+        """Roller istek başına bir kez hesaplanmalı, sonraki isteklerde sorgu yapılmamalı"""
+        query = 'mutation { %s }' % ' '.join(
+            'm%d: createCategory(name: "Kategori %d") { category { id } }' % (i, i) for i in range(10)
+        )
+        with CaptureQueriesContext(connection) as captured:
+            self.assertIsNone(self.execute(query, self.owner).errors)
+        permission_queries = [q for q in captured if 'owner_id' in q['sql']]
+        self.assertEqual(len(permission_queries), 1)
+
+        with CaptureQueriesContext(connection) as captured:
+            self.assertIsNone(self.execute(query, self.owner).errors)
+        self.assertFalse(any('owner_id' in q['sql'] for q in captured))
+
+    def test_ownership_change_invalidates_cache(self):
+        """Restoran sahipliği değişince yetkiler yeniden hesaplanmalı"""
+        query = 'mutation { updateRestaurant(id: %d, name: "Yeni") { restaurant { name } } }' % self.other.id
+        self.assertIsNotNone(self.execute(query, self.owner).errors)
+        self.other.owner = self.owner
+        self.other.save()
+        self.assertIsNone(self.execute(query, self.owner).errors)
+
+        self.restaurant.owner = None
+        self.restaurant.save()
+        query = 'mutation { updateRestaurant(id: %d, name: "Yeni") { restaurant { name } } }' % self.restaurant.id
+        self.assertIsNotNone(self.execute(query, self.owner).errors)
+
+
+def jpeg_upload(name, width, height):
+    buffer = BytesIO()
+    Image.new('RGB', (width, height), (200, 30, 30)).save(buffer, 'JPEG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/jpeg')
+
+
+class MenuItemThumbnailTestCase(TestCase):
+    query = '{ restaurant(id: %d) { menuItems { original: image small: image(width: 300) jpeg: image(width: 300, format: JPEG) large: image(width: 5000) } } }'
+
+    def setUp(self):
+        cache.clear()
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(
+            MEDIA_ROOT=self.media_root, MEDIA_URL='/media/', MEDIA_HASHED_KEYS=False, MENU_IMAGE_WIDTHS=[160, 320, 640, 1280],
+        )
+        self.settings_override.enable()
+        self.restaurant = Restaurant.objects.create(name="Restoran", address="Adres", phone="5551234567")
+        self.menu_item = MenuItem.objects.create(restaurant=self.restaurant, name="Lahmacun", price=10, image=jpeg_upload("lahmacun.jpg", 1000, 600))
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root)
+
+    def images(self):
+        request = RequestFactory().post('/graphql/')
+        request.user = AnonymousUser()
+        result = schema.execute(self.query % self.restaurant.id, context_value=request)
+        self.assertIsNone(result.errors)
+        return result.data['restaurant']['menuItems'][0]
+
+    def test_variants_are_generated_off_request_path(self):
+        """Yükleme sadece işaretlemeli; işçi varyantları üretince en yakın genişlik dönmeli"""
+        self.assertTrue(MenuItem.objects.get().thumbnails_pending)
+        images = self.images()
+        self.assertEqual(images['small'], images['original'])
+
+        processed, failed = process_pending()
+        self.assertEqual((len(processed), failed), (1, []))
+        menu_item = MenuItem.objects.get()
+        self.assertFalse(menu_item.thumbnails_pending)
+        self.assertEqual(sorted(menu_item.image_variants['widths'], key=int), ['160', '320', '640'])  # büyütme yapılmaz
+        with Image.open(menu_item.image.storage.path(menu_item.image_variants['widths']['320']['webp'])) as variant:
+            self.assertEqual((variant.format, variant.size), ('WEBP', (320, 192)))
+
+        images = self.images()
+        self.assertTrue(images['original'].endswith('/lahmacun.jpg'))
+        self.assertTrue(images['small'].endswith('/lahmacun_w320.webp'))
+        self.assertTrue(images['jpeg'].endswith('/lahmacun_w320.jpg'))
+        self.assertTrue(images['large'].endswith('/lahmacun_w640.webp'))
+
+    def test_new_upload_replaces_variants(self):
+        """Görsel değişince eski varyantlar kullanılmamalı ve işçi tarafından silinmeli"""
+        process_pending()
+        menu_item = MenuItem.objects.get()
+        old_variant = menu_item.image_variants['widths']['160']['webp']
+        menu_item.image = jpeg_upload("pide.jpg", 800, 800)
+        menu_item.save()
+        cache.clear()
+        images = self.images()
+        self.assertEqual(images['small'], images['original'])
+        self.assertTrue(images['original'].endswith('/pide.jpg'))
+
+        process_pending()
+        self.assertFalse(menu_item.image.storage.exists(old_variant))
+        cache.clear()
+        self.assertTrue(self.images()['small'].endswith('/pide_w320.webp'))
+
+    def test_imageless_rows_do_not_stop_the_worker(self):
+        """Sadece görselsiz satırlardan oluşan bir parti, sonraki bekleyen görsellerin işlenmesini durdurmamalı"""
+        process_pending()
+        imageless = [MenuItem.objects.create(restaurant=self.restaurant, name=f"Çorba {i}", price=10).pk for i in range(3)]
+        MenuItem.objects.filter(pk__in=imageless).update(thumbnails_pending=True)  # görseli kaldırılmış öğeler
+        pide = MenuItem.objects.create(restaurant=self.restaurant, name="Pide", price=10, image=jpeg_upload("pide.jpg", 400, 300))
+
+        call_command('process_thumbnails', once=True, batch_size=2, stdout=StringIO())
+        self.assertFalse(MenuItem.objects.filter(thumbnails_pending=True).exists())
+        self.assertIn('320', MenuItem.objects.get(pk=pide.pk).image_variants['widths'])
+
+    @override_settings(MEDIA_URL='https://cdn.example.com/', MEDIA_HASHED_KEYS=True)
+    def test_hashed_keys_and_cdn_urls(self):
+        """Anahtar içerik hash'i taşımalı, URL depolama çağrılmadan MEDIA_URL + anahtar olmalı"""
+        menu_item = MenuItem.objects.create(restaurant=self.restaurant, name="Pide", price=10, image=jpeg_upload("pide tahta.jpg", 400, 300))
+        self.assertRegex(menu_item.image.name, r'^Proje_Yemekleri/Restoran/pide_tahta\.[0-9a-f]{12}\.jpg$')
+
+        process_pending()
+        self.assertRegex(MenuItem.objects.get(pk=menu_item.pk).image_variants['widths']['320']['webp'], r'pide_tahta\.[0-9a-f]{12}_w320\.[0-9a-f]{12}\.webp$')
+        cache.clear()
+        images = self.images()
+        self.assertEqual(images['original'], 'https://cdn.example.com/' + self.menu_item.image.name)
+
+
+NEAR_QUERY = '{ restaurantsNear(lat: %s, lng: %s, radiusKm: %s%s) { distanceKm delivers restaurant { name } } }'
+
+
+@override_settings(GEO_SYNC_INTERVAL=0)
+class RestaurantsNearTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        geo.reset()
+        self.owner = User.objects.create_user(email="sahip@example.com", password="Parola123!", firstName="Sahip", lastName="Sahip", is_restaurant_owner=True)
+        # Kadıköy'ün teslimat alanı Taksim'i içeren bir çokgen; Beşiktaş 2 km yarıçapla teslimat yapar
+        self.kadikoy = Restaurant.objects.create(
+            name="Kadıköy", address="Adres", phone="5551234567", latitude=40.9903, longitude=29.0290,
+            delivery_area=[[40.95, 28.95], [41.06, 28.95], [41.06, 29.06], [40.95, 29.06]],
+        )
+        self.besiktas = Restaurant.objects.create(
+            name="Beşiktaş", address="Adres", phone="5551234567", latitude=41.0430, longitude=29.0070,
+            delivery_radius_km=1, owner=self.owner,
+        )
+        Restaurant.objects.create(name="Ankara", address="Adres", phone="5551234567", latitude=39.9334, longitude=32.8597)
+        Restaurant.objects.create(name="Konumsuz", address="Adres", phone="5551234567")
+
+    def execute(self, query, user=None):
+        request = RequestFactory().post('/graphql/')
+        request.user = user or AnonymousUser()
+        return schema.execute(query, context_value=request)
+
+    def near(self, lat=41.0369, lng=28.9850, radius=10, extra=''):
+        result = self.execute(NEAR_QUERY % (lat, lng, radius, extra))
+        self.assertIsNone(result.errors)
+        return [(hit['restaurant']['name'], hit['delivers']) for hit in result.data['restaurantsNear']]
+
+    def test_results_are_sorted_by_distance(self):
+        """Yarıçap içindeki restoranlar uzaklığa göre sıralı dönmeli, sonuçlar tek sorguda yüklenmeli"""
+        self.assertEqual(self.near(), [("Beşiktaş", False), ("Kadıköy", True)])
+        with CaptureQueriesContext(connection) as captured:
+            result = self.execute(NEAR_QUERY % (41.0369, 28.9850, 10, ''))
+        self.assertEqual(len(captured), 1)
+        self.assertAlmostEqual(result.data['restaurantsNear'][0]['distanceKm'], 1.9, delta=0.1)
+        self.assertEqual(self.near(radius=3), [("Beşiktaş", False)])
+        self.assertEqual(self.near(extra=', deliversOnly: true'), [("Kadıköy", True)])
+        self.assertEqual(self.near(lat=39.93, lng=32.85, radius=50), [("Ankara", True)])
+
+    def test_location_changes_update_index(self):
+        """Konum değişikliği ve silme indekse yansımalı, geçersiz konum reddedilmeli"""
+        self.near()
+        with self.captureOnCommitCallbacks(execute=True):
+            result = self.execute(
+                'mutation { updateRestaurant(id: %d, latitude: 41.0370, longitude: 28.9851, deliveryRadiusKm: 3) { restaurant { latitude } } }' % self.besiktas.id,
+                self.owner,
+            )
+        self.assertIsNone(result.errors)
+        self.assertEqual(self.near(radius=1), [("Beşiktaş", True)])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.kadikoy.delete()
+        self.assertEqual(self.near(), [("Beşiktaş", True)])
+
+        result = self.execute('mutation { updateRestaurant(id: %d, latitude: 100) { restaurant { id } } }' % self.besiktas.id, self.owner)
+        self.assertIsNotNone(result.errors)
+        self.assertIsNotNone(self.execute(NEAR_QUERY % (41, 29, 500, '')).errors)
+
+    def test_first_is_validated(self):
+        """first: 0 boş liste dönmeli, negatif first reddedilmeli"""
+        self.assertEqual(self.near(extra=', first: 0'), [])
+        result = self.execute(NEAR_QUERY % (41.0369, 28.9850, 10, ', first: -2'))
+        self.assertEqual(result.errors[0].message, "first negatif olamaz.")
+        self.assertEqual(geo.near(41.0369, 28.9850, 10, 0), [])
+
+    def test_point_in_polygon(self):
+        square = [[0, 0], [0, 1], [1, 1], [1, 0]]
+        self.assertTrue(geo.point_in_polygon(0.5, 0.5, square))
+        self.assertFalse(geo.point_in_polygon(1.5, 0.5, square))
+        self.assertAlmostEqual(geo.distance_km(41.0082, 28.9784, 39.9334, 32.8597), 350, delta=5)
+
+
+MENU_FACETS_QUERY = '''
+    query {
+        allMenuItems(restaurantId: %d%s) {
+            edges { node { name } }
+            facets { id name count }
+        }
+    }
+'''
+
+
+class FacetTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.kebap = MenuItemCategory.objects.create(name="Kebap")
+        self.tatli = MenuItemCategory.objects.create(name="Tatlı")
+        self.ocakbasi = RestaurantCategory.objects.create(name="Ocakbaşı")
+        self.restaurant = Restaurant.objects.create(name="Köşe", address="Adres", phone="5551234567", category=self.ocakbasi)
+        self.adana = MenuItem.objects.create(restaurant=self.restaurant, category=self.kebap, name="Adana", price=250, image='adana.jpg')
+        MenuItem.objects.create(restaurant=self.restaurant, category=self.kebap, name="Urfa", price=240)
+        MenuItem.objects.create(restaurant=self.restaurant, category=self.tatli, name="Künefe", price=120)
+
+    def execute(self, query):
+        request = RequestFactory().post('/graphql/')
+        request.user = AnonymousUser()
+        result = schema.execute(query, context_value=request)
+        self.assertIsNone(result.errors)
+        return result.data
+
+    def menu(self, arguments=''):
+        data = self.execute(MENU_FACETS_QUERY % (self.restaurant.id, arguments))['allMenuItems']
+        names = sorted(node['name'] for node in nodes(data))
+        return names, [(facet['name'], facet['count']) for facet in data['facets']]
+
+    def test_menu_filters_and_facets(self):
+        """Filtreler listeyi daraltmalı; yüzeyler sayaçlardan okunmalı ve görsel filtresini yansıtmalı"""
+        self.assertEqual(self.menu(), (["Adana", "Künefe", "Urfa"], [("Kebap", 2), ("Tatlı", 1)]))
+        self.assertEqual(self.menu(f', categoryId: {self.kebap.id}')[0], ["Adana", "Urfa"])
+        self.assertEqual(self.menu(', minPrice: 125, maxPrice: 245')[0], ["Urfa"])
+        self.assertEqual(self.menu(', hasImage: true'), (["Adana"], [("Kebap", 1)]))
+        self.assertEqual(self.menu(', hasImage: false'), (["Künefe", "Urfa"], [("Kebap", 1), ("Tatlı", 1)]))
+
+        cache.clear()
+        with CaptureQueriesContext(connection) as captured:
+            self.menu()
+        self.assertFalse(any('GROUP BY' in query['sql'] for query in captured))
+
+    def test_counters_follow_writes(self):
+        """Kategori, görsel ve silme değişiklikleri sayaçlara yansımalı; baştan hesaplama aynı sonucu vermeli"""
+        self.adana.category = self.tatli
+        self.adana.image = None
+        self.adana.save()
+        MenuItem.objects.get(name="Urfa").delete()
+        self.restaurant.category = None
+        self.restaurant.save()
+
+        def counters():
+            return sorted(MenuFacet.objects.filter(item_count__gt=0).values_list('category__name', 'has_image', 'item_count'))
+
+        self.assertEqual(counters(), [("Tatlı", False, 2)])
+        self.assertEqual(list(facets.restaurant_facets()), [])
+        facets.rebuild()
+        self.assertEqual(counters(), [("Tatlı", False, 2)])
+
+    def test_restaurant_filters_and_facets(self):
+        Restaurant.objects.create(name="Başka", address="Adres", phone="5551234567")
+        query = 'query { allRestaurants%s { edges { node { name } } facets { name count } } }'
+        data = self.execute(query % '')['allRestaurants']
+        self.assertEqual(len(nodes(data)), 2)
+        self.assertEqual(data['facets'], [{'name': "Ocakbaşı", 'count': 1}])
+        for arguments in (f'(categoryId: {self.ocakbasi.id})', f'(menuCategoryId: {self.tatli.id})'):
+            self.assertEqual([node['name'] for node in nodes(self.execute(query % arguments)['allRestaurants'])], ["Köşe"])
+
+
+IMPORT_MENU_MUTATION = '''
+    mutation($restaurantId: ID!, $content: String!, $format: MenuFileFormat) {
+        importMenu(restaurantId: $restaurantId, content: $content, format: $format) { imported categoriesCreated }
+    }
+'''
+
+
+class MenuImportTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.owner = User.objects.create_user(email="sahip@example.com", password="Parola123!", firstName="Sahip", lastName="Sahip", is_restaurant_owner=True)
+        self.restaurant = Restaurant.objects.create(name="Köşe", address="Adres", phone="5551234567", owner=self.owner)
+        self.other = Restaurant.objects.create(name="Diğer", address="Adres", phone="5551234567")
+        self.kebap = MenuItemCategory.objects.create(name="Kebap")
+
+    def import_menu(self, content, format='CSV', restaurant=None):
+        request = RequestFactory().post('/graphql/')
+        request.user = self.owner
+        variables = {'restaurantId': (restaurant or self.restaurant).id, 'content': content, 'format': format}
+        with self.captureOnCommitCallbacks(execute=True):
+            return schema.execute(IMPORT_MENU_MUTATION, context_value=request, variable_values=variables)
+
+    def test_csv_import(self):
+        """Kategoriler adla eşleşmeli (olmayan oluşturulmalı); sayaçlar ve arama indeksi güncellenmeli"""
+        content = "category,name,description,price\nkebap,Adana,Acılı,250\nTatlı,Künefe,,120.5\nTatlı,Sütlaç,,90\n"
+        result = self.import_menu(content)
+        self.assertIsNone(result.errors)
+        self.assertEqual(result.data['importMenu'], {'imported': 3, 'categoriesCreated': 1})
+        adana = MenuItem.objects.get(name="Adana")
+        self.assertEqual((adana.restaurant_id, adana.category_id, adana.description), (self.restaurant.id, self.kebap.id, "Acılı"))
+        self.assertEqual(
+            sorted(MenuFacet.objects.values_list('category__name', 'item_count')), [("Kebap", 1), ("Tatlı", 2)]
+        )
+        self.assertEqual(search("künefe", 5)[0][:2], ('menu_item', MenuItem.objects.get(name="Künefe").id))
+
+    def test_invalid_rows_roll_back(self):
+        """Hatalı satır veya başka restorana ait satır varsa hiçbir öğe eklenmemeli"""
+        lines = ['{"name": "Adana", "price": 250}', '{"name": "Urfa", "price": "-1"}']
+        result = self.import_menu('\n'.join(lines), format='JSONL')
+        self.assertIn("2. satır", result.errors[0].message)
+        result = self.import_menu('{"restaurant_id": %d, "name": "Adana", "price": 250}' % self.other.id, format='JSONL')
+        self.assertIsNotNone(result.errors)
+        self.assertIsNotNone(self.import_menu("name,price\nAdana,250\n", restaurant=self.other).errors)
+        self.assertFalse(MenuItem.objects.exists())
+
+    def test_export_import_round_trip(self):
+        MenuItem.objects.create(restaurant=self.restaurant, category=self.kebap, name="Adana", description="Acılı", price=250)
+        MenuItem.objects.create(restaurant=self.other, name="Ayran", price=30)
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'menu.jsonl')
+        call_command('export_menu', path, stdout=StringIO())
+        with open(path, encoding='utf-8') as file:
+            rows = [json.loads(line) for line in file]
+        self.assertEqual([row['name'] for row in rows], ["Adana", "Ayran"])
+        self.assertEqual(rows[0]['category'], "Kebap")
+        self.assertEqual(list(export_menu(batch_size=1)), rows)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('import_menu', path, '--batch-size', '1', stdout=StringIO())
+        self.assertEqual(MenuItem.objects.filter(restaurant=self.restaurant, name="Adana", category=self.kebap).count(), 2)
+        self.assertEqual(MenuItem.objects.filter(restaurant=self.other, name="Ayran", category=None).count(), 2)
@@ -0,0 +1,105 @@
+import os
+from io import BytesIO
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+from restaurants.facets import HAS_IMAGE
+from restaurants.models import MenuItem
+from yemeksepeti_clone.media import hashed_name
+from yemeksepeti_clone.cache import invalidate_restaurant
+
+# Üretilen formatlar ve dosya uzantıları
+FORMATS = {
+    'webp': 'webp',
+    'jpeg': 'jpg',
+}
+
+
+def variant_name(source, width, image_format, content):
+    stem, _ = os.path.splitext(source)
+    return hashed_name(f'{stem}_w{width}.{FORMATS[image_format]}', content)
+
+
+def _encode(image, image_format):
+    buffer = BytesIO()
+    if image_format == 'jpeg':
+        if image.mode != 'RGB':
+            # Saydam alanlar beyaz zemine oturtulur
+            background = Image.new('RGB', image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel('A') if image.mode == 'RGBA' else None)
+            image = background
+        image.save(buffer, 'JPEG', quality=settings.MENU_IMAGE_JPEG_QUALITY, optimize=True, progressive=True)
+    else:
+        image.save(buffer, 'WEBP', quality=settings.MENU_IMAGE_WEBP_QUALITY, method=4)
+    return buffer.getvalue()
+
+
+# Görseli ayarlardaki genişliklere küçültür; orijinalden büyük genişlikler üretilmez (büyütme yapılmaz)
+def render_variants(file):
+    with Image.open(file) as image:
+        target_widths = sorted(set(settings.MENU_IMAGE_WIDTHS))
+        # JPEG, gereken en büyük boyuta yakın ölçekte çözülür (tam boyutlu çözmeye göre çok daha hızlı)
+        image.draft('RGB', (target_widths[-1], target_widths[-1] * image.height // max(image.width, 1)))
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+
+        widths = [width for width in target_widths if width < image.width] or [image.width]
+        for width in widths:
+            height = max(round(image.height * width / image.width), 1)
+            resized = image.resize((width, height), Image.Resampling.LANCZOS, reducing_gap=3.0)
+            for image_format in FORMATS:
+                yield width, image_format, _encode(resized, image_format)
+
+
+def generate_variants(menu_item):
+    storage = menu_item.image.storage
+    source = menu_item.image.name
+    widths = {}
+    with menu_item.image.open('rb') as file:
+        for width, image_format, content in render_variants(file):
+            name = storage.save(variant_name(source, width, image_format, content), ContentFile(content))
+            widths.setdefault(str(width), {})[image_format] = name
+    return {'source': source, 'widths': widths}
+
+
+def variant_names(variants):
+    return {name for formats in variants.get('widths', {}).values() for name in formats.values()}
+
+
+def _delete_variants(storage, names):
+    for name in names:
+        storage.delete(name)
+
+
+# Bekleyen menü öğelerinin varyantlarını üretir; (işlenen, hatalı) listelerini döner.
+# İşlem sırasında görsel değiştiyse sonuç yazılmaz, yeni görsel bir sonraki turda işlenir.
+def process_pending(batch_size=None):
+    # Görseli kaldırılmış öğeler tek sorguyla işaretlenir; partiye alınsalar sadece görselsiz satırlardan oluşan
+    # bir parti boş sonuç döner ve çağıran (process_thumbnails --once) sonraki bekleyenlere geçmeden durur
+    MenuItem.objects.filter(thumbnails_pending=True).exclude(HAS_IMAGE).update(thumbnails_pending=False)
+    items = list(
+        MenuItem.objects.filter(thumbnails_pending=True)
+        .only('id', 'restaurant_id', 'image', 'image_variants')
+        .order_by('id')[:batch_size or settings.MENU_IMAGE_BATCH_SIZE]
+    )
+    processed, failed = [], []
+    for item in items:
+        try:
+            variants = generate_variants(item)
+        except Exception as e:
+            variants = {'source': item.image.name, 'error': str(e)}
+            failed.append((item, e))
+        updated = MenuItem.objects.filter(pk=item.pk, image=item.image.name).update(
+            image_variants=variants, thumbnails_pending=False
+        )
+        storage = item.image.storage
+        if not updated:
+            _delete_variants(storage, variant_names(variants))
+            continue
+        # Önceki görselin (veya önceki üretimin) artık kullanılmayan dosyaları silinir
+        _delete_variants(storage, variant_names(item.image_variants or {}) - variant_names(variants))
+        invalidate_restaurant(item.restaurant_id)
+        if 'error' not in variants:
+            processed.append(item)
+    return processed, failed
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+"""
+Restoran listesi sorgusu için basit yük testi (sadece standart kütüphane).
+
+Örnek (önce runserver, sonra gunicorn ile aynı komut çalıştırılıp karşılaştırılır):
+    python scripts/load_test.py --url http://localhost:8000/graphql/ --concurrency 32 --duration 20
+"""
+import argparse
+import http.client
+import json
+import statistics
+import threading
+import time
+from urllib.parse import urlparse
+
+QUERY = '{ allRestaurants(first: %d) { edges { node { name menuItems { name price } } } pageInfo { hasNextPage } } }'
+
+
+def worker(url, deadline, first, uncached, results, errors):
+    connection = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=30)
+    sequence = 0
+    while time.perf_counter() < deadline:
+        query = QUERY % first
+        if uncached:
+            # Farklı doküman metni yanıt önbelleğini atlatır, tüm çözümleme yolu ölçülür
+            sequence += 1
+            query += f' # {threading.get_ident()}-{sequence}'
+        body = json.dumps({'query': query})
+        started = time.perf_counter()
+        try:
+            connection.request('POST', url.path or '/', body, {'Content-Type': 'application/json'})
+            response = connection.getresponse()
+            response.read()
+            if response.status != 200:
+                errors.append(response.status)
+                continue
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(type(e).__name__)
+            connection.close()
+            connection = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=30)
+            continue
+        results.append((time.perf_counter() - started) * 1000)
+    connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://localhost:8000/graphql/')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--first', type=int, default=20, help="Sayfa boyutu")
+    parser.add_argument('--uncached', action='store_true', help="Anonim yanıt önbelleğini atla")
+    args = parser.parse_args()
+
+    url = urlparse(args.url)
+    results, errors = [], []
+    deadline = time.perf_counter() + args.duration
+    threads = [
+        threading.Thread(target=worker, args=(url, deadline, args.first, args.uncached, results, errors))
+        for _ in range(args.concurrency)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    print(f"{args.url}  eşzamanlılık={args.concurrency}  süre={elapsed:.1f}s  önbelleksiz={args.uncached}")
+    print(f"  istek/sn: {len(results) / elapsed:.1f}  başarılı: {len(results)}  hata: {len(errors)}")
+    if len(results) >= 2:
+        percentiles = statistics.quantiles(results, n=100)
+        print(f"  gecikme ms: p50={percentiles[49]:.1f}  p90={percentiles[89]:.1f}  p99={percentiles[98]:.1f}  max={max(results):.1f}")
+
+
+if __name__ == '__main__':
+    main()
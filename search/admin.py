@@ -0,0 +1,13 @@
+from django.contrib import admin
+from .models import SearchTerm, SearchWord
+
+@admin.register(SearchTerm)
+class SearchTermAdmin(admin.ModelAdmin):
+    list_display = ('id', 'term', 'kind', 'object_id', 'weight')
+    list_filter = ('kind',)
+
+
+@admin.register(SearchWord)
+class SearchWordAdmin(admin.ModelAdmin):
+    list_display = ('id', 'term', 'document_count')
+    search_fields = ('term',)
@@ -0,0 +1,239 @@
+import heapq
+import os
+import pickle
+from django.conf import settings
+from django.db.models import Count, Sum
+from search.index import normalize, tokenize
+from yemeksepeti_clone.journal import Journal, JournaledState
+
+MENU_ITEM = 'menu_item'
+RESTAURANT = 'restaurant'
+CATEGORY = 'category'
+
+
+# Bir öneri: aynı normalize edilmiş isimdeki tüm menü öğeleri (ör. 300 restorandaki "İskender Döner") tek öneridir.
+# count: bu ismi taşıyan kayıt sayısı, orders: bu isimle sipariş edilen toplam adet
+class Entry:
+    __slots__ = ('kind', 'text', 'count', 'orders')
+
+    def __init__(self, kind, text):
+        self.kind = kind
+        self.text = text
+        self.count = 0
+        self.orders = 0
+
+    @property
+    def popularity(self):
+        return self.orders + self.count
+
+    # Popüler olan önce, eşitlikte alfabetik
+    def rank(self):
+        return (-self.popularity, self.text)
+
+
+class _Node:
+    __slots__ = ('label', 'children', 'entries', 'top')
+
+    def __init__(self, label=''):
+        self.label = label  # düğüme gelen kenarın etiketi (sıkıştırılmış: tek harf değil, ortak önek)
+        self.children = {}  # ilk harf -> düğüm
+        self.entries = set()
+        self.top = None  # alt ağaçtaki en popüler öneriler; None ise sorguda çocukların listelerinden hesaplanır
+
+
+class Autocomplete:
+    """
+    Sıkıştırılmış önek ağacı (radix trie). Her öneri isminin her kelimesinden başlayarak eklenir;
+    "döne" hem "Döner"i hem "İskender Döner"i bulur. Her düğüm alt ağacının en popüler
+    AUTOCOMPLETE_TOP_K önerisini saklar, sorgu önek uzunluğu kadar adım yürüyüp listeyi döndürür.
+    """
+
+    def __init__(self):
+        self.root = _Node()
+        self.entries = {}  # (tür, normalize isim) -> Entry
+        self.sequence = 0  # uygulanan son günlük kaydı
+
+    def __len__(self):
+        return len(self.entries)
+
+    def update(self, kind, text, count=0, orders=0):
+        key = normalize(text)
+        if not key.strip():
+            return
+        entry = self.entries.get((kind, key))
+        if entry is None:
+            entry = self.entries[(kind, key)] = Entry(kind, text)
+            for suffix in self._suffixes(key):
+                self._insert(suffix, entry)
+        elif count > 0:
+            entry.text = text  # en son eklenen yazılış gösterilir
+        entry.count = max(entry.count + count, 0)
+        entry.orders = max(entry.orders + orders, 0)
+        for suffix in self._suffixes(key):
+            if count >= 0 and orders >= 0:
+                self._promote(suffix, entry)
+            else:
+                self._demote(suffix, entry)
+
+    # Tüm düğümlerin listeleri önceden hesaplanır; ilk kısa önek sorgusu tüm ağacı dolaşmak zorunda kalmaz
+    def prime(self):
+        self._top(self.root)
+
+    def suggest(self, prefix, first):
+        node = self._find(' '.join(tokenize(prefix)))
+        if node is None:
+            return []
+        return [(entry.kind, entry.text, entry.popularity) for entry in self._top(node)[:first]]
+
+    @staticmethod
+    def _suffixes(key):
+        tokens = tokenize(key)
+        return {' '.join(tokens[i:])[:64] for i in range(len(tokens))}
+
+    def _insert(self, key, entry):
+        node, rest = self.root, key
+        while rest:
+            child = node.children.get(rest[0])
+            if child is None:
+                child = node.children[rest[0]] = _Node(rest)
+                rest = ''
+            else:
+                common = len(os.path.commonprefix([child.label, rest]))
+                if common < len(child.label):
+                    # Kenar ortak önekte bölünür: "doner" + "dolma" -> "do" -> {"ner", "lma"}
+                    split = _Node(child.label[:common])
+                    child.label = child.label[common:]
+                    split.children[child.label[0]] = child
+                    node.children[rest[0]] = child = split
+                rest = rest[common:]
+            node = child
+        node.entries.add(entry)
+
+    def _path(self, key):
+        node, rest = self.root, key
+        yield node
+        while rest:
+            node = node.children.get(rest[0])
+            if node is None:
+                return
+            yield node
+            rest = rest[len(node.label):]
+
+    # Popülerliği artan öneri, yol üzerindeki hazır listelere yerleştirilir (liste baştan hesaplanmaz)
+    def _promote(self, key, entry):
+        if entry.count <= 0:
+            return
+        for node in self._path(key):
+            top = node.top
+            if top is None:
+                continue
+            if entry not in top:
+                if len(top) >= settings.AUTOCOMPLETE_TOP_K and entry.rank() >= top[-1].rank():
+                    continue
+                top.append(entry)
+            top.sort(key=Entry.rank)
+            del top[settings.AUTOCOMPLETE_TOP_K:]
+
+    # Popülerliği azalan öneri listedeyse yerine kimin geleceği bilinmez; o liste sorguda yeniden hesaplanır.
+    # Listede olmayan önerinin azalması listeyi değiştirmez.
+    def _demote(self, key, entry):
+        for node in self._path(key):
+            if node.top is not None and entry in node.top:
+                node.top = None
+
+    def _find(self, prefix):
+        node, rest = self.root, prefix
+        while rest:
+            child = node.children.get(rest[0])
+            if child is None:
+                return None
+            # Önek kenarın ortasında bitebilir ("don" -> "doner" kenarı)
+            if not child.label.startswith(rest[:len(child.label)]):
+                return None
+            node, rest = child, rest[len(child.label):]
+        return node
+
+    def _top(self, node):
+        if node.top is None:
+            candidates = {entry for entry in node.entries if entry.count > 0}
+            for child in node.children.values():
+                candidates.update(self._top(child))
+            node.top = heapq.nsmallest(settings.AUTOCOMPLETE_TOP_K, candidates, key=Entry.rank)
+        return node.top
+
+
+def build():
+    from orders.models import OrderItem
+    from restaurants.models import MenuItem, MenuItemCategory, Restaurant
+
+    autocomplete = Autocomplete()
+    # Günlük sırası veriden önce okunur; arada gelen değişiklikler yüklemeden sonra tekrar uygulanır
+    autocomplete.sequence = _journal.sequence()
+    sources = (
+        (MENU_ITEM, MenuItem.objects.values('name').annotate(count=Count('id'))),
+        (RESTAURANT, Restaurant.objects.values('name').annotate(count=Count('id'))),
+        (CATEGORY, MenuItemCategory.objects.values('name').annotate(count=Count('id'))),
+    )
+    for kind, rows in sources:
+        for row in rows.iterator():
+            autocomplete.update(kind, row['name'], count=row['count'])
+    for row in OrderItem.objects.values('product_name').annotate(quantity=Sum('quantity')).iterator():
+        autocomplete.update(MENU_ITEM, row['product_name'], orders=row['quantity'])
+    autocomplete.prime()
+    return autocomplete
+
+
+def save_snapshot(autocomplete, path=None):
+    path = path or settings.AUTOCOMPLETE_SNAPSHOT_PATH
+    # Önce geçici dosyaya yazılır; okuyan işçi yarım dosya görmez
+    with open(f'{path}.tmp', 'wb') as file:
+        pickle.dump(autocomplete, file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(f'{path}.tmp', path)
+
+
+def load_snapshot(path=None):
+    path = path or settings.AUTOCOMPLETE_SNAPSHOT_PATH
+    with open(path, 'rb') as file:
+        return pickle.load(file)
+
+
+# Değişiklikler paylaşılan günlüğe yazılır; her işçi kendi ağacını AUTOCOMPLETE_SYNC_INTERVAL saniyede bir günceller
+_journal = Journal('autocomplete', 'AUTOCOMPLETE')
+
+
+def _apply(autocomplete, payloads):
+    for changes in payloads:
+        for kind, text, count, orders in changes:
+            autocomplete.update(kind, text, count=count, orders=orders)
+
+
+# İşçi açılırken anlık görüntü varsa oradan, yoksa veritabanından kurulur
+def _load():
+    if settings.AUTOCOMPLETE_SNAPSHOT_PATH and os.path.exists(settings.AUTOCOMPLETE_SNAPSHOT_PATH):
+        return load_snapshot()
+    return None
+
+
+_state = JournaledState(_journal, build=build, apply=_apply, load=_load)
+
+
+def publish(changes):
+    """changes: [(tür, isim, count farkı, orders farkı), ...]"""
+    if changes:
+        _state.publish(changes)
+
+
+def suggest(prefix, first):
+    return _state.get().suggest(prefix, first)
+
+
+def loaded():
+    return _state.loaded()
+
+
+def warm():
+    _state.load()
+
+
+def reset():
+    _state.reset()
@@ -0,0 +1,253 @@
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from django.conf import settings
+from django.db import connections, router
+from django.db.models import Case, Count, F, IntegerField, Q, QuerySet, When
+from restaurants.models import MenuItem, Restaurant
+from search.models import SearchTerm, SearchWord
+
+# Alan ağırlıkları: isimde geçen kelime açıklamada geçenden önce gelir
+MENU_ITEM_WEIGHTS = (('name', 8), ('category', 3), ('restaurant', 2), ('description', 1))
+RESTAURANT_WEIGHTS = (('name', 8), ('category', 3))
+
+# Türkçe büyük/küçük harf: I -> ı, İ -> i (str.lower 'İ' harfini 'i̇' yapar)
+_TURKISH_LOWER = str.maketrans({'I': 'ı', 'İ': 'i'})
+# Kullanıcı "doner" de "döner" de yazabilir; Türkçe karakterler Latin karşılıklarına indirgenir
+_TURKISH_FOLD = str.maketrans({'ç': 'c', 'ğ': 'g', 'ı': 'i', 'ö': 'o', 'ş': 's', 'ü': 'u'})
+_TOKEN = re.compile(r'[a-z0-9]+')
+
+
+def normalize(text):
+    text = (text or '').translate(_TURKISH_LOWER).lower().translate(_TURKISH_FOLD)
+    # Kalan aksanlar (â, î, é...) ayrıştırılıp atılır
+    return ''.join(c for c in unicodedata.normalize('NFKD', text) if not unicodedata.combining(c))
+
+
+def tokenize(text):
+    return [token[:64] for token in _TOKEN.findall(normalize(text))]
+
+
+def _weigh(fields):
+    weights = Counter()
+    for text, weight in fields:
+        for token in set(tokenize(text)):
+            weights[token] += weight
+    return weights
+
+
+def menu_item_terms(menu_item):
+    texts = {
+        'name': menu_item.name,
+        'category': menu_item.category.name if menu_item.category_id else '',
+        'restaurant': menu_item.restaurant.name,
+        'description': menu_item.description,
+    }
+    return _weigh((texts[field], weight) for field, weight in MENU_ITEM_WEIGHTS)
+
+
+def restaurant_terms(restaurant):
+    texts = {
+        'name': restaurant.name,
+        'category': restaurant.category.name if restaurant.category_id else '',
+    }
+    return _weigh((texts[field], weight) for field, weight in RESTAURANT_WEIGHTS)
+
+
+def _update_vocabulary(added, removed):
+    deltas = Counter(added)
+    deltas.subtract(removed)
+    if added:
+        SearchWord.objects.bulk_create(
+            (SearchWord(term=term) for term in added), ignore_conflicts=True, batch_size=settings.SEARCH_INDEX_BATCH_SIZE
+        )
+    # Aynı miktarda değişen terimler tek UPDATE ile güncellenir (genelde +1 ve -1)
+    terms_by_delta = defaultdict(list)
+    for term, delta in deltas.items():
+        if delta:
+            terms_by_delta[delta].append(term)
+    for delta, terms in terms_by_delta.items():
+        for i in range(0, len(terms), settings.SEARCH_INDEX_BATCH_SIZE):
+            SearchWord.objects.filter(term__in=terms[i:i + settings.SEARCH_INDEX_BATCH_SIZE]).update(
+                document_count=F('document_count') + delta
+            )
+
+
+# Doküman başına ~15 satır yazılır; bulk_create her değeri ayrı ayrı derlediği için toplu indekslemede
+# yazmanın kendisinden pahalıdır. Satırlar çok satırlı tek INSERT'lerle, parametreleri doğrudan verilerek yazılır.
+def _insert_postings(rows):
+    if not rows:
+        return
+    connection = connections[router.db_for_write(SearchTerm)]
+    quote = connection.ops.quote_name
+    fields = [SearchTerm._meta.get_field(name) for name in ('term', 'kind', 'object_id', 'weight')]
+    columns = ', '.join(quote(field.column) for field in fields)
+    batch_size = min(settings.SEARCH_INDEX_BATCH_SIZE, connection.ops.bulk_batch_size(fields, rows))
+    with connection.cursor() as cursor:
+        for i in range(0, len(rows), batch_size):
+            batch = rows[i:i + batch_size]
+            values = ', '.join(['(%s, %s, %s, %s)'] * len(batch))
+            cursor.execute(
+                f'INSERT INTO {quote(SearchTerm._meta.db_table)} ({columns}) VALUES {values}',
+                [value for row in batch for value in row],
+            )
+
+
+def _replace(kind, objects, terms, update_vocabulary=True):
+    rows = SearchTerm.objects.filter(kind=kind, object_id__in=[obj.pk for obj in objects])
+    removed = Counter(rows.values_list('term', flat=True)) if update_vocabulary else Counter()
+    rows.delete()
+    created = [(term, kind, obj.pk, weight) for obj in objects for term, weight in terms(obj).items()]
+    _insert_postings(created)
+    if update_vocabulary:
+        _update_vocabulary(Counter(term for term, _, _, _ in created), removed)
+
+
+# Menü öğelerini (queryset veya id listesi) yeniden indeksler; sinyallerden ve rebuild komutundan çağrılır
+def index_menu_items(menu_items, update_vocabulary=True):
+    if not isinstance(menu_items, QuerySet):
+        menu_items = MenuItem.objects.filter(pk__in=menu_items)
+    menu_items = menu_items.select_related('restaurant', 'category').only(
+        'id', 'name', 'description', 'category__name', 'restaurant__name'
+    )
+    _replace(SearchTerm.MENU_ITEM, list(menu_items), menu_item_terms, update_vocabulary)
+
+
+def index_restaurants(restaurants, update_vocabulary=True):
+    if not isinstance(restaurants, QuerySet):
+        restaurants = Restaurant.objects.filter(pk__in=restaurants)
+    restaurants = restaurants.select_related('category').only('id', 'name', 'category__name')
+    _replace(SearchTerm.RESTAURANT, list(restaurants), restaurant_terms, update_vocabulary)
+
+
+def remove(kind, object_ids):
+    rows = SearchTerm.objects.filter(kind=kind, object_id__in=object_ids)
+    removed = Counter(rows.values_list('term', flat=True))
+    rows.delete()
+    _update_vocabulary(Counter(), removed)
+
+
+def rebuild_vocabulary():
+    SearchWord.objects.all().delete()
+    SearchWord.objects.bulk_create(
+        (SearchWord(term=row['term'], document_count=row['count']) for row in SearchTerm.objects.values('term').annotate(count=Count('id'))),
+        batch_size=settings.SEARCH_INDEX_BATCH_SIZE,
+    )
+
+
+def rebuild(batch_size=None):
+    batch_size = batch_size or settings.SEARCH_INDEX_BATCH_SIZE
+    SearchTerm.objects.all().delete()
+    counts = {}
+    for kind, model, index in ((SearchTerm.RESTAURANT, Restaurant, index_restaurants), (SearchTerm.MENU_ITEM, MenuItem, index_menu_items)):
+        last_id, counts[kind] = 0, 0
+        while True:
+            ids = list(model.objects.filter(pk__gt=last_id).order_by('pk').values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                break
+            # Sözlük her parti için güncellenmez, en sonda tek GROUP BY ile baştan hesaplanır
+            index(ids, update_vocabulary=False)
+            last_id, counts[kind] = ids[-1], counts[kind] + len(ids)
+    rebuild_vocabulary()
+    return counts
+
+
+_ALPHABET = '0123456789abcdefghijklmnopqrstuvwxyz'
+
+
+# Önek araması aralık olarak yazılır: 'lahm' -> term >= 'lahm' AND term < 'lahn'. LIKE 'x%'
+# (MySQL'de LIKE BINARY) harmanlamaya göre indeksi kullanamayabilir; aralık her veritabanında indeks taraması olur.
+def prefix_condition(prefix):
+    stem = prefix
+    while stem and stem[-1] == _ALPHABET[-1]:
+        stem = stem[:-1]
+    if not stem:
+        return Q(term__gte=prefix)
+    return Q(term__gte=prefix, term__lt=stem[:-1] + _ALPHABET[_ALPHABET.index(stem[-1]) + 1])
+
+
+# Son kelime, sözlükte o önekle başlayan en yaygın terimlere açılır; kelimenin kendisi varsa her zaman dahildir
+def expand(token):
+    if len(token) < settings.SEARCH_MIN_PREFIX_LENGTH:
+        return [token]
+    return list(
+        SearchWord.objects.filter(prefix_condition(token), document_count__gt=0)
+        .order_by(Case(When(term=token, then=0), default=1, output_field=IntegerField()), '-document_count')
+        .values_list('term', flat=True)[:settings.SEARCH_PREFIX_EXPANSIONS]
+    )
+
+
+# Terimin dokümanları en yüksek ağırlıktan başlayarak okunur; (term, weight, kind, object_id) indeksi
+# geriye doğru taranır ve LIMIT'e ulaşınca durur, terim ne kadar yaygın olursa olsun tüm liste okunmaz
+def _top_postings(term, start, stop):
+    return SearchTerm.objects.filter(term=term).order_by('-weight', '-kind', '-object_id').values_list('kind', 'object_id', 'weight')[start:stop]
+
+
+# Adayların terimleri (kind, object_id) indeksinden okunur ve kelime grubuyla Python'da karşılaştırılır.
+# Sorguya term koşulu eklenmez: eklenirse planlayıcı yaygın terimde term indeksini seçip yüz binlerce satır tarar.
+def _match(group, candidates):
+    group = set(group)
+    rows = []
+    for kind in {kind for kind, _ in candidates}:
+        ids = [object_id for candidate_kind, object_id in candidates if candidate_kind == kind]
+        rows.extend(
+            (kind, object_id, term, weight)
+            for object_id, term, weight in SearchTerm.objects.filter(kind=kind, object_id__in=ids)
+            .values_list('object_id', 'term', 'weight')
+            if term in group
+        )
+    return rows
+
+
+# Sorgudaki her kelime dokümanda geçmeli (AND). Son kelime yazılmaya devam ettiği için önek olarak aranır
+# ("lahm" -> lahmacun), öncekiler tam eşleşmelidir. Puan: eşleşen terimlerin ağırlık toplamı, son kelimenin
+# tam eşleşmesi ayrıca ödüllendirilir. (tür, id, puan) listesi döner.
+#
+# Adaylar sözlüğe göre en seçici kelimeden, ağırlık sırasıyla parça parça alınır; diğer kelimeler sadece bu
+# adaylar üzerinde kontrol edilir ve `first` kadar sonuç bulununca (en fazla SEARCH_CANDIDATES aday) durulur.
+# Böylece "döner" gibi yüz binlerce dokümanda geçen kelimeler sorgu süresini büyütmez; bedeli, sıralamanın
+# seçici kelimenin ağırlığına öncelik vermesi ve düşük ağırlıklı eşleşmelerin aday listesine girmeyebilmesidir.
+def search(query, first):
+    tokens = list(dict.fromkeys(tokenize(query)))[:settings.SEARCH_MAX_QUERY_TERMS]
+    if not tokens or first <= 0:
+        return []
+    *exact, last = tokens
+    groups = [[token] for token in exact] + [expand(last)]
+    if not groups[-1]:
+        return []
+
+    driver = 0
+    if len(groups) > 1:
+        counts = dict(SearchWord.objects.filter(term__in={term for group in groups for term in group}).values_list('term', 'document_count'))
+        sizes = [sum(counts.get(term, 0) for term in group) for group in groups]
+        if not all(sizes):
+            return []
+        driver = sizes.index(min(sizes))
+
+    def weigh(term, weight):
+        return weight * 2 if term == last else weight
+
+    scores = Counter()
+    size, limit = (first, first) if len(groups) == 1 else (first * 10, max(settings.SEARCH_CANDIDATES, first))
+    for start in range(0, limit, size):
+        chunk = Counter()
+        for term in groups[driver]:
+            for kind, object_id, weight in _top_postings(term, start, start + size):
+                chunk[(kind, object_id)] += weigh(term, weight)
+        if not chunk:
+            break
+        for i, group in enumerate(groups):
+            if i == driver or not chunk:
+                continue
+            matched = Counter()
+            for kind, object_id, term, weight in _match(group, chunk):
+                matched[(kind, object_id)] += weigh(term, weight)
+            chunk = Counter({key: chunk[key] + score for key, score in matched.items()})
+        for key, score in chunk.items():
+            scores.setdefault(key, score)
+        if len(scores) >= first:
+            break
+
+    # Eşit puanlarda indeks sırasıyla aynı sıra: önce restoranlar, sonra yeni kayıtlar
+    ranked = sorted(((score, kind, object_id) for (kind, object_id), score in scores.items()), reverse=True)[:first]
+    return [(kind, object_id, score) for score, kind, object_id in ranked]
@@ -0,0 +1,96 @@
+import random
+import statistics
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+from restaurants.models import MenuItem, MenuItemCategory, Restaurant
+from search.index import rebuild, search, tokenize
+from search.models import SearchTerm
+
+DISHES = [
+    'Lahmacun', 'Döner', 'İskender', 'Adana Kebap', 'Urfa Kebap', 'Mantı', 'Pide', 'Kaşarlı Pide', 'Çiğ Köfte',
+    'İçli Köfte', 'Tavuk Şiş', 'Kuzu Şiş', 'Karnıyarık', 'Mercimek Çorbası', 'Ezogelin Çorbası', 'Künefe',
+    'Baklava', 'Sütlaç', 'Ayran', 'Şalgam', 'Gözleme', 'Menemen', 'Kokoreç', 'Balık Ekmek', 'Hünkar Beğendi',
+]
+ADJECTIVES = ['Acılı', 'Bol', 'Ev Yapımı', 'Özel', 'Yoğurtlu', 'Tereyağlı', 'Fırın', 'Izgara', 'Çıtır', 'Dürüm']
+CATEGORIES = ['Kebap', 'Çorba', 'Tatlı', 'İçecek', 'Pide & Lahmacun', 'Ev Yemekleri']
+QUERIES = [
+    'lahm', 'lahmacun', 'döne', 'doner', 'iskender', 'ISKENDER', 'adana keb', 'acılı adana', 'tavuk şi', 'kuzu',
+    'mantı', 'kaşarlı pi', 'çiğ köf', 'cig kofte', 'mercimek', 'künefe', 'baklava', 'ayran', 'ev yapımı mantı',
+    'ızgara', 'tereyağlı iskender', 'kokoreç', 'hünkar', 'arama restoran 7',
+]
+
+
+class Command(BaseCommand):
+    help = "Arama sorgularının gecikmesini (p50/p95/p99) ölçer; --seed ile menü verisi üretir."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0, help="Oluşturulacak menü öğesi sayısı (ör. 1000000)")
+        parser.add_argument('--batch-size', type=int, default=10_000)
+        parser.add_argument('--repeat', type=int, default=500, help="Toplam çalıştırılacak sorgu sayısı")
+        parser.add_argument('--first', type=int, default=20)
+        parser.add_argument('--baseline', type=int, default=20, help="LIKE '%%x%%' karşılaştırması için sorgu sayısı (0: kapalı)")
+
+    def handle(self, *args, **options):
+        if options['seed']:
+            self.seed(options['seed'], options['batch_size'])
+        self.stdout.write(
+            f"{MenuItem.objects.count()} menü öğesi, {SearchTerm.objects.count()} indeks satırı ({connection.vendor})"
+        )
+
+        rng = random.Random(1)
+        timings, empty = [], 0
+        for _ in range(options['repeat']):
+            query = rng.choice(QUERIES)
+            started = time.perf_counter()
+            hits = search(query, options['first'])
+            timings.append((time.perf_counter() - started) * 1000)
+            empty += not hits
+        self.report("indeks", timings)
+        self.stdout.write(f"    sonuçsuz sorgu: {empty}")
+
+        if options['baseline']:
+            timings = []
+            for _ in range(options['baseline']):
+                words = tokenize(rng.choice(QUERIES))
+                condition = Q()
+                for word in words:
+                    condition &= Q(name__icontains=word) | Q(description__icontains=word)
+                started = time.perf_counter()
+                list(MenuItem.objects.filter(condition).values_list('id', flat=True)[:options['first']])
+                timings.append((time.perf_counter() - started) * 1000)
+            self.report("LIKE tarama", timings)
+
+    def report(self, label, timings):
+        percentiles = statistics.quantiles(timings, n=100) if len(timings) > 1 else timings * 99
+        self.stdout.write(
+            f"  {label}: p50={percentiles[49]:.2f} ms p95={percentiles[94]:.2f} ms p99={percentiles[98]:.2f} ms ({len(timings)} sorgu)"
+        )
+
+    def seed(self, item_count, batch_size):
+        self.stdout.write(f"{item_count} menü öğesi oluşturuluyor...")
+        rng = random.Random(0)
+        with transaction.atomic():
+            categories = [MenuItemCategory.objects.create(name=name) for name in CATEGORIES]
+            restaurant_count = max(item_count // 50, 1)
+            Restaurant.objects.bulk_create(
+                (Restaurant(name=f'Arama Restoran {i}', address='Adres', phone='5550000000') for i in range(restaurant_count)),
+                batch_size=batch_size,
+            )
+            restaurant_ids = list(Restaurant.objects.filter(name__startswith='Arama Restoran ').values_list('id', flat=True))
+            for start in range(0, item_count, batch_size):
+                MenuItem.objects.bulk_create(
+                    MenuItem(
+                        restaurant_id=restaurant_ids[i % len(restaurant_ids)],
+                        category=rng.choice(categories),
+                        name=f'{rng.choice(ADJECTIVES)} {rng.choice(DISHES)}',
+                        description=f'{rng.choice(DISHES)} ve {rng.choice(DISHES)} ile servis edilir',
+                        price=rng.randint(20, 400),
+                    )
+                    for i in range(start, min(start + batch_size, item_count))
+                )
+        # bulk_create sinyal göndermez; indeks baştan kurulur
+        started = time.perf_counter()
+        counts = rebuild(batch_size)
+        self.stdout.write(f"  indeks: {counts} ({time.perf_counter() - started:.1f}s)")
@@ -0,0 +1,21 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from search.autocomplete import build, save_snapshot
+
+
+class Command(BaseCommand):
+    help = "Otomatik tamamlama ağacını veritabanından kurar ve işçilerin açılışta yükleyeceği anlık görüntüye yazar."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', help="Anlık görüntü dosyası (varsayılan: AUTOCOMPLETE_SNAPSHOT_PATH)")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        autocomplete = build()
+        built = time.perf_counter()
+        path = options['path'] or settings.AUTOCOMPLETE_SNAPSHOT_PATH
+        save_snapshot(autocomplete, path)
+        self.stdout.write(
+            f"{len(autocomplete)} öneri ({built - started:.1f}s), anlık görüntü: {path} ({time.perf_counter() - built:.1f}s)"
+        )
@@ -0,0 +1,15 @@
+import time
+from django.core.management.base import BaseCommand
+from search.index import rebuild
+
+
+class Command(BaseCommand):
+    help = "Arama indeksini tüm restoran ve menü öğelerinden yeniden oluşturur."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, help="Bir seferde indekslenen kayıt sayısı")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        counts = rebuild(options['batch_size'])
+        self.stdout.write(f"{counts} indekslendi ({time.perf_counter() - started:.1f}s)")
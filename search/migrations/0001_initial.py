@@ -0,0 +1,62 @@
+# Generated by Django 5.1 on 2026-10-18 11:30
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+# Mevcut menü ve restoranlar indekslenir; sonrasında sinyaller indeksi güncel tutar
+def build_index(apps, schema_editor):
+    from search.index import menu_item_terms, restaurant_terms
+
+    SearchTerm = apps.get_model('search', 'SearchTerm')
+    SearchWord = apps.get_model('search', 'SearchWord')
+    sources = (
+        ('restaurant', apps.get_model('restaurants', 'Restaurant').objects.select_related('category'), restaurant_terms),
+        ('menu_item', apps.get_model('restaurants', 'MenuItem').objects.select_related('restaurant', 'category'), menu_item_terms),
+    )
+    for kind, queryset, terms in sources:
+        rows = []
+        for obj in queryset.iterator(chunk_size=1000):
+            rows.extend(SearchTerm(term=term, kind=kind, object_id=obj.pk, weight=weight) for term, weight in terms(obj).items())
+            if len(rows) >= 1000:
+                SearchTerm.objects.bulk_create(rows)
+                rows = []
+        SearchTerm.objects.bulk_create(rows)
+    SearchWord.objects.bulk_create(
+        (SearchWord(term=row['term'], document_count=row['count']) for row in SearchTerm.objects.values('term').annotate(count=Count('id'))),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('restaurants', '0011_menuitem_image_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchWord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64, unique=True)),
+                ('document_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64)),
+                ('kind', models.CharField(choices=[('menu_item', 'Menü öğesi'), ('restaurant', 'Restoran')], max_length=16)),
+                ('object_id', models.BigIntegerField()),
+                ('weight', models.PositiveIntegerField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['term', 'weight', 'kind', 'object_id'], name='searchterm_term_weight_idx'), models.Index(fields=['kind', 'object_id'], name='searchterm_object_idx')],
+            },
+        ),
+        migrations.RunPython(build_index, migrations.RunPython.noop),
+    ]
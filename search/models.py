@@ -0,0 +1,37 @@
+from django.db import models
+
+
+# Ters indeks: her satır bir terimin bir dokümanda (menü öğesi veya restoran) geçtiğini ve ağırlığını tutar
+class SearchTerm(models.Model):
+    MENU_ITEM = 'menu_item'
+    RESTAURANT = 'restaurant'
+    KIND_CHOICES = [
+        (MENU_ITEM, 'Menü öğesi'),
+        (RESTAURANT, 'Restoran'),
+    ]
+
+    term = models.CharField(max_length=64)  # normalize edilmiş kelime (küçük harf, Türkçe karakterler sadeleştirilmiş)
+    kind = models.CharField(max_length=16, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    weight = models.PositiveIntegerField()
+
+    class Meta:
+        indexes = [
+            # Bir terimin dokümanları ağırlığa göre sıralı okunur; ilk N sonuç için tüm liste taranmaz
+            models.Index(fields=['term', 'weight', 'kind', 'object_id'], name='searchterm_term_weight_idx'),
+            # Doküman güncellenince eski terimleri silmek için
+            models.Index(fields=['kind', 'object_id'], name='searchterm_object_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.term} -> {self.kind}#{self.object_id} ({self.weight})'
+
+
+# Sözlük: her terimin kaç dokümanda geçtiği. Önek açılımı (lahm -> lahmacun) ve en seçici kelimenin
+# bulunması için kullanılır; SearchTerm satırlarıyla birlikte artımlı güncellenir
+class SearchWord(models.Model):
+    term = models.CharField(max_length=64, unique=True)
+    document_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f'{self.term} ({self.document_count})'
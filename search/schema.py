@@ -0,0 +1,85 @@
+import graphene
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from restaurants.schema import MenuItemType, RestaurantType
+from search import autocomplete
+from search.index import search, tokenize
+from search.models import SearchTerm
+from yemeksepeti_clone.cache import aquery_cache_key, aread_through, query_cache_key, read_through
+from yemeksepeti_clone.loaders import get_loaders, is_async
+
+
+# Arama sonucu: menü öğesi veya restoran (kind alanına göre biri dolu olur)
+class SearchResultType(graphene.ObjectType):
+    kind = graphene.String()
+    score = graphene.Int()
+    menu_item = graphene.Field(MenuItemType)
+    restaurant = graphene.Field(RestaurantType)
+
+    # Sonuçlardaki nesneler loader ile tek sorguda yüklenir
+    def resolve_menu_item(self, info):
+        if self['kind'] == SearchTerm.MENU_ITEM:
+            return get_loaders(info).menu_item.load(self['object_id'])
+        return None
+
+    def resolve_restaurant(self, info):
+        if self['kind'] == SearchTerm.RESTAURANT:
+            return get_loaders(info).restaurant.load(self['object_id'])
+        return None
+
+
+# Otomatik tamamlama önerisi; kind: menu_item, restaurant veya category
+class SuggestionType(graphene.ObjectType):
+    kind = graphene.String()
+    text = graphene.String()
+    popularity = graphene.Int()
+
+
+class Query(graphene.ObjectType):
+    # Menü öğesi, kategori ve restoran adlarında arama (Herkes görebilir)
+    search = graphene.List(SearchResultType, query=graphene.String(required=True), first=graphene.Int())
+
+    # Yazarken öneriler; bellekteki önek ağacından döner, veritabanına ve önbelleğe gitmez (Herkes görebilir)
+    autocomplete = graphene.List(SuggestionType, query=graphene.String(required=True), first=graphene.Int())
+
+    def resolve_autocomplete(self, info, query, first=None):
+        first = min(settings.AUTOCOMPLETE_TOP_K if first is None else first, settings.AUTOCOMPLETE_TOP_K)
+        if first < 0:
+            raise Exception("first negatif olamaz.")
+        # Ağaç henüz yüklenmediyse ilk istek onu veritabanından kurar; async modda bu iş parçacığında yapılır
+        if is_async(info) and not autocomplete.loaded():
+            return Query.aresolve_autocomplete(query, first)
+        return to_suggestions(autocomplete.suggest(query, first))
+
+    @staticmethod
+    async def aresolve_autocomplete(query, first):
+        return to_suggestions(await sync_to_async(autocomplete.suggest)(query, first))
+
+    def resolve_search(self, info, query, first=None):
+        first = min(settings.GRAPHQL_PAGE_SIZE if first is None else first, settings.GRAPHQL_MAX_PAGE_SIZE)
+        if first < 0:
+            raise Exception("first negatif olamaz.")
+        tokens = tuple(tokenize(query))
+        if is_async(info):
+            return Query.aresolve_search(info, query, tokens, first)
+        # Menü ve restoran yazmaları 'restaurants' sürümünü artırır; sonuçlar (tür, id, puan) olarak önbelleğe alınır
+        key = query_cache_key(info, ['restaurants'], tokens, first)
+        return to_results(info, read_through(key, lambda: search(query, first)))
+
+    @staticmethod
+    async def aresolve_search(info, query, tokens, first):
+        key = await aquery_cache_key(info, ['restaurants'], tokens, first)
+        hits = await aread_through(key, lambda: sync_to_async(search)(query, first))
+        return to_results(info, hits)
+
+
+# Sonuçlardaki id'ler loader'lara kuyruklanır; ilk menu_item/restaurant alanı hepsini tek sorguda yükler
+def to_results(info, hits):
+    loaders = get_loaders(info)
+    loaders.menu_item.schedule([object_id for kind, object_id, _ in hits if kind == SearchTerm.MENU_ITEM])
+    loaders.restaurant.schedule([object_id for kind, object_id, _ in hits if kind == SearchTerm.RESTAURANT])
+    return [{'kind': kind, 'object_id': object_id, 'score': score} for kind, object_id, score in hits]
+
+
+def to_suggestions(suggestions):
+    return [SuggestionType(kind=kind, text=text, popularity=popularity) for kind, text, popularity in suggestions]
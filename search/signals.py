@@ -0,0 +1,121 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from orders.models import OrderItem
+from restaurants.models import MenuItem, MenuItemCategory, Restaurant, RestaurantCategory
+from restaurants.signals import menu_items_imported
+from search import autocomplete
+from search.index import index_menu_items, index_restaurants, remove
+from search.models import SearchTerm
+
+# İndekslenen alanlar; update_fields bunlardan birini içermiyorsa indeks güncellenmez
+MENU_ITEM_FIELDS = {'name', 'description', 'category', 'restaurant'}
+
+
+def _indexed_fields_changed(update_fields, fields):
+    return update_fields is None or not fields.isdisjoint(update_fields)
+
+
+@receiver(post_save, sender=MenuItem)
+def index_menu_item(sender, instance, update_fields=None, **kwargs):
+    if _indexed_fields_changed(update_fields, MENU_ITEM_FIELDS):
+        index_menu_items([instance.pk])
+
+
+@receiver(post_delete, sender=MenuItem)
+def remove_menu_item(sender, instance, **kwargs):
+    remove(SearchTerm.MENU_ITEM, [instance.pk])
+
+
+# İçe aktarılan öğeler partiler halinde indekslenir, isimler otomatik tamamlamaya isim başına tek kayıtla yazılır
+@receiver(menu_items_imported)
+def index_imported_menu_items(sender, menu_items, **kwargs):
+    last_id = 0
+    while True:
+        ids = list(menu_items.filter(pk__gt=last_id).order_by('pk').values_list('pk', flat=True)[:settings.SEARCH_INDEX_BATCH_SIZE])
+        if not ids:
+            break
+        index_menu_items(ids)
+        last_id = ids[-1]
+
+    names = menu_items.values('name').annotate(count=Count('id')).order_by()
+    changes = [(autocomplete.MENU_ITEM, row['name'], row['count'], 0) for row in names.iterator()]
+    for i in range(0, len(changes), settings.SEARCH_INDEX_BATCH_SIZE):
+        _publish(changes[i:i + settings.SEARCH_INDEX_BATCH_SIZE])
+
+
+# Eski ad, restoran menüsünün yeniden indekslenmesi ve otomatik tamamlamadan çıkarılması için okunur
+@receiver(pre_save, sender=Restaurant)
+@receiver(pre_save, sender=MenuItem)
+@receiver(pre_save, sender=MenuItemCategory)
+def remember_previous_name(sender, instance, update_fields=None, **kwargs):
+    instance._previous_name = None
+    if not instance._state.adding and _indexed_fields_changed(update_fields, {'name'}):
+        instance._previous_name = sender.objects.filter(pk=instance.pk).values_list('name', flat=True).first()
+
+
+# Restoran adı menü öğelerinin dokümanında da geçer; ad değişirse menü de yeniden indekslenir
+@receiver(post_save, sender=Restaurant)
+def index_restaurant(sender, instance, update_fields=None, **kwargs):
+    if not _indexed_fields_changed(update_fields, {'name', 'category'}):
+        return
+    index_restaurants([instance.pk])
+    if getattr(instance, '_previous_name', None) not in (None, instance.name):
+        index_menu_items(MenuItem.objects.filter(restaurant_id=instance.pk))
+
+
+@receiver(post_delete, sender=Restaurant)
+def remove_restaurant(sender, instance, **kwargs):
+    remove(SearchTerm.RESTAURANT, [instance.pk])
+
+
+@receiver(post_save, sender=MenuItemCategory)
+def index_menu_item_category(sender, instance, created, **kwargs):
+    if not created:
+        index_menu_items(MenuItem.objects.filter(category_id=instance.pk))
+
+
+@receiver(post_save, sender=RestaurantCategory)
+def index_restaurant_category(sender, instance, created, **kwargs):
+    if not created:
+        index_restaurants(Restaurant.objects.filter(category_id=instance.pk))
+
+
+# Otomatik tamamlama: isim değişiklikleri işlem commit edildikten sonra günlüğe yazılır (geri alınan işlem yazılmaz)
+AUTOCOMPLETE_KINDS = {
+    MenuItem: autocomplete.MENU_ITEM,
+    Restaurant: autocomplete.RESTAURANT,
+    MenuItemCategory: autocomplete.CATEGORY,
+}
+
+
+def _publish(changes):
+    transaction.on_commit(lambda: autocomplete.publish(changes))
+
+
+@receiver(post_save, sender=MenuItem)
+@receiver(post_save, sender=Restaurant)
+@receiver(post_save, sender=MenuItemCategory)
+def publish_name(sender, instance, created, **kwargs):
+    kind = AUTOCOMPLETE_KINDS[sender]
+    previous = getattr(instance, '_previous_name', None)
+    if created:
+        _publish([(kind, instance.name, 1, 0)])
+    elif previous not in (None, instance.name):
+        _publish([(kind, previous, -1, 0), (kind, instance.name, 1, 0)])
+
+
+@receiver(post_delete, sender=MenuItem)
+@receiver(post_delete, sender=Restaurant)
+@receiver(post_delete, sender=MenuItemCategory)
+def publish_removed_name(sender, instance, **kwargs):
+    _publish([(AUTOCOMPLETE_KINDS[sender], instance.name, -1, 0)])
+
+
+# Sipariş edilen yemek, aynı isimdeki önerinin popülerliğini artırır
+@receiver(post_save, sender=OrderItem)
+def publish_order_item(sender, instance, created, **kwargs):
+    if created:
+        _publish([(autocomplete.MENU_ITEM, instance.product_name, 0, instance.quantity)])
@@ -0,0 +1,147 @@
+import os
+import tempfile
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from orders.models import Order, OrderItem
+from restaurants.models import MenuItem, MenuItemCategory, Restaurant
+from search import autocomplete
+from search.index import normalize, search
+from users.models import User
+from yemeksepeti_clone.schema import schema
+
+
+class SearchIndexTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.kebap = MenuItemCategory.objects.create(name="Kebap")
+        self.restaurant = Restaurant.objects.create(name="Köşe Ocakbaşı", address="Adres", phone="5551234567")
+        self.iskender = MenuItem.objects.create(restaurant=self.restaurant, category=self.kebap, name="İskender Döner", price=10)
+        self.adana = MenuItem.objects.create(restaurant=self.restaurant, category=self.kebap, name="Acılı Adana", description="Döner değil", price=10)
+        self.lahmacun = MenuItem.objects.create(restaurant=self.restaurant, name="Lahmacun", price=10)
+
+    def ids(self, query):
+        return [(kind, object_id) for kind, object_id, score in search(query, 20)]
+
+    def test_turkish_folding(self):
+        """Türkçe büyük/küçük harf ve karakterler sadeleştirilmeli"""
+        self.assertEqual(normalize("İSKENDER Döner ISLAK Şiş"), "iskender doner islak sis")
+        self.assertEqual(self.ids("ISKENDER"), [('menu_item', self.iskender.pk)])
+        # Restoran adı menü öğelerinde de düşük ağırlıkla indekslenir; restoranın kendisi önce gelir
+        self.assertEqual(self.ids("kose ocakbasi")[0], ('restaurant', self.restaurant.pk))
+
+    def test_prefix_and_ranking(self):
+        """Son kelime önek olarak aranmalı, isimde geçen sonuç açıklamada geçenden önce gelmeli"""
+        self.assertEqual(self.ids("lahm"), [('menu_item', self.lahmacun.pk)])
+        self.assertEqual(self.ids("döne"), [('menu_item', self.iskender.pk), ('menu_item', self.adana.pk)])
+        self.assertEqual(self.ids("acili don"), [('menu_item', self.adana.pk)])
+        self.assertEqual(self.ids("kebap lahm"), [])
+
+    def test_index_follows_changes(self):
+        """Menü, kategori ve restoran değişiklikleri indekse yansımalı"""
+        self.lahmacun.name = "Fındıklı Lahmacun"
+        self.lahmacun.save()
+        self.assertEqual(self.ids("findikli"), [('menu_item', self.lahmacun.pk)])
+
+        self.kebap.name = "Izgara"
+        self.kebap.save()
+        self.assertEqual(len(self.ids("izgara")), 2)
+
+        self.restaurant.name = "Yeni Ocak"
+        self.restaurant.save()
+        self.assertEqual(len(self.ids("yeni ocak")), 4)
+        self.assertEqual(self.ids("kose"), [])
+
+        self.adana.delete()
+        self.assertEqual(self.ids("adana"), [])
+
+    def test_graphql_search(self):
+        """search alanı sonuçları tek sorguda yüklemeli ve mutasyondan sonra güncel dönmeli"""
+        query = '{ search(query: "döner", first: 5) { kind score menuItem { name restaurant { name } } restaurant { name } } }'
+        request = RequestFactory().post('/graphql/')
+        request.user = AnonymousUser()
+        with CaptureQueriesContext(connection) as captured:
+            result = schema.execute(query, context_value=request)
+        self.assertIsNone(result.errors)
+        self.assertEqual([hit['menuItem']['name'] for hit in result.data['search']], ["İskender Döner", "Acılı Adana"])
+        self.assertEqual(len(captured), 4)  # önek açılımı + indeks + menü öğeleri + restoran
+
+        admin = User.objects.create_user(email="admin@example.com", password="Parola123!", firstName="Admin", lastName="Admin", isAdmin=True)
+        request.user = admin
+        result = schema.execute('mutation { updateMenuItem(id: %d, name: "Döner Dürüm") { menuItem { id } } }' % self.lahmacun.pk, context_value=request)
+        self.assertIsNone(result.errors)
+        request = RequestFactory().post('/graphql/')
+        request.user = AnonymousUser()
+        result = schema.execute(query, context_value=request)
+        self.assertEqual(len(result.data['search']), 3)
+
+
+@override_settings(AUTOCOMPLETE_SNAPSHOT_PATH='', AUTOCOMPLETE_SYNC_INTERVAL=0)
+class AutocompleteTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        autocomplete.reset()
+        self.restaurant = Restaurant.objects.create(name="Dönerci Baba", address="Adres", phone="5551234567")
+        self.iskender = MenuItem.objects.create(restaurant=self.restaurant, name="İskender Döner", price=10)
+        self.doner = MenuItem.objects.create(restaurant=self.restaurant, name="Döner Dürüm", price=10)
+        MenuItem.objects.create(restaurant=self.restaurant, name="Dolma", price=10)
+        user = User.objects.create_user(email="user@example.com", password="Parola123!", firstName="Ali", lastName="Veli")
+        OrderItem.objects.create(order=Order.objects.create(user=user), product_name="İskender Döner", quantity=5, price=10)
+
+    def texts(self, prefix, first=10):
+        return [text for kind, text, popularity in autocomplete.suggest(prefix, first)]
+
+    def test_prefix_and_popularity(self):
+        """Her kelimenin başından eşleşmeli, popüler öneri önce gelmeli ve veritabanına gidilmemeli"""
+        autocomplete.warm()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.texts("döne"), ["İskender Döner", "Döner Dürüm", "Dönerci Baba"])
+            self.assertEqual(self.texts("DO", first=2), ["İskender Döner", "Dolma"])  # eşit popülerlikte alfabetik
+            self.assertEqual(self.texts("dol"), ["Dolma"])
+            self.assertEqual(self.texts("iskender d"), ["İskender Döner"])
+            self.assertEqual(self.texts("dx"), [])
+
+            request = RequestFactory().post('/graphql/')
+            request.user = AnonymousUser()
+            result = schema.execute('{ autocomplete(query: "isk") { kind text popularity } }', context_value=request)
+        self.assertIsNone(result.errors)
+        self.assertEqual(result.data['autocomplete'], [{'kind': 'menu_item', 'text': "İskender Döner", 'popularity': 6}])
+
+    def test_first_is_validated(self):
+        """autocomplete ve search negatif first'i reddetmeli, 0 için boş liste dönmeli"""
+        autocomplete.warm()
+        request = RequestFactory().post('/graphql/')
+        request.user = AnonymousUser()
+        for field in ('autocomplete', 'search'):
+            result = schema.execute('{ %s(query: "döne", first: -2) { __typename } }' % field, context_value=request)
+            self.assertEqual(result.errors[0].message, "first negatif olamaz.")
+            result = schema.execute('{ %s(query: "döne", first: 0) { __typename } }' % field, context_value=request)
+            self.assertIsNone(result.errors)
+            self.assertEqual(result.data[field], [])
+
+    def test_changes_are_applied(self):
+        """Menü değişiklikleri commit sonrası ağaca yansımalı"""
+        autocomplete.warm()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.doner.name = "Tavuk Dürüm"
+            self.doner.save()
+            self.iskender.delete()
+            MenuItemCategory.objects.create(name="Tatlılar")
+        self.assertEqual(self.texts("döne"), ["Dönerci Baba"])
+        self.assertEqual(self.texts("dur"), ["Tavuk Dürüm"])
+        self.assertEqual(self.texts("tatl"), ["Tatlılar"])
+
+        # Aynı isimde yeni bir öğe eklenince sipariş geçmişiyle birlikte geri gelir
+        with self.captureOnCommitCallbacks(execute=True):
+            MenuItem.objects.create(restaurant=self.restaurant, name="İskender Döner", price=10)
+        self.assertEqual(autocomplete.suggest("isk", 1), [(autocomplete.MENU_ITEM, "İskender Döner", 6)])
+
+    def test_snapshot(self):
+        """Anlık görüntüden yüklenen ağaç aynı önerileri vermeli"""
+        path = os.path.join(tempfile.mkdtemp(), 'autocomplete.pickle')
+        autocomplete.save_snapshot(autocomplete.build(), path)
+        with override_settings(AUTOCOMPLETE_SNAPSHOT_PATH=path), self.assertNumQueries(0):
+            autocomplete.warm()
+            self.assertEqual(self.texts("döne"), ["İskender Döner", "Döner Dürüm", "Dönerci Baba"])
@@ -0,0 +1,21 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from users.hashing import check_password
+
+UserModel = get_user_model()
+
+
+# ModelBackend ile aynı akış; parola doğrulaması istek işçisi yerine parola havuzunda yapılır
+class PooledPasswordBackend(ModelBackend):
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return
+        try:
+            user = UserModel._default_manager.get_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            check_password(None, password)
+        else:
+            if check_password(user, password) and self.user_can_authenticate(user):
+                return user
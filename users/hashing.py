@@ -0,0 +1,113 @@
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from django.conf import settings
+from django.contrib.auth.hashers import identify_hasher, make_password
+
+
+class HashingBusy(Exception):
+    pass
+
+
+# Alt işlemde çalışır: sadece ayarlara (PASSWORD_HASHERS) ihtiyaç duyar, veritabanına dokunmaz
+def _verify(password, encoded):
+    started = time.perf_counter()
+    try:
+        hasher = identify_hasher(encoded)
+    except ValueError:
+        return False, False, time.perf_counter() - started
+    is_correct = hasher.verify(password, encoded)
+    must_update = is_correct and hasher.must_update(encoded)
+    return is_correct, must_update, time.perf_counter() - started
+
+
+class PasswordHasherPool:
+    """
+    Parola doğrulamasını (PBKDF2 vb.) istek işçisinden ayrı, sınırlı bir havuzda çalıştırır.
+    Aynı anda en fazla `workers` hash hesaplanır; `max_pending` dolarsa yeni istekler beklemeden reddedilir.
+    """
+
+    def __init__(self, kind, workers, max_pending):
+        self.kind = kind
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = None
+        self._slots = threading.BoundedSemaphore(max_pending) if workers else None
+        self._lock = threading.Lock()
+        self._metrics = {
+            'submitted': 0, 'rejected': 0, 'in_flight': 0, 'max_in_flight': 0,
+            'hash_seconds': 0.0, 'wait_seconds': 0.0, 'max_wait_seconds': 0.0,
+        }
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                if self.kind == 'process':
+                    # spawn: çok iş parçacıklı sunucu işleminden fork almak güvenli değildir
+                    self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'))
+                else:
+                    self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix='password-hasher')
+            return self._executor
+
+    def _record(self, **values):
+        with self._lock:
+            for name, value in values.items():
+                self._metrics[name] += value
+            self._metrics['max_in_flight'] = max(self._metrics['max_in_flight'], self._metrics['in_flight'])
+
+    def verify(self, password, encoded):
+        if not self.workers:
+            return _verify(password, encoded)[:2]
+        if not self._slots.acquire(blocking=False):
+            self._record(rejected=1)
+            raise HashingBusy("Çok fazla giriş isteği var, lütfen tekrar deneyin.")
+        self._record(submitted=1, in_flight=1)
+        started = time.perf_counter()
+        try:
+            is_correct, must_update, hash_seconds = self._get_executor().submit(_verify, password, encoded).result()
+        finally:
+            self._slots.release()
+            self._record(in_flight=-1)
+        wait_seconds = max(time.perf_counter() - started - hash_seconds, 0.0)
+        self._record(hash_seconds=hash_seconds, wait_seconds=wait_seconds)
+        with self._lock:
+            self._metrics['max_wait_seconds'] = max(self._metrics['max_wait_seconds'], wait_seconds)
+        return is_correct, must_update
+
+    def metrics(self):
+        with self._lock:
+            return dict(self._metrics, workers=self.workers, max_pending=self.max_pending)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+_dummy_password = None
+
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = PasswordHasherPool(
+                settings.PASSWORD_HASHER_POOL, settings.PASSWORD_HASHER_WORKERS, settings.PASSWORD_HASHER_MAX_PENDING
+            )
+        return _pool
+
+
+# user.check_password ile aynı sonuç; hash eski parametrelerle üretilmişse parola yeniden kaydedilir.
+# Kullanıcı yoksa (user=None) var/yok ayrımı zamanlamadan anlaşılmasın diye yine bir hash hesaplanır.
+def check_password(user, password):
+    global _dummy_password
+    if password is None:
+        return False
+    if user is None or not user.has_usable_password():
+        if _dummy_password is None:
+            _dummy_password = make_password('dummy')
+        get_pool().verify(password, _dummy_password)
+        return False
+    is_correct, must_update = get_pool().verify(password, user.password)
+    if must_update:
+        user.set_password(password)
+        user.save(update_fields=['password'])
+    return is_correct
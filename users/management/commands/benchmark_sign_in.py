@@ -0,0 +1,106 @@
+import json
+import random
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+from django.core.management.base import BaseCommand
+from django.test import Client
+from users.hashing import get_pool
+from users.models import User
+
+SIGN_IN = 'mutation($email: String!, $password: String!) { signIn(email: $email, password: $password) { token } }'
+READ = 'query($first: Int) { allRestaurants(first: $first) { edges { node { name menuItems { name price } } } } }'
+
+
+class Command(BaseCommand):
+    help = "Saniyedeki giriş sayısını ve girişler sürerken menü okuma gecikmesini ölçer."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--duration', type=float, default=10.0, help="Her aşamanın süresi (saniye)")
+        parser.add_argument('--login-threads', type=int, default=8)
+        parser.add_argument('--read-threads', type=int, default=4)
+        parser.add_argument('--url', help="Çalışan bir sunucu (ör. http://localhost:8000/graphql/); verilmezse işlem içinde ölçülür")
+        parser.add_argument('--email', default='bench-login@example.com')
+        parser.add_argument('--password', default='Parola123!')
+
+    def handle(self, *args, **options):
+        if not options['url'] and not User.objects.filter(email=options['email']).exists():
+            User.objects.create_user(email=options['email'], password=options['password'], firstName='Bench', lastName='Login')
+
+        post = self.remote_post(options['url']) if options['url'] else self.local_post()
+        credentials = {'email': options['email'], 'password': options['password']}
+
+        self.stdout.write("1) Sadece okuma")
+        _, reads = self.run(post, options['duration'], 0, options['read_threads'], credentials)
+        baseline = self.report_reads(reads)
+
+        self.stdout.write(f"2) Okuma + {options['login_threads']} eşzamanlı giriş")
+        logins, reads = self.run(post, options['duration'], options['login_threads'], options['read_threads'], credentials)
+        under_load = self.report_reads(reads)
+
+        succeeded = sum(1 for ok, _ in logins if ok)
+        self.stdout.write(f"   giriş: {succeeded / options['duration']:.1f}/sn başarılı, {len(logins) - succeeded} reddedilen/hatalı")
+        if logins:
+            self.stdout.write(f"   giriş gecikmesi p50={self.percentile([d for _, d in logins], 50):.1f} ms p99={self.percentile([d for _, d in logins], 99):.1f} ms")
+        if baseline and under_load:
+            self.stdout.write(f"   okuma p99 artışı: {under_load / baseline:.2f}x")
+        if not options['url']:
+            self.stdout.write(f"   parola havuzu: {get_pool().metrics()}")
+
+    def local_post(self):
+        local = threading.local()
+
+        def post(query, variables):
+            if not hasattr(local, 'client'):
+                local.client = Client(SERVER_NAME='localhost')
+            response = local.client.post('/graphql/', json.dumps({'query': query, 'variables': variables}), content_type='application/json')
+            return response.status_code == 200 and not response.json().get('errors')
+        return post
+
+    def remote_post(self, url):
+        def post(query, variables):
+            request = urllib.request.Request(
+                url, json.dumps({'query': query, 'variables': variables}).encode(), {'Content-Type': 'application/json'}
+            )
+            try:
+                with urllib.request.urlopen(request, timeout=30) as response:
+                    return not json.loads(response.read()).get('errors')
+            except urllib.error.URLError:
+                return False
+        return post
+
+    def run(self, post, duration, login_threads, read_threads, credentials):
+        deadline = time.perf_counter() + duration
+        logins, reads = [], []
+
+        def loop(results, query, variables):
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                ok = post(query, variables())
+                results.append((ok, (time.perf_counter() - started) * 1000))
+
+        threads = [threading.Thread(target=loop, args=(logins, SIGN_IN, lambda: credentials)) for _ in range(login_threads)]
+        threads += [threading.Thread(target=loop, args=(reads, READ, lambda: {'first': random.randint(1, 20)})) for _ in range(read_threads)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return logins, reads
+
+    def percentile(self, values, percent):
+        if len(values) < 2:
+            return values[0] if values else 0.0
+        return statistics.quantiles(values, n=100)[percent - 1] if percent < 100 else max(values)
+
+    def report_reads(self, reads):
+        durations = [duration for _, duration in reads]
+        if not durations:
+            self.stdout.write("   okuma yok")
+            return None
+        p99 = self.percentile(durations, 99)
+        self.stdout.write(
+            f"   okuma: {len(durations)} istek, p50={self.percentile(durations, 50):.1f} ms p99={p99:.1f} ms"
+        )
+        return p99
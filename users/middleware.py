@@ -0,0 +1,17 @@
+from graphql_jwt.utils import get_http_authorization
+from users.tokens import TokenError, authenticate_token
+
+
+# Authorization başlığındaki token istek başına bir kez çözülür (resolver başına değil)
+class JWTAuthenticationMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = get_http_authorization(request)
+        if token:
+            try:
+                request.user = authenticate_token(token)
+            except TokenError:
+                pass  # Geçersiz veya süresi dolmuş token: istek anonim olarak devam eder
+        return self.get_response(request)
@@ -0,0 +1,27 @@
+# Generated by Django 5.1 on 2026-10-18 13:22
+
+from django.db import migrations, models
+
+
+# Restoranı olan kullanıcılar restoran sahibi rolünü korur
+def mark_existing_owners(apps, schema_editor):
+    User = apps.get_model('users', 'User')
+    Restaurant = apps.get_model('restaurants', 'Restaurant')
+    User.objects.filter(pk__in=Restaurant.objects.filter(owner__isnull=False).values('owner_id')).update(is_restaurant_owner=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurants', '0010_restaurant_owner'),
+        ('users', '0008_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='is_restaurant_owner',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(mark_existing_owners, migrations.RunPython.noop),
+    ]
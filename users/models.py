@@ -32,6 +32,7 @@ class User(AbstractBaseUser, PermissionsMixin):
     is_staff = models.BooleanField(default=False)
     is_active = models.BooleanField(default=True)
     is_customer = models.BooleanField(default=False)  # Müşteri alanı eklendi
+    is_restaurant_owner = models.BooleanField(default=False)  # Restoran oluşturabilir / yönetebilir
     created_at = models.DateTimeField(auto_now_add=True)  # Oluşturulma zamanı
     updated_at = models.DateTimeField(auto_now=True)      # Güncellenme zamanı
 
@@ -40,5 +41,11 @@ class User(AbstractBaseUser, PermissionsMixin):
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['firstName', 'lastName']
 
+    class Meta:
+        indexes = [
+            # Şifre sıfırlama telefon numarasıyla kullanıcı arar
+            models.Index(fields=['phone_number'], name='user_phone_number_idx'),
+        ]
+
     def __str__(self):
         return self.email
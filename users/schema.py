@@ -1,24 +1,32 @@
 import graphene
 from graphene_django import DjangoObjectType
-import jwt
 from users.models import User
+from users.hashing import check_password
+from users.tokens import TokenError, issue_tokens, refresh_tokens
 from yemeksepeti_clone.decorator import roles_required
-from django.conf import settings
+from yemeksepeti_clone.loaders import fetch_one
+from yemeksepeti_clone.optimizer import optimize
+from yemeksepeti_clone.pagination import paginate
 
 # Kullanıcı modelini GraphQL için tanımlama
 class UserType(DjangoObjectType):
     class Meta:
         model = User
-        fields = ("id", "firstName", "lastName", "email", "birthDate", "isAdmin", "is_customer", "phone_number") # phone_number eklendi
+        fields = ("id", "firstName", "lastName", "email", "birthDate", "isAdmin", "is_customer", "is_restaurant_owner", "phone_number") # phone_number eklendi
+
+# Sayfalı kullanıcı listesi için Relay connection tipi
+class UserConnection(graphene.relay.Connection):
+    class Meta:
+        node = UserType
 
 # Sorgular
 class Query(graphene.ObjectType):
     # Tüm kullanıcıları listeleme (Sadece STAFF yetkisi olanlar)
-    all_users = graphene.List(UserType)
+    all_users = graphene.Field(UserConnection, first=graphene.Int(), after=graphene.String())
 
     @roles_required("STAFF")  # Sadece staff kullanıcıları bu sorguyu yapabilir
-    def resolve_all_users(root, info):
-        return User.objects.all()
+    def resolve_all_users(root, info, first=None, after=None):
+        return paginate(User.objects.all(), UserConnection, info, first, after)
 
     # Belirli bir kullanıcıyı ID ile getirme (STAFF ve CUSTOMER yetkisi olanlar)
     user = graphene.Field(UserType, id=graphene.Int(required=True))
@@ -28,10 +36,7 @@ class Query(graphene.ObjectType):
         user = info.context.user
         # Kullanıcı kendi bilgilerini sorguluyorsa, ona izin veriyoruz
         if user.isAdmin or user.is_staff or user.id == id:
-            try:
-                return User.objects.get(pk=id)
-            except User.DoesNotExist:
-                raise Exception("Kullanıcı bulunamadı.")
+            return fetch_one(info, optimize(User.objects.all(), info).filter(pk=id), "Kullanıcı bulunamadı.")
         raise Exception("Bu işlemi gerçekleştirme yetkiniz yok.")
 
 # Kullanıcı oluşturma mutasyonu (Sadece STAFF yetkisi olanlar)
@@ -43,11 +48,12 @@ class CreateUser(graphene.Mutation):
         birth_date = graphene.Date(required=True)
         password = graphene.String(required=True)
         is_customer = graphene.Boolean(required=False)  # Müşteri olup olmadığını belirtmek
+        is_restaurant_owner = graphene.Boolean(required=False)  # Restoran oluşturabilir mi
 
     user = graphene.Field(UserType)
 
     @roles_required("STAFF")  # Sadece staff kullanıcıları yeni kullanıcı oluşturabilir
-    def mutate(self, info, first_name, last_name, email, birth_date, password, is_customer=False):
+    def mutate(self, info, first_name, last_name, email, birth_date, password, is_customer=False, is_restaurant_owner=False):
         if User.objects.filter(email=email).exists():
             raise Exception("Bu email adresi zaten kayıtlı.")
         user = User.objects.create(
@@ -55,7 +61,8 @@ class CreateUser(graphene.Mutation):
             lastName=last_name,
             email=email,
             birthDate=birth_date,
-            is_customer=is_customer  # Müşteri olup olmadığını ayarla
+            is_customer=is_customer,  # Müşteri olup olmadığını ayarla
+            is_restaurant_owner=is_restaurant_owner,
         )
         user.set_password(password)
         user.save()
@@ -119,17 +126,33 @@ class SignIn(graphene.Mutation):
 
     user = graphene.Field(UserType)
     token = graphene.String()
+    refresh_token = graphene.String()
 
     def mutate(self, info, email, password):
         try:
             user = User.objects.get(email=email)
         except User.DoesNotExist:
             raise Exception("Kullanıcı bulunamadı.")
-        if not user.check_password(password):
+        # Parola doğrulaması sınırlı havuzda yapılır; yoğunlukta istek işçileri hash ile dolmaz
+        if not check_password(user, password):
             raise Exception("Geçersiz Parola")
-        payload = {"email": user.email, "exp": 1000000}
-        token = jwt.encode(payload, settings.SECRET_KEY, settings.JWT_ALGORITHM)
-        return SignIn(user=user, token=token)
+        token, refresh_token = issue_tokens(user)
+        return SignIn(user=user, token=token, refresh_token=refresh_token)
+
+# Token yenileme mutasyonu (Herkes için): yenileme token'ı karşılığında yeni token çifti
+class RefreshToken(graphene.Mutation):
+    class Arguments:
+        refresh_token = graphene.String(required=True)
+
+    token = graphene.String()
+    refresh_token = graphene.String()
+
+    def mutate(self, info, refresh_token):
+        try:
+            user, (token, refresh_token) = refresh_tokens(refresh_token)
+        except TokenError as e:
+            raise Exception(str(e))
+        return RefreshToken(token=token, refresh_token=refresh_token)
 
 # Mutasyonlar
 class Mutation(graphene.ObjectType):
@@ -137,3 +160,4 @@ class Mutation(graphene.ObjectType):
     update_user = UpdateUser.Field()
     delete_user = DeleteUser.Field()
     sign_in = SignIn.Field()
+    refresh_token = RefreshToken.Field()
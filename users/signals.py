@@ -0,0 +1,14 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from users.models import User
+from users.tokens import token_cache
+from yemeksepeti_clone.permissions import invalidate_permissions
+
+
+# isAdmin / is_staff / is_customer / is_restaurant_owner değişebileceği için kullanıcı kaydedildiğinde rol önbelleği
+# ve bu işlemdeki token önbelleği silinir (diğer işlemler erişim token'ı süresi dolunca yeniler)
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_permissions(sender, instance, **kwargs):
+    invalidate_permissions(instance.pk)
+    token_cache.discard_user(instance.pk)
@@ -1,6 +1,13 @@
 # users/tests.py
-from django.test import TestCase
+import json
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from users.hashing import HashingBusy, PasswordHasherPool
 from users.models import User
+from users.tokens import authenticate_token, issue_tokens, token_cache
+from yemeksepeti_clone.permissions import compute_permissions
 
 class UserTestCase(TestCase):
     def setUp(self):
@@ -28,3 +35,100 @@ class UserTestCase(TestCase):
                 email="selinozluk@gmail.com",  # Aynı email ile kullanıcı oluşturma denemesi
                 birthDate="2006-08-07"
             )
+
+
+class TokenAuthenticationTestCase(TestCase):
+    me_query = '{ user(id: %d) { email } }'
+
+    def setUp(self):
+        cache.clear()
+        token_cache.clear()
+        self.user = User.objects.create_user(email="musteri@example.com", password="Parola123!", firstName="Ali", lastName="Veli", is_customer=True)
+
+    def post(self, query, token=None):
+        headers = {'HTTP_AUTHORIZATION': f'JWT {token}'} if token else {}
+        return self.client.post('/graphql/', json.dumps({'query': query}), content_type='application/json', **headers).json()
+
+    def sign_in(self):
+        data = self.post('mutation { signIn(email: "musteri@example.com", password: "Parola123!") { token refreshToken } }')
+        return data['data']['signIn']['token'], data['data']['signIn']['refreshToken']
+
+    def test_token_is_verified_once(self):
+        """Aynı token ile yapılan sonraki isteklerde users tablosuna gidilmemeli"""
+        token, _ = self.sign_in()
+        data = self.post(self.me_query % self.user.id, token)
+        self.assertEqual(data['data']['user']['email'], "musteri@example.com")
+
+        with CaptureQueriesContext(connection) as captured:
+            data = self.post('mutation { createOrder { order { id } } }', token)
+        self.assertIsNone(data.get('errors'))
+        self.assertFalse(any('FROM "users_user"' in q['sql'] for q in captured))
+
+    def test_permissions_use_snapshot_fields(self):
+        """Token'dan çözülen kullanıcının rolleri hesaplanırken users tablosuna gidilmemeli, sadece restoranlar okunmalı"""
+        self.user.is_customer = False  # alanlar yer değiştirirse is_active ile karışmamalı
+        self.user.is_restaurant_owner = True
+        self.user.save()
+        token, _ = issue_tokens(self.user)
+        user = authenticate_token(token)
+        with CaptureQueriesContext(connection) as captured:
+            permissions = compute_permissions(user)
+        self.assertEqual(permissions.roles, {'RESTAURANT_OWNER'})
+        self.assertEqual((user.is_active, user.is_customer, user.is_restaurant_owner), (True, False, True))
+        self.assertEqual(len(captured), 1)
+        self.assertIn('FROM "restaurants_restaurant"', captured[0]['sql'])
+
+    def test_refresh_token_issues_new_pair(self):
+        """Yenileme token'ı yeni token çifti vermeli, erişim token'ı yerine kullanılamamalı"""
+        token, refresh_token = self.sign_in()
+        data = self.post('mutation { refreshToken(refreshToken: "%s") { token refreshToken } }' % refresh_token)
+        new_token = data['data']['refreshToken']['token']
+        self.assertEqual(self.post(self.me_query % self.user.id, new_token)['data']['user']['email'], "musteri@example.com")
+
+        self.assertIsNotNone(self.post(self.me_query % self.user.id, refresh_token).get('errors'))
+        self.assertIsNotNone(self.post('mutation { refreshToken(refreshToken: "%s") { token } }' % token).get('errors'))
+
+    def test_expired_token_is_rejected(self):
+        """Süresi dolmuş token ile istek anonim sayılmalı"""
+        with override_settings(JWT_ACCESS_TOKEN_LIFETIME=-1):
+            token, _ = self.sign_in()
+        self.assertIsNotNone(self.post(self.me_query % self.user.id, token).get('errors'))
+
+    def test_key_rotation(self):
+        """Eski anahtarla imzalanan token, anahtar listede kaldıkça geçerli olmalı"""
+        with override_settings(JWT_SIGNING_KEYS={'k1': 'eski-anahtar-' + 'x' * 32}, JWT_ACTIVE_KID='k1'):
+            token, _ = self.sign_in()
+        with override_settings(JWT_SIGNING_KEYS={'k2': 'yeni-anahtar-' + 'y' * 32, 'k1': 'eski-anahtar-' + 'x' * 32}, JWT_ACTIVE_KID='k2'):
+            self.assertIsNone(self.post(self.me_query % self.user.id, token).get('errors'))
+        token_cache.clear()
+        with override_settings(JWT_SIGNING_KEYS={'k2': 'yeni-anahtar-' + 'y' * 32}, JWT_ACTIVE_KID='k2'):
+            self.assertIsNotNone(self.post(self.me_query % self.user.id, token).get('errors'))
+
+
+class PasswordHasherPoolTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="musteri@example.com", password="Parola123!", firstName="Ali", lastName="Veli")
+
+    def test_verify_in_pool(self):
+        """Parola havuzda doğrulanmalı ve metrikler güncellenmeli"""
+        pool = PasswordHasherPool('thread', workers=1, max_pending=4)
+        self.assertEqual(pool.verify("Parola123!", self.user.password), (True, False))
+        self.assertEqual(pool.verify("yanlış", self.user.password), (False, False))
+        metrics = pool.metrics()
+        self.assertEqual(metrics['submitted'], 2)
+        self.assertEqual(metrics['in_flight'], 0)
+        self.assertGreater(metrics['hash_seconds'], 0)
+
+    def test_full_queue_rejects(self):
+        """Kuyruk doluysa giriş beklemeden reddedilmeli"""
+        pool = PasswordHasherPool('thread', workers=1, max_pending=0)
+        with self.assertRaises(HashingBusy):
+            pool.verify("Parola123!", self.user.password)
+        self.assertEqual(pool.metrics()['rejected'], 1)
+
+    def test_login_view_uses_pool(self):
+        """Form ile giriş parola havuzu üzerinden çalışmalı"""
+        response = self.client.post('/users/login/', {'email': "musteri@example.com", 'password': "Parola123!"})
+        self.assertEqual(response.status_code, 302)
+        response = self.client.post('/users/login/', {'email': "musteri@example.com", 'password': "yanlış"})
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,129 @@
+import hmac
+import threading
+import time
+import uuid
+from collections import OrderedDict
+import jwt
+from django.conf import settings
+from users.models import User
+
+# Token ile birlikte saklanan kullanıcı alanları; diğer alanlar erişilirse tembel (deferred) yüklenir
+SNAPSHOT_FIELDS = ('id', 'email', 'firstName', 'lastName', 'isAdmin', 'is_staff', 'is_customer', 'is_restaurant_owner', 'is_active')
+
+
+class TokenError(Exception):
+    pass
+
+
+# jti -> (token, claims, kullanıcı alanları); sınırlı boyutlu, en eski kullanılan düşer
+class TokenCache:
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, jti):
+        with self._lock:
+            entry = self._entries.get(jti)
+            if entry is not None:
+                self._entries.move_to_end(jti)
+            return entry
+
+    def set(self, jti, entry):
+        with self._lock:
+            self._entries[jti] = entry
+            self._entries.move_to_end(jti)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def discard_user(self, user_id):
+        with self._lock:
+            for jti in [jti for jti, (_, claims, _) in self._entries.items() if claims['sub'] == str(user_id)]:
+                del self._entries[jti]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = TokenCache(settings.JWT_TOKEN_CACHE_SIZE)
+
+
+def _encode(user, token_type, lifetime):
+    now = int(time.time())
+    claims = {
+        'sub': str(user.pk),
+        'email': user.email,
+        'type': token_type,
+        'jti': uuid.uuid4().hex,
+        'iat': now,
+        'exp': now + lifetime,
+    }
+    kid = settings.JWT_ACTIVE_KID
+    return jwt.encode(claims, settings.JWT_SIGNING_KEYS[kid], settings.JWT_ALGORITHM, headers={'kid': kid})
+
+
+# Kısa ömürlü erişim token'ı ve uzun ömürlü yenileme token'ı üretir
+def issue_tokens(user):
+    return (
+        _encode(user, 'access', settings.JWT_ACCESS_TOKEN_LIFETIME),
+        _encode(user, 'refresh', settings.JWT_REFRESH_TOKEN_LIFETIME),
+    )
+
+
+# İmza, kid ile seçilen anahtarla doğrulanır; eski anahtarlar JWT_SIGNING_KEYS'te kaldıkça geçerlidir
+def decode_token(token, token_type):
+    try:
+        kid = jwt.get_unverified_header(token).get('kid')
+        key = settings.JWT_SIGNING_KEYS.get(kid)
+        if key is None:
+            raise TokenError("Bilinmeyen anahtar.")
+        claims = jwt.decode(token, key, algorithms=[settings.JWT_ALGORITHM], options={'require': ['exp', 'sub', 'jti']})
+    except jwt.ExpiredSignatureError:
+        raise TokenError("Token süresi dolmuş.")
+    except jwt.InvalidTokenError:
+        raise TokenError("Geçersiz token.")
+    if claims.get('type') != token_type:
+        raise TokenError("Geçersiz token türü.")
+    return claims
+
+
+# from_db değerleri modeldeki alan sırasıyla eşler; SNAPSHOT_FIELDS sırası kullanılmaz
+SNAPSHOT_ATTNAMES = [field.attname for field in User._meta.concrete_fields if field.attname in SNAPSHOT_FIELDS]
+
+
+def _snapshot_user(values):
+    return User.from_db('default', SNAPSHOT_ATTNAMES, [values[name] for name in SNAPSHOT_ATTNAMES])
+
+
+# Erişim token'ından kullanıcıyı çözer. İmza ve kullanıcı alanları token başına bir kez
+# doğrulanır/okunur; sonraki isteklerde ne imza doğrulanır ne de users tablosuna gidilir.
+def authenticate_token(token):
+    try:
+        jti = jwt.decode(token, options={'verify_signature': False}).get('jti')
+    except jwt.InvalidTokenError:
+        raise TokenError("Geçersiz token.")
+
+    entry = token_cache.get(jti) if jti else None
+    if entry is not None and hmac.compare_digest(entry[0], token):
+        _, claims, values = entry
+        if claims['exp'] <= time.time():
+            raise TokenError("Token süresi dolmuş.")
+        return _snapshot_user(values)
+
+    claims = decode_token(token, 'access')
+    values = User.objects.filter(pk=claims['sub'], is_active=True).values(*SNAPSHOT_FIELDS).first()
+    if values is None:
+        raise TokenError("Kullanıcı bulunamadı.")
+    token_cache.set(claims['jti'], (token, claims, values))
+    return _snapshot_user(values)
+
+
+# Yenileme token'ı doğrulanır ve yeni bir erişim + yenileme token çifti verilir
+def refresh_tokens(refresh_token):
+    claims = decode_token(refresh_token, 'refresh')
+    try:
+        user = User.objects.get(pk=claims['sub'], is_active=True)
+    except User.DoesNotExist:
+        raise TokenError("Kullanıcı bulunamadı.")
+    return user, issue_tokens(user)
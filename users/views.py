@@ -4,7 +4,8 @@ from django.http import HttpResponseRedirect
 from .models import User
 from .forms import UserRegistrationForm
 from .forms import PasswordResetForm
-from django.core.mail import send_mail
+from .hashing import HashingBusy
+from notifications.queue import enqueue_email
 from cryptography.fernet import Fernet
 from django.conf import settings
 
@@ -15,9 +16,12 @@ def user_login(request):  # Bu fonksiyonu 'user_login' olarak adlandırdık
     if request.method == 'POST':
         email = request.POST.get('email')
         password = request.POST.get('password')
-        user = authenticate(request, username=email, password=password)
+        try:
+            user = authenticate(request, username=email, password=password)
+        except HashingBusy as e:
+            return render(request, 'users/login.html', {'error': str(e)}, status=503)
         if user is not None:
-            auth_login(request, user, backend='django.contrib.auth.backends.ModelBackend')
+            auth_login(request, user, backend='users.backends.PooledPasswordBackend')
             return HttpResponseRedirect('/')
         else:
             return render(request, 'users/login.html', {'error': 'Hatalı email veya şifre.'})
@@ -35,7 +39,7 @@ def register(request):
             user.email = form.cleaned_data['email']
             user.set_password(form.cleaned_data['password1'])
             user.save()
-            auth_login(request, user, backend='django.contrib.auth.backends.ModelBackend')
+            auth_login(request, user, backend='users.backends.PooledPasswordBackend')
             return HttpResponseRedirect('/')
         else:
             return render(request, 'users/register.html', {'form': form})
@@ -66,11 +70,12 @@ def password_reset(request):
                         # Doğrulama başarılı, e-posta için token oluştur ve gönder
                         token = cipher_suite.encrypt(user.email.encode())
                         print("Oluşturulan E-posta Token:", token.decode())  # Token'ı yazdır
-                        send_mail(
+                        # E-posta kuyruğa yazılır; SMTP gecikmesi yanıtı bekletmez
+                        enqueue_email(
                             'Şifre Sıfırlama Talebi',
                             f'Sıfırlama için bu linki kullanın: {request.build_absolute_uri()}?token={token.decode()}',
-                            'no-reply@yemeksepeti_clone.com',
                             [user.email],
+                            'no-reply@yemeksepeti_clone.com',
                         )
                         return render(request, 'users/password_reset_done.html', {'message': 'E-posta adresinize bir sıfırlama kodu gönderildi.'})
                 else:
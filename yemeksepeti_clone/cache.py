@@ -0,0 +1,97 @@
+import hashlib
+import time
+from django.conf import settings
+from django.core.cache import caches
+from graphql import print_ast
+from yemeksepeti_clone.routers import apin_if_recently_written, mark_scopes_written, pin_if_recently_written
+
+_MISSING = object()
+
+# İşlem içi (veya işlemler arası atomik olmayan) önbellekler: sürüm sayaçları, yetkiler ve günlükler
+# her işçide ayrı tutulur, bir işçideki yazma diğerlerinde görünmez
+LOCAL_CACHE_BACKENDS = {
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+    'django.core.cache.backends.filebased.FileBasedCache',
+}
+
+
+def is_shared_cache(alias=None):
+    return settings.CACHES[alias or settings.GRAPHQL_CACHE_ALIAS]['BACKEND'] not in LOCAL_CACHE_BACKENDS
+
+
+def get_cache():
+    return caches[settings.GRAPHQL_CACHE_ALIAS]
+
+
+# Her kapsamın (ör. "restaurant:5") bir sürüm sayacı vardır; yazma işlemleri sayacı artırır,
+# eski sürümle oluşturulmuş anahtarlar bir daha okunmaz ve TTL ile kendiliğinden düşer.
+# Sayaç silinirse (LRU) zaman damgasıyla yeniden başlatılır, böylece eski girdiler geri dönmez.
+def get_version(scope):
+    return get_cache().get_or_set(f'gql:version:{scope}', lambda: time.time_ns(), timeout=None)
+
+
+async def aget_version(scope):
+    return await get_cache().aget_or_set(f'gql:version:{scope}', time.time_ns, timeout=None)
+
+
+def bump_versions(*scopes):
+    cache = get_cache()
+    for scope in scopes:
+        key = f'gql:version:{scope}'
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), timeout=None)
+    mark_scopes_written(scopes)
+
+
+# Anahtar: kapsam sürümleri + istenen alanların şekli + sorgu argümanları
+def query_cache_key(info, scopes, *parts):
+    pin_if_recently_written(scopes)
+    return _query_cache_key(info, [(scope, get_version(scope)) for scope in scopes], parts)
+
+
+async def aquery_cache_key(info, scopes, *parts):
+    await apin_if_recently_written(scopes)
+    return _query_cache_key(info, [(scope, await aget_version(scope)) for scope in scopes], parts)
+
+
+def _query_cache_key(info, scope_versions, parts):
+    shape = [print_ast(node.selection_set) for node in info.field_nodes if node.selection_set]
+    shape += [print_ast(fragment) for name, fragment in sorted(info.fragments.items())]
+    versions = [f'{scope}@{version}' for scope, version in scope_versions]
+    digest = hashlib.sha256(repr((info.field_name, versions, shape, parts)).encode()).hexdigest()
+    return f'gql:query:{digest}'
+
+
+# Read-through: önbellekte yoksa hesaplanır ve yazılır (None değeri de önbelleğe alınır)
+def read_through(key, compute, timeout=None):
+    cache = get_cache()
+    value = cache.get(key, _MISSING)
+    if value is _MISSING:
+        value = compute()
+        cache.set(key, value, timeout=settings.GRAPHQL_CACHE_TIMEOUT if timeout is None else timeout)
+    return value
+
+
+# read_through'un async karşılığı; compute bir coroutine fonksiyonudur
+async def aread_through(key, compute, timeout=None):
+    cache = get_cache()
+    value = await cache.aget(key, _MISSING)
+    if value is _MISSING:
+        value = await compute()
+        await cache.aset(key, value, timeout=settings.GRAPHQL_CACHE_TIMEOUT if timeout is None else timeout)
+    return value
+
+
+def restaurant_scope(restaurant_id):
+    return f'restaurant:{restaurant_id}'
+
+
+# Restoran ve menü yazma işlemlerinden sonra çağrılır
+def invalidate_restaurant(restaurant_id=None):
+    scopes = ['restaurants']
+    if restaurant_id is not None:
+        scopes.append(restaurant_scope(restaurant_id))
+    bump_versions(*scopes)
@@ -1,18 +1,16 @@
-from graphql_jwt.decorators import user_passes_test
+from functools import wraps
+from graphql_jwt import exceptions
+from graphql_jwt.decorators import context
+from yemeksepeti_clone.permissions import get_permissions, has_role
 
 def roles_required(*roles):
-    def check_permission(user):
-        # Admin her şeye erişebilir
-        if user.isAdmin: 
-            return True
-        
-        # Restoran sahibi ise kendi restoranına ait verilere erişebilir
-        if "RESTAURANT_OWNER" in roles and user.is_restaurant_owner:
-            return True
-
-        # Müşteri kendi siparişlerine erişebilir
-        if "CUSTOMER" in roles and user.is_customer:
-            return True
-        
-        return False  # Yukarıdaki rollere sahip değilse erişim verilmez
-    return user_passes_test(check_permission)
+    def decorator(f):
+        @wraps(f)
+        @context(f)
+        def wrapper(context, *args, **kwargs):
+            # Roller istek başına bir kez hesaplanır; aynı istekteki diğer resolver'lar sorgu yapmaz
+            if has_role(get_permissions(context), roles):
+                return f(*args, **kwargs)
+            raise exceptions.PermissionDenied  # Yukarıdaki rollere sahip değilse erişim verilmez
+        return wrapper
+    return decorator
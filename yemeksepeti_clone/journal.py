@@ -0,0 +1,110 @@
+import logging
+import threading
+import time
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+
+def _cache():
+    return caches[settings.GRAPHQL_CACHE_ALIAS]
+
+
+class Journal:
+    """
+    Paylaşılan önbellekte sıralı değişiklik günlüğü. Kayıtlar {ad}:event:{sıra} anahtarlarında
+    {önek}_JOURNAL_TIMEOUT saniye tutulur. (Varsayılan LocMemCache işlem içidir; birden fazla
+    işçide CACHE_URL ile Redis kullanılmalıdır.)
+    """
+
+    def __init__(self, name, settings_prefix):
+        self.name = name
+        self.settings_prefix = settings_prefix
+
+    def sequence(self):
+        return _cache().get(f'{self.name}:sequence', 0)
+
+    def append(self, payload):
+        cache = _cache()
+        cache.add(f'{self.name}:sequence', 0, timeout=None)
+        sequence = cache.incr(f'{self.name}:sequence')
+        cache.set(
+            f'{self.name}:event:{sequence}', payload,
+            timeout=getattr(settings, f'{self.settings_prefix}_JOURNAL_TIMEOUT'),
+        )
+        return sequence
+
+    # (after, until] aralığındaki kayıtlar; süresi dolmuş kayıt varsa None
+    def read(self, after, until):
+        keys = [f'{self.name}:event:{n}' for n in range(after + 1, until + 1)]
+        events = _cache().get_many(keys)
+        if len(events) < len(keys):
+            return None
+        return [events[key] for key in keys]
+
+
+class JournaledState:
+    """
+    İşçi başına bellekte tutulan bir yapı (otomatik tamamlama ağacı, konum indeksi). İlk kullanımda `load`
+    (yoksa veya None dönerse `build`) ile kurulur; sonra {önek}_SYNC_INTERVAL saniyede bir günlükteki yeni
+    kayıtlar `apply(yapı, kayıtlar)` ile uygulanır, sorgular veritabanına gitmez. Günlükte eksik kayıt varsa
+    (uzun süre güncellenmemiş işçi) yapı baştan kurulur. Yapının `sequence` özniteliği uygulanan son kayıttır.
+    """
+
+    def __init__(self, journal, build, apply, load=None):
+        self.journal = journal
+        self.build = build
+        self.apply = apply
+        self.load_snapshot = load
+        self.value = None
+        self.synced_at = 0
+        self.lock = threading.Lock()
+
+    def get(self):
+        if self.value is None:
+            self.load()
+        interval = getattr(settings, f'{self.journal.settings_prefix}_SYNC_INTERVAL')
+        if time.monotonic() - self.synced_at >= interval:
+            self.sync()
+        return self.value
+
+    def loaded(self):
+        return self.value is not None
+
+    def load(self):
+        with self.lock:
+            if self.value is not None:
+                return
+            value = None
+            if self.load_snapshot is not None:
+                try:
+                    value = self.load_snapshot()
+                except Exception:
+                    logger.exception("%s anlık görüntüsü okunamadı, veritabanından kuruluyor", self.journal.name)
+            self.value = value or self.build()
+        self.sync()
+
+    def publish(self, payload):
+        self.journal.append(payload)
+        self.sync()
+
+    def sync(self):
+        if self.value is None:
+            return
+        with self.lock:
+            self.synced_at = time.monotonic()
+            sequence = self.journal.sequence()
+            if sequence <= self.value.sequence:
+                return
+            payloads = self.journal.read(self.value.sequence, sequence)
+            if payloads is None:
+                logger.warning("%s günlüğünde eksik kayıt, yeniden kuruluyor", self.journal.name)
+                self.value = self.build()
+                return
+            self.apply(self.value, payloads)
+            self.value.sequence = sequence
+
+    def reset(self):
+        with self.lock:
+            self.value = None
@@ -0,0 +1,196 @@
+import asyncio
+from collections import defaultdict
+from asgiref.sync import sync_to_async
+
+
+# Async GraphQL görünümü istek nesnesine `graphql_async = True` yazar; resolver'lar buna göre
+# ORM'e senkron ya da async (aget/afirst, async for) erişir
+def is_async(info):
+    return getattr(info.context, 'graphql_async', False)
+
+
+# İstek bazlı basit DataLoader.
+# Anahtarlar önce `schedule` ile kuyruğa alınır; ilk `load` çağrısında kuyruktaki
+# tüm anahtarlar tek bir sorgu ile yüklenir ve sonuç istek boyunca önbellekte tutulur.
+# Async modda önbellekte olmayan anahtarlar için awaitable döner; sorgu iş parçacığında çalışır.
+class DataLoader:
+    def __init__(self, batch_load_fn, default=None, is_async=False):
+        self.batch_load_fn = batch_load_fn  # Anahtar listesi alır, aynı sırada değer listesi döner
+        self.default = default
+        self.is_async = is_async
+        self._cache = {}
+        self._queue = set()
+
+    def schedule(self, keys):
+        for key in keys:
+            if key is not None and key not in self._cache:
+                self._queue.add(key)
+
+    def prime(self, key, value):
+        self._cache.setdefault(key, value)
+        self._queue.discard(key)
+
+    def load(self, key):
+        if key is None:
+            return self.default() if callable(self.default) else self.default
+        if key in self._cache:
+            return self._cache[key]
+        if self.is_async:
+            return self._aload(key)
+        self._queue.add(key)
+        self._dispatch()
+        return self._cache[key]
+
+    async def _aload(self, key):
+        self._queue.add(key)
+        # Aynı turda çözülen kardeş alanların anahtarları da kuyruğa girsin diye bir tur beklenir
+        await asyncio.sleep(0)
+        if key not in self._cache:
+            await sync_to_async(self._dispatch)()
+        return self._cache[key]
+
+    def load_many(self, keys):
+        self.schedule(keys)
+        if self.is_async:
+            return asyncio.gather(*(self._aload(key) for key in keys))
+        return [self.load(key) for key in keys]
+
+    def _dispatch(self):
+        keys = list(self._queue)
+        self._queue.clear()
+        if not keys:
+            return
+        values = self.batch_load_fn(keys)
+        for key, value in zip(keys, values):
+            self._cache[key] = value
+
+
+# Tek bir sorgu ile pk'ya göre nesne yükleyen batch fonksiyonu
+def load_by_pk(model):
+    def batch_load_fn(keys):
+        objects = model.objects.in_bulk(keys)
+        return [objects.get(key) for key in keys]
+    return batch_load_fn
+
+
+# Tek bir sorgu ile ters ilişkiyi (ör. restorana ait menü öğeleri) gruplayan batch fonksiyonu
+def load_by_fk(model, fk_field, order_by=('id',)):
+    def batch_load_fn(keys):
+        groups = defaultdict(list)
+        for obj in model.objects.filter(**{f'{fk_field}__in': keys}).order_by(*order_by):
+            groups[getattr(obj, fk_field)].append(obj)
+        return [groups.get(key, []) for key in keys]
+    return batch_load_fn
+
+
+# Bir istek boyunca kullanılan tüm loader'lar
+class Loaders:
+    def __init__(self, is_async=False):
+        from users.models import User
+        from restaurants.models import Restaurant, MenuItem, MenuItemCategory, RestaurantCategory
+        from orders.models import Order, OrderItem, Cart, CartItem
+
+        self.user = DataLoader(self._registering(load_by_pk(User)), is_async=is_async)
+        self.restaurant = DataLoader(self._registering(load_by_pk(Restaurant)), is_async=is_async)
+        self.restaurant_category = DataLoader(self._registering(load_by_pk(RestaurantCategory)), is_async=is_async)
+        self.menu_item = DataLoader(self._registering(load_by_pk(MenuItem)), is_async=is_async)
+        self.menu_item_category = DataLoader(self._registering(load_by_pk(MenuItemCategory)), is_async=is_async)
+        self.order = DataLoader(self._registering(load_by_pk(Order)), is_async=is_async)
+        self.cart = DataLoader(self._registering(load_by_pk(Cart)), is_async=is_async)
+
+        self.menu_items_by_restaurant = DataLoader(self._registering(load_by_fk(MenuItem, 'restaurant_id')), default=list, is_async=is_async)
+        self.order_items_by_order = DataLoader(self._registering(load_by_fk(OrderItem, 'order_id')), default=list, is_async=is_async)
+        self.cart_items_by_cart = DataLoader(self._registering(load_by_fk(CartItem, 'cart_id')), default=list, is_async=is_async)
+
+        # Model -> (loader, anahtar alanı) eşlemesi; register edilen her nesne
+        # ileride istenebilecek ilişkileri için ilgili loader'lara kuyruklanır
+        self._schedules = {
+            Restaurant: ((self.menu_items_by_restaurant, 'id'), (self.restaurant_category, 'category_id')),
+            MenuItem: ((self.restaurant, 'restaurant_id'), (self.menu_item_category, 'category_id')),
+            Order: ((self.order_items_by_order, 'id'), (self.user, 'user_id')),
+            OrderItem: ((self.order, 'order_id'),),
+            Cart: ((self.cart_items_by_cart, 'id'), (self.user, 'user_id')),
+            CartItem: ((self.menu_item, 'product_id'), (self.cart, 'cart_id')),
+        }
+        self._pk_loaders = {
+            User: self.user,
+            Restaurant: self.restaurant,
+            RestaurantCategory: self.restaurant_category,
+            MenuItem: self.menu_item,
+            MenuItemCategory: self.menu_item_category,
+            Order: self.order,
+            Cart: self.cart,
+        }
+        # prefetch_related ile önceden yüklenmiş ters ilişkiler
+        self._prefetch_loaders = {
+            (Restaurant, 'menu_items'): self.menu_items_by_restaurant,
+            (Order, 'items'): self.order_items_by_order,
+            (Cart, 'items'): self.cart_items_by_cart,
+        }
+        self._registered = set()
+
+    def register(self, objects):
+        objects = list(objects)
+        new_objects = []
+        for obj in objects:
+            if (type(obj), obj.pk) in self._registered:
+                continue
+            self._registered.add((type(obj), obj.pk))
+            new_objects.append(obj)
+            pk_loader = self._pk_loaders.get(type(obj))
+            if pk_loader is not None:
+                pk_loader.prime(obj.pk, obj)
+        for obj in new_objects:
+            # select_related/prefetch_related ile gelen nesneler loader'lara aktarılır, tekrar sorgulanmaz
+            for related in obj._state.fields_cache.values():
+                if related is not None:
+                    self.register([related])
+            for name, related in getattr(obj, '_prefetched_objects_cache', {}).items():
+                related = self.register(related)
+                loader = self._prefetch_loaders.get((type(obj), name))
+                if loader is not None:
+                    loader.prime(obj.pk, related)
+            # only() ile ertelenmiş alanlar okunmaz, aksi halde her nesne için ayrı sorgu atılır
+            for loader, attr in self._schedules.get(type(obj), ()):
+                loader.schedule([obj.__dict__.get(attr)])
+        return objects
+
+    def _registering(self, batch_load_fn):
+        def wrapped(keys):
+            values = batch_load_fn(keys)
+            for value in values:
+                if isinstance(value, list):
+                    self.register(value)
+                elif value is not None:
+                    self.register([value])
+            return values
+        return wrapped
+
+
+# Kök resolver'lar için tek nesne getirir ve loader'lara kaydeder; async modda coroutine döner
+def fetch_one(info, queryset, not_found_message):
+    if is_async(info):
+        return _afetch_one(info, queryset, not_found_message)
+    obj = queryset.first()
+    if obj is None:
+        raise Exception(not_found_message)
+    get_loaders(info).register([obj])
+    return obj
+
+
+async def _afetch_one(info, queryset, not_found_message):
+    obj = await queryset.afirst()
+    if obj is None:
+        raise Exception(not_found_message)
+    get_loaders(info).register([obj])
+    return obj
+
+
+# Loader'lar istek nesnesine (info.context) bağlanır, böylece her istek kendi önbelleğini kullanır
+def get_loaders(info):
+    context = info.context
+    loaders = getattr(context, '_loaders', None)
+    if loaders is None:
+        loaders = Loaders(is_async=is_async(info))
+        setattr(context, '_loaders', loaders)
+    return loaders
@@ -0,0 +1,35 @@
+import hashlib
+import os
+from django.conf import settings
+from django.utils.encoding import filepath_to_uri
+
+
+# Göreli MEDIA_URL (ör. yerel geliştirmede '/media/') istek başına bir kez mutlak adrese çevrilir
+def media_base_url(request):
+    base = settings.MEDIA_URL
+    if '://' in base:
+        return base
+    cached = getattr(request, '_media_base_url', None)
+    if cached is None:
+        cached = request._media_base_url = request.build_absolute_uri(base)
+    return cached
+
+
+# Depolama backend'ine (S3 istemcisi, imzalama vb.) gitmeden dosya anahtarından URL üretir
+def media_url(request, name):
+    return media_base_url(request) + filepath_to_uri(name)
+
+
+# MEDIA_HASHED_KEYS açıksa dosya adına içeriğin kısa sha256 özeti eklenir: menu.jpg -> menu.<hash>.jpg
+def hashed_name(name, content):
+    if not settings.MEDIA_HASHED_KEYS:
+        return name
+    digest = hashlib.sha256()
+    if isinstance(content, bytes):
+        digest.update(content)
+    else:
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+    stem, extension = os.path.splitext(name)
+    return f'{stem}.{digest.hexdigest()[:12]}{extension}'
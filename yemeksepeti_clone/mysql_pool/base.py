@@ -0,0 +1,54 @@
+import pymysql
+
+# Django'nun MySQL backend'i MySQLdb (mysqlclient) arar; requirements.txt'teki PyMySQL onun yerine geçer
+pymysql.install_as_MySQLdb()
+
+from django.db.backends.mysql import base  # noqa: E402
+from yemeksepeti_clone.mysql_pool.pool import get_pool  # noqa: E402
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    MySQL backend'i + işçi başına bağlantı havuzu (OPTIONS['pool']). Django bağlantıyı istek sonunda
+    kapattığında (CONN_MAX_AGE=0) bağlantı kapanmaz, havuza geri döner; sonraki istek TCP/TLS ve
+    kimlik doğrulama maliyeti olmadan aynı bağlantıyı alır. OPTIONS['pool'] yoksa normal backend gibi çalışır.
+    """
+
+    def __init__(self, settings_dict, alias=None):
+        super().__init__(settings_dict, alias)
+        self._reused_connection = False
+
+    @property
+    def pool(self):
+        options = self.settings_dict['OPTIONS'].get('pool')
+        return get_pool(self.alias, options) if options else None
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop('pool', None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        pool = self.pool
+        if pool is None:
+            return super().get_new_connection(conn_params)
+        connection, self._reused_connection = pool.acquire(lambda: super(DatabaseWrapper, self).get_new_connection(conn_params))
+        return connection
+
+    # Havuzdan gelen bağlantının oturum ayarları (izolasyon seviyesi vb.) ilk açılışta yapılmıştır
+    def init_connection_state(self):
+        if self._reused_connection:
+            return
+        super().init_connection_state()
+
+    def _close(self):
+        pool = self.pool
+        if pool is None:
+            return super()._close()
+        # Açık işlem veya hata sonrası bozulmuş bağlantı havuza konmaz, kapatılır
+        reusable = (
+            not self.in_atomic_block and self.autocommit and not self.needs_rollback
+            and (not self.errors_occurred or self.is_usable())
+        )
+        with self.wrap_database_errors:
+            pool.release(self.connection, reusable=reusable)
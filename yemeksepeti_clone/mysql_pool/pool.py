@@ -0,0 +1,149 @@
+import os
+import threading
+import time
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    """
+    İşlem (gunicorn işçisi) başına sınırlı bağlantı havuzu. Aynı anda en fazla `max_size` bağlantı açık
+    olur; hepsi kullanımdaysa yeni istek `timeout` saniye bekler. Uzun süre boşta kalan bağlantı
+    verilmeden önce ping ile denetlenir, `max_lifetime` dolan bağlantı kapatılıp yenisi açılır.
+    """
+
+    def __init__(self, max_size, timeout=5.0, max_lifetime=600.0, check_idle=30.0):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.check_idle = check_idle
+        self._idle = []  # (bağlantı, açılış zamanı, bırakılma zamanı); en son bırakılan sonda
+        self._in_use = {}  # id(bağlantı) -> açılış zamanı
+        self._opening = 0
+        self._condition = threading.Condition()
+        self._metrics = {
+            'opened': 0, 'reused': 0, 'closed': 0, 'health_check_failures': 0, 'timeouts': 0,
+            'waits': 0, 'wait_seconds': 0.0, 'max_wait_seconds': 0.0, 'connect_seconds': 0.0,
+        }
+
+    def _total(self):
+        return len(self._idle) + len(self._in_use) + self._opening
+
+    def _discard(self, connection):
+        self._metrics['closed'] += 1
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def _is_healthy(self, connection, created_at, released_at, now):
+        if now - created_at > self.max_lifetime:
+            return False
+        if now - released_at < self.check_idle:
+            return True
+        try:
+            connection.ping(False)
+        except Exception:
+            self._metrics['health_check_failures'] += 1
+            return False
+        return True
+
+    # (bağlantı, yeniden_kullanıldı_mı) döner; connect yeni bağlantı açan fonksiyondur
+    def acquire(self, connect):
+        started = time.perf_counter()
+        waited = False
+        with self._condition:
+            while True:
+                while self._idle:
+                    connection, created_at, released_at = self._idle.pop()
+                    if self._is_healthy(connection, created_at, released_at, time.monotonic()):
+                        self._in_use[id(connection)] = created_at
+                        self._metrics['reused'] += 1
+                        self._record_wait(started, waited)
+                        return connection, True
+                    self._discard(connection)
+                if self._total() < self.max_size:
+                    self._opening += 1
+                    break
+                remaining = self.timeout - (time.perf_counter() - started)
+                if remaining <= 0:
+                    self._metrics['timeouts'] += 1
+                    raise PoolTimeout(f"Veritabanı bağlantı havuzu dolu ({self.max_size} bağlantı kullanımda).")
+                waited = True
+                self._condition.wait(remaining)
+
+        # Bağlantı kilit dışında açılır; diğer iş parçacıkları bu sırada boşa düşen bağlantıları alabilir
+        connect_started = time.perf_counter()
+        try:
+            connection = connect()
+        except Exception:
+            with self._condition:
+                self._opening -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self._opening -= 1
+            self._in_use[id(connection)] = time.monotonic()
+            self._metrics['opened'] += 1
+            self._metrics['connect_seconds'] += time.perf_counter() - connect_started
+            self._record_wait(started, waited)
+        return connection, False
+
+    def _record_wait(self, started, waited):
+        if waited:
+            wait_seconds = time.perf_counter() - started
+            self._metrics['waits'] += 1
+            self._metrics['wait_seconds'] += wait_seconds
+            self._metrics['max_wait_seconds'] = max(self._metrics['max_wait_seconds'], wait_seconds)
+
+    # reusable=False: işlem yarıda kaldı veya bağlantı hata verdi, havuza geri konmaz
+    def release(self, connection, reusable=True):
+        with self._condition:
+            created_at = self._in_use.pop(id(connection), None)
+            if created_at is None:
+                return
+            now = time.monotonic()
+            if reusable and now - created_at <= self.max_lifetime:
+                self._idle.append((connection, created_at, now))
+            else:
+                self._discard(connection)
+            self._condition.notify()
+
+    # fork sonrası çocuk işlemde çağrılır: ebeveynden kalan soketler paylaşılmaz, kapatılmadan bırakılır
+    def reset(self):
+        self._idle = []
+        self._in_use = {}
+        self._opening = 0
+        self._condition = threading.Condition()
+
+    def metrics(self):
+        with self._condition:
+            return dict(
+                self._metrics, in_use=len(self._in_use), idle=len(self._idle), max_size=self.max_size,
+            )
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, options):
+    with _pools_lock:
+        if alias not in _pools:
+            _pools[alias] = ConnectionPool(**options)
+        return _pools[alias]
+
+
+def pool_metrics():
+    with _pools_lock:
+        return {alias: pool.metrics() for alias, pool in _pools.items()}
+
+
+def _reset_after_fork():
+    for pool in _pools.values():
+        pool.reset()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
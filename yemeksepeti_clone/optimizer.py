@@ -0,0 +1,94 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from graphene.utils.str_converters import to_snake_case
+from graphql.language.ast import FieldNode, FragmentSpreadNode, InlineFragmentNode
+
+
+# Seçim kümesindeki alanları fragment'ları da açarak düz bir listeye çevirir
+def collect_fields(info, field_nodes):
+    fields = []
+
+    def walk(selection_set):
+        if selection_set is None:
+            return
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                fields.append(selection)
+            elif isinstance(selection, FragmentSpreadNode):
+                walk(info.fragments[selection.name.value].selection_set)
+            elif isinstance(selection, InlineFragmentNode):
+                walk(selection.selection_set)
+
+    for node in field_nodes:
+        walk(node.selection_set)
+    return fields
+
+
+# GraphQL alan adını model alanına çevirir (isAdmin gibi camelCase model alanları da desteklenir)
+def get_model_field(model, name):
+    for candidate in (name, to_snake_case(name)):
+        try:
+            return model._meta.get_field(candidate)
+        except FieldDoesNotExist:
+            continue
+    return None
+
+
+# İstenen alanlara göre only/select_related/prefetch_related listelerini doldurur.
+# Model alanına karşılık gelmeyen bir alan istenirse o seviye için only() uygulanmaz.
+def _plan(model, info, selections, prefix, only, select_related, prefetch_related):
+    restricted = True
+    only.append(prefix + model._meta.pk.name)
+    for node in selections:
+        name = node.name.value
+        if name.startswith('__'):
+            continue
+        field = get_model_field(model, name)
+        if field is None:
+            restricted = False
+            continue
+        path = prefix + field.name
+        children = collect_fields(info, [node])
+        if field.concrete and (field.many_to_one or field.one_to_one):
+            # İleri yönlü FK: JOIN ile aynı sorguda çekilir
+            only.append(path)
+            select_related.append(path)
+            restricted &= _plan(field.related_model, info, children, path + '__', only, select_related, prefetch_related)
+        elif field.one_to_many:
+            # Ters ilişki: ayrı ve yine optimize edilmiş tek bir sorgu ile çekilir
+            queryset = optimize_queryset(field.related_model.objects.order_by('pk'), info, children, required=(field.field.name,))
+            prefetch_related.append(Prefetch(path, queryset=queryset))
+        elif field.is_relation:
+            prefetch_related.append(path)
+        else:
+            only.append(path)
+        only.extend(prefix + name for name in getattr(model, 'query_dependencies', {}).get(field.name, ()))
+    return restricted
+
+
+def optimize_queryset(queryset, info, selections, required=()):
+    only, select_related, prefetch_related = list(required), [], []
+    restricted = _plan(queryset.model, info, selections, '', only, select_related, prefetch_related)
+    if select_related:
+        queryset = queryset.select_related(*select_related)
+    if prefetch_related:
+        queryset = queryset.prefetch_related(*prefetch_related)
+    if restricted:
+        queryset = queryset.only(*dict.fromkeys(only))
+    return queryset
+
+
+# Kök resolver'larda kullanılır: sorgunun şekline göre queryset'i daraltır
+def optimize(queryset, info):
+    return optimize_queryset(queryset, info, collect_fields(info, info.field_nodes))
+
+
+# Relay connection'larında asıl alanlar `edges { node { ... } }` altındadır
+def collect_node_fields(info):
+    edges = [field for field in collect_fields(info, info.field_nodes) if field.name.value == 'edges']
+    nodes = [field for field in collect_fields(info, edges) if field.name.value == 'node']
+    return collect_fields(info, nodes)
+
+
+def optimize_connection(queryset, info, required=()):
+    return optimize_queryset(queryset, info, collect_node_fields(info), required=required)
@@ -0,0 +1,101 @@
+import base64
+from datetime import datetime
+from django.conf import settings
+from django.db.models import Q
+from graphene.relay import PageInfo
+from yemeksepeti_clone.cache import aquery_cache_key, aread_through, query_cache_key, read_through
+from yemeksepeti_clone.loaders import get_loaders, is_async
+from yemeksepeti_clone.optimizer import optimize_connection
+
+CURSOR_FIELDS = ('created_at', 'id')
+
+
+# Cursor, (created_at, id) ikilisinin base64 ile kodlanmış halidir
+def encode_cursor(obj):
+    value = f'{obj.created_at.isoformat()}|{obj.id}'
+    return base64.urlsafe_b64encode(value.encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        created_at, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return datetime.fromisoformat(created_at), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        raise Exception("Geçersiz cursor.")
+
+
+# Keyset (seek) sayfalama: OFFSET kullanılmaz, her sayfa (created_at, id) indeksinden okunur.
+# cache_scopes verilirse sayfa, bu kapsamların sürümlerine bağlı olarak önbellekten okunur;
+# queryset'i daraltan argümanlar (filtreler) anahtara cache_parts ile eklenir.
+# Async modda connection yerine onu üreten bir coroutine döner.
+def paginate(queryset, connection_type, info, first=None, after=None, descending=False, cache_scopes=None, cache_parts=()):
+    max_page_size = settings.GRAPHQL_MAX_PAGE_SIZE
+    if first is None:
+        first = settings.GRAPHQL_PAGE_SIZE
+    if first < 0:
+        raise Exception("first negatif olamaz.")
+    first = min(first, max_page_size)
+
+    if is_async(info):
+        return _apaginate(queryset, connection_type, info, first, after, descending, cache_scopes, cache_parts)
+
+    def fetch_page():
+        queryset_page = _page_queryset(queryset, info, first, after, descending)
+        return _split_page(list(queryset_page), first)
+
+    if cache_scopes:
+        key = query_cache_key(info, cache_scopes, first, after, descending, *cache_parts)
+        nodes, has_next_page = read_through(key, fetch_page)
+    else:
+        nodes, has_next_page = fetch_page()
+    return _build_connection(connection_type, info, nodes, has_next_page, after)
+
+
+async def _apaginate(queryset, connection_type, info, first, after, descending, cache_scopes, cache_parts):
+    async def fetch_page():
+        queryset_page = _page_queryset(queryset, info, first, after, descending)
+        return _split_page([node async for node in queryset_page], first)
+
+    if cache_scopes:
+        key = await aquery_cache_key(info, cache_scopes, first, after, descending, *cache_parts)
+        nodes, has_next_page = await aread_through(key, fetch_page)
+    else:
+        nodes, has_next_page = await fetch_page()
+    return _build_connection(connection_type, info, nodes, has_next_page, after)
+
+
+def _build_connection(connection_type, info, nodes, has_next_page, after):
+    nodes = get_loaders(info).register(nodes)
+
+    edges = [connection_type.Edge(node=node, cursor=encode_cursor(node)) for node in nodes]
+    return connection_type(
+        edges=edges,
+        page_info=PageInfo(
+            start_cursor=edges[0].cursor if edges else None,
+            end_cursor=edges[-1].cursor if edges else None,
+            has_previous_page=bool(after),
+            has_next_page=has_next_page,
+        ),
+    )
+
+
+def _page_queryset(queryset, info, first, after, descending):
+    if descending:
+        queryset = queryset.order_by('-created_at', '-id')
+    else:
+        queryset = queryset.order_by('created_at', 'id')
+
+    if after:
+        created_at, pk = decode_cursor(after)
+        if descending:
+            queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+        else:
+            queryset = queryset.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk))
+
+    # Bir fazla satır çekilerek sonraki sayfanın varlığı COUNT(*) olmadan anlaşılır
+    queryset = optimize_connection(queryset, info, required=CURSOR_FIELDS)
+    return queryset[:first + 1]
+
+
+def _split_page(nodes, first):
+    return nodes[:first], len(nodes) > first
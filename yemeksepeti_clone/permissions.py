@@ -0,0 +1,66 @@
+from collections import namedtuple
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from restaurants.models import Restaurant
+from yemeksepeti_clone.cache import get_cache, read_through
+
+# roles: {'ADMIN', 'STAFF', 'CUSTOMER', 'RESTAURANT_OWNER'} alt kümesi, restaurant_ids: sahip olunan restoranlar
+Permissions = namedtuple('Permissions', ['roles', 'restaurant_ids'])
+
+ANONYMOUS = Permissions(frozenset(), frozenset())
+
+
+def permissions_key(user_id):
+    return f'gql:permissions:{user_id}'
+
+
+def compute_permissions(user):
+    roles = set()
+    if user.isAdmin:
+        roles.add('ADMIN')
+    if user.is_staff:
+        roles.add('STAFF')
+    if user.is_customer:
+        roles.add('CUSTOMER')
+    # Rol kullanıcıdaki bayraktan gelir: restoranı olmayan bir sahip ilk restoranını oluşturabilmeli
+    if user.is_restaurant_owner:
+        roles.add('RESTAURANT_OWNER')
+    # Sonuç önbellekte kalır; gecikmeli bir replikadan okunmaması için birincil kullanılır
+    restaurant_ids = frozenset(Restaurant.objects.using(DEFAULT_DB_ALIAS).filter(owner=user).values_list('id', flat=True))
+    return Permissions(frozenset(roles), restaurant_ids)
+
+
+# İstek başına bir kez hesaplanır (context üzerinde saklanır), kullanıcı başına önbellekte tutulur
+def get_permissions(context):
+    user = context.user
+    if not user.is_authenticated:
+        return ANONYMOUS
+    cached = getattr(context, '_permissions', None)
+    if cached is not None and cached[0] == user.pk:
+        return cached[1]
+    permissions = read_through(
+        permissions_key(user.pk), lambda: compute_permissions(user), timeout=settings.PERMISSIONS_CACHE_TIMEOUT
+    )
+    context._permissions = (user.pk, permissions)
+    return permissions
+
+
+# Kullanıcı rolleri veya restoran sahipliği değiştiğinde sinyallerden çağrılır
+def invalidate_permissions(*user_ids):
+    get_cache().delete_many([permissions_key(user_id) for user_id in user_ids if user_id is not None])
+
+
+# Admin her şeye erişebilir; diğer kullanıcılar istenen rollerden birine sahip olmalı
+def has_role(permissions, roles):
+    return 'ADMIN' in permissions.roles or not permissions.roles.isdisjoint(roles)
+
+
+# Geçersiz kimlik (ör. sayısal olmayan ID) yetkisiz sayılır; çağıran kendi hata mesajını verir
+def can_manage_restaurant(context, restaurant_id):
+    permissions = get_permissions(context)
+    if 'ADMIN' in permissions.roles:
+        return True
+    try:
+        return int(restaurant_id) in permissions.restaurant_ids
+    except (TypeError, ValueError):
+        return False
@@ -0,0 +1,100 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+
+
+class Routing:
+    def __init__(self, replica):
+        self.replica = replica
+
+
+# İstek boyunca okuma yapılacak replika; sadece GraphQL query işlemleri sırasında ayarlanır.
+# Değer nesne olarak tutulur: async resolver'ların kopyaladığı context'ler de aynı nesneyi görür.
+_routing = ContextVar('database_routing', default=None)
+
+
+def _cache():
+    return caches[settings.GRAPHQL_CACHE_ALIAS]
+
+
+def sticky_key(user_id):
+    return f'db:sticky:{user_id}'
+
+
+def written_key(scope):
+    return f'db:written:{scope}'
+
+
+# Kullanıcı kısa süre önce yazdıysa (sepet, sipariş...) kendi yazdığını görsün diye birincil veritabanı seçilir
+def choose_replica(request):
+    if not settings.DATABASE_REPLICAS:
+        return None
+    user = request.user
+    if user.is_authenticated and _cache().get(sticky_key(user.pk)):
+        return None
+    return random.choice(settings.DATABASE_REPLICAS)
+
+
+# Mutasyondan sonra çağrılır: kullanıcının okumaları DATABASE_REPLICA_STICKY_SECONDS boyunca birincilden yapılır
+def stick_to_primary(user):
+    if settings.DATABASE_REPLICAS and user.is_authenticated:
+        _cache().set(sticky_key(user.pk), True, timeout=settings.DATABASE_REPLICA_STICKY_SECONDS)
+
+
+@contextmanager
+def read_from_replica(replica):
+    token = _routing.set(Routing(replica))
+    try:
+        yield
+    finally:
+        _routing.reset(token)
+
+
+def current_replica():
+    routing = _routing.get()
+    return routing.replica if routing else None
+
+
+# Önbellek sürümü yeni artırılmış kapsamlar (ör. menüsü değişen restoran) replikada henüz güncel olmayabilir;
+# bu veriler replikadan okunup yeni sürümle önbelleğe yazılmasın diye istek birincil veritabanına döner.
+def mark_scopes_written(scopes):
+    if settings.DATABASE_REPLICAS:
+        _cache().set_many({written_key(scope): True for scope in scopes}, timeout=settings.DATABASE_REPLICA_STICKY_SECONDS)
+
+
+def pin_if_recently_written(scopes):
+    if current_replica() and _cache().get_many([written_key(scope) for scope in scopes]):
+        _routing.get().replica = None
+
+
+async def apin_if_recently_written(scopes):
+    if current_replica() and await _cache().aget_many([written_key(scope) for scope in scopes]):
+        _routing.get().replica = None
+
+
+class ReplicaRouter:
+    """
+    Yazmalar ve GraphQL query işlemleri dışındaki tüm okumalar birincil veritabanına gider; query
+    işlemleri (restoran/menü listeleme, sipariş geçmişi) istek için seçilen replikadan okunur.
+    """
+
+    def db_for_read(self, model, **hints):
+        return current_replica()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    # Replikalar birincilin kopyasıdır; aralarındaki ilişkiler aynı veritabanındaymış gibi kabul edilir
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
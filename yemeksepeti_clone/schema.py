@@ -2,9 +2,10 @@ import graphene
 from users.schema import Query as UsersQuery, Mutation as UsersMutation
 from restaurants.schema import Query as RestaurantsQuery, Mutation as RestaurantsMutation
 from orders.schema import Query as OrdersQuery, Mutation as OrdersMutation
+from search.schema import Query as SearchQuery
 
 # Tüm Query'leri birleştirme
-class Query(UsersQuery, RestaurantsQuery, OrdersQuery, graphene.ObjectType):
+class Query(UsersQuery, RestaurantsQuery, OrdersQuery, SearchQuery, graphene.ObjectType):
     pass
 
 # Tüm Mutation'ları birleştirme
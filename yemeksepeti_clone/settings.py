@@ -54,6 +54,8 @@ INSTALLED_APPS = [
     'users',  # Users uygulaması eklendi
     'orders', # Orders eklendi
     'restaurants', # Restoranlar eklendi
+    'notifications',  # E-posta kuyruğu
+    'search',  # Menü ve restoran arama indeksi
     'graphene_django',  # Graphene-Django eklendi
     'django_filters',  # Django-Filter eklendi
     'corsheaders',  # CORS Headers eklendi
@@ -69,6 +71,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'users.middleware.JWTAuthenticationMiddleware',  # JWT istek başına bir kez doğrulanır
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -97,17 +100,42 @@ WSGI_APPLICATION = 'yemeksepeti_clone.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
+# Bağlantı havuzu (yemeksepeti_clone.mysql_pool): her gunicorn işçisinde en fazla DB_POOL_SIZE bağlantı açılır,
+# istek bitince bağlantı kapanmaz havuza döner. DB_POOL_SIZE=0 ise havuz kapanır ve iş parçacığı başına
+# kalıcı bağlantı (DB_CONN_MAX_AGE saniye) kullanılır.
+DB_POOL_SIZE = env.int('DB_POOL_SIZE', default=8)
+DB_POOL_OPTIONS = {
+    'max_size': DB_POOL_SIZE,
+    'timeout': env.float('DB_POOL_TIMEOUT', default=5.0),  # havuz doluyken bekleme süresi (saniye)
+    'max_lifetime': env.float('DB_POOL_MAX_LIFETIME', default=600.0),  # MySQL wait_timeout'tan kısa olmalı
+    'check_idle': env.float('DB_POOL_CHECK_IDLE', default=30.0),  # bu süreden uzun boşta kalan bağlantı ping ile denetlenir
+}
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.mysql',
+        'ENGINE': 'yemeksepeti_clone.mysql_pool',  # django.db.backends.mysql + PyMySQL + bağlantı havuzu
         'NAME': 'yemeksepeti-clone',
         'USER': 'root',
         'PASSWORD': 'password',
         'HOST': 'localhost',
         'PORT': '3306',
+        # Havuz açıkken bağlantı her istek sonunda havuza döner; kalıcılığı havuz sağlar
+        'CONN_MAX_AGE': 0 if DB_POOL_SIZE else env.int('DB_CONN_MAX_AGE', default=60),
+        'CONN_HEALTH_CHECKS': env.bool('DB_CONN_HEALTH_CHECKS', default=True),
+        'OPTIONS': {'pool': DB_POOL_OPTIONS} if DB_POOL_SIZE else {},
     }
 }
 
+# Okuma replikaları (ör. DB_REPLICA_HOSTS=replica1.internal,replica2.internal): GraphQL query işlemleri
+# replikalardan, mutasyonlar ve diğer tüm istekler birincilden okunur (yemeksepeti_clone.routers)
+DATABASE_REPLICAS = []
+for index, host in enumerate(env.list('DB_REPLICA_HOSTS', default=[]), start=1):
+    DATABASES[f'replica_{index}'] = {**DATABASES['default'], 'HOST': host, 'TEST': {'MIRROR': 'default'}}
+    DATABASE_REPLICAS.append(f'replica_{index}')
+DATABASE_ROUTERS = ['yemeksepeti_clone.routers.ReplicaRouter']
+# Mutasyondan sonra kullanıcının okumaları bu süre boyunca birincilden yapılır; replikasyon gecikmesinden uzun olmalı
+DATABASE_REPLICA_STICKY_SECONDS = env.int('DB_REPLICA_STICKY_SECONDS', default=5)
+
 # Custom user model
 AUTH_USER_MODEL = 'users.User'  # Kullanıcı modelini değiştirmek için eklenen satır
 
@@ -149,8 +177,24 @@ USE_TZ = True
 STATIC_URL = 'static/'
 
 # Media URL ve Media Root
-MEDIA_URL = 'https://yemeksepeti-clone-media.s3.amazonaws.com/Proje_Yemekleri/'
+# Görsel URL'leri depolama backend'i çağrılmadan MEDIA_URL + dosya anahtarı ile üretilir (yemeksepeti_clone.media);
+# bu yüzden MEDIA_URL bucket'ın (veya önündeki CDN'in) kök adresi olmalı. Anahtarlar zaten Proje_Yemekleri/ ile başlar.
+MEDIA_URL = env('MEDIA_URL', default='https://yemeksepeti-clone-media.s3.amazonaws.com/')
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Dosya adına içerik hash'i eklenir (lahmacun.3f2a9c1b7d4e.jpg); içerik değişince URL de değişeceği için
+# CDN/tarayıcı dosyayı süresiz önbellekleyebilir
+MEDIA_HASHED_KEYS = env.bool('MEDIA_HASHED_KEYS', default=True)
+if MEDIA_HASHED_KEYS:
+    AWS_S3_OBJECT_PARAMETERS = {'CacheControl': 'public, max-age=31536000, immutable'}
+
+# Menü görseli varyantları (process_thumbnails işçisi üretir, GraphQL image(width:) en yakınını döner)
+MENU_IMAGE_WIDTHS = env.list('MENU_IMAGE_WIDTHS', cast=int, default=[160, 320, 640, 1280])  # piksel
+MENU_IMAGE_WEBP_QUALITY = env.int('MENU_IMAGE_WEBP_QUALITY', default=80)
+MENU_IMAGE_JPEG_QUALITY = env.int('MENU_IMAGE_JPEG_QUALITY', default=82)
+MENU_IMAGE_BATCH_SIZE = env.int('MENU_IMAGE_BATCH_SIZE', default=20)
+MENU_IMAGE_POLL_INTERVAL = env.float('MENU_IMAGE_POLL_INTERVAL', default=5.0)  # saniye
+# Menü içe aktarma (import_menu, importMenu): bir bulk_create partisindeki satır sayısı
+MENU_IMPORT_BATCH_SIZE = env.int('MENU_IMPORT_BATCH_SIZE', default=2000)
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
@@ -161,16 +205,82 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 GRAPHENE = {
     "SCHEMA": "yemeksepeti_clone.schema.schema",  # Schema dosyasının yolu
     "MIDDLEWARE": [
-        "graphql_jwt.middleware.JSONWebTokenMiddleware",
         "graphene_django.debug.DjangoDebugMiddleware",
     ],
 }
 
+# Önbellek: varsayılan olarak işlem içi LRU (LocMemCache), CACHE_URL ile Redis kullanılabilir
+# (ör. CACHE_URL=redis://localhost:6379/1). İşlem içi önbellekle gunicorn tek işçiyle çalışır
+# (bkz. gunicorn.conf.py); birden fazla işçi için paylaşılan önbellek gerekir.
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
+}
+GRAPHQL_CACHE_ALIAS = 'default'
+GRAPHQL_CACHE_TIMEOUT = env.int('GRAPHQL_CACHE_TIMEOUT', default=300)  # saniye
+
+GRAPHQL_RESPONSE_CACHE_TIMEOUT = env.int('GRAPHQL_RESPONSE_CACHE_TIMEOUT', default=60)  # anonim sorgu yanıtları
+GRAPHQL_DOCUMENT_CACHE_SIZE = env.int('GRAPHQL_DOCUMENT_CACHE_SIZE', default=512)  # parse edilmiş doküman sayısı
+
+# /graphql/ için async görünüm (asgi.py bunu açar); WSGI altında senkron görünüm kullanılır
+GRAPHQL_ASYNC = env.bool('GRAPHQL_ASYNC', default=False)
+
+# Liste sorguları için sayfa boyutu (first verilmezse) ve sunucu tarafı üst sınır
+GRAPHQL_PAGE_SIZE = env.int('GRAPHQL_PAGE_SIZE', default=20)
+GRAPHQL_MAX_PAGE_SIZE = env.int('GRAPHQL_MAX_PAGE_SIZE', default=100)
+
+# Kullanıcı rolleri ve sahip olunan restoranlar (rol değişince önbellekten silinir). Silme sadece paylaşılan
+# önbellekte tüm işçilere ulaşır; süre, kaçırılan bir silmenin etkili kalabileceği üst sınırdır.
+PERMISSIONS_CACHE_TIMEOUT = env.int('PERMISSIONS_CACHE_TIMEOUT', default=60)
+
 # JWT Ayarları
+# Anahtar döndürme: yeni anahtarı JWT_SIGNING_KEYS'e ekleyip JWT_ACTIVE_KID'i değiştirin,
+# eski anahtarı yenileme token süresi dolduktan sonra kaldırın (ör. JWT_SIGNING_KEYS=k2=yeni,k1=eski)
+JWT_SIGNING_KEYS = env.dict('JWT_SIGNING_KEYS', default={'default': SECRET_KEY})
+JWT_ACTIVE_KID = env('JWT_ACTIVE_KID', default='default')
+JWT_ACCESS_TOKEN_LIFETIME = env.int('JWT_ACCESS_TOKEN_LIFETIME', default=300)  # saniye
+JWT_REFRESH_TOKEN_LIFETIME = env.int('JWT_REFRESH_TOKEN_LIFETIME', default=7 * 24 * 3600)  # saniye
+JWT_TOKEN_CACHE_SIZE = env.int('JWT_TOKEN_CACHE_SIZE', default=10000)  # işlem içi doğrulanmış token sayısı
 AUTHENTICATION_BACKENDS = [
     'graphql_jwt.backends.JSONWebTokenBackend',
-    'django.contrib.auth.backends.ModelBackend',
+    'users.backends.PooledPasswordBackend',  # ModelBackend; parola doğrulaması ayrı havuzda
 ]
 
+# E-posta kuyruğu (notifications): istekler sadece kuyruğa yazar, `process_notifications` işçisi gönderir
+DEFAULT_FROM_EMAIL = env('DEFAULT_FROM_EMAIL', default='no-reply@yemeksepeti_clone.com')
+NOTIFICATION_BATCH_SIZE = env.int('NOTIFICATION_BATCH_SIZE', default=50)  # tek SMTP bağlantısında gönderilen e-posta
+NOTIFICATION_POLL_INTERVAL = env.float('NOTIFICATION_POLL_INTERVAL', default=2.0)  # saniye
+NOTIFICATION_MAX_ATTEMPTS = env.int('NOTIFICATION_MAX_ATTEMPTS', default=5)
+NOTIFICATION_RETRY_BACKOFF = env.int('NOTIFICATION_RETRY_BACKOFF', default=30)  # saniye, her denemede iki katına çıkar
+NOTIFICATION_RETRY_BACKOFF_MAX = env.int('NOTIFICATION_RETRY_BACKOFF_MAX', default=3600)
+NOTIFICATION_LOCK_TIMEOUT = env.int('NOTIFICATION_LOCK_TIMEOUT', default=300)  # çöken işçinin işleri bu süreden sonra tekrar alınır
+
+# Arama (search): menü değişiklikleri sinyallerle indekse yansır, `rebuild_search_index` baştan kurar
+SEARCH_INDEX_BATCH_SIZE = env.int('SEARCH_INDEX_BATCH_SIZE', default=1000)
+SEARCH_MAX_QUERY_TERMS = env.int('SEARCH_MAX_QUERY_TERMS', default=5)  # sorgudaki fazla kelimeler yok sayılır
+SEARCH_MIN_PREFIX_LENGTH = env.int('SEARCH_MIN_PREFIX_LENGTH', default=2)  # daha kısa son kelime sadece tam eşleşir
+SEARCH_PREFIX_EXPANSIONS = env.int('SEARCH_PREFIX_EXPANSIONS', default=8)  # önek en yaygın kaç terime açılır
+# Çok kelimeli sorgularda en seçici kelimenin en yüksek ağırlıklı kaç dokümanı aday olarak alınır
+SEARCH_CANDIDATES = env.int('SEARCH_CANDIDATES', default=1000)
+
+# Otomatik tamamlama: işçi başına bellekte önek ağacı
+AUTOCOMPLETE_TOP_K = env.int('AUTOCOMPLETE_TOP_K', default=10)  # önek başına saklanan (ve dönebilecek en fazla) öneri
+# build_autocomplete komutunun yazdığı anlık görüntü; işçiler açılırken veritabanı yerine buradan yükler
+AUTOCOMPLETE_SNAPSHOT_PATH = env.str('AUTOCOMPLETE_SNAPSHOT_PATH', default=os.path.join(BASE_DIR, 'autocomplete.pickle'))
+AUTOCOMPLETE_SYNC_INTERVAL = env.float('AUTOCOMPLETE_SYNC_INTERVAL', default=1.0)  # günlük kontrol aralığı (saniye)
+AUTOCOMPLETE_JOURNAL_TIMEOUT = env.int('AUTOCOMPLETE_JOURNAL_TIMEOUT', default=3600)  # günlük kayıtlarının ömrü (saniye)
+
+# Konuma göre restoran arama (restaurantsNear): işçi başına bellekte ızgara indeksi
+GEO_CELL_DEGREES = env.float('GEO_CELL_DEGREES', default=0.02)  # hücre boyu (~2.2 km enlem)
+GEO_DEFAULT_RADIUS_KM = env.float('GEO_DEFAULT_RADIUS_KM', default=5.0)
+GEO_MAX_RADIUS_KM = env.float('GEO_MAX_RADIUS_KM', default=50.0)
+GEO_BUILD_BATCH_SIZE = env.int('GEO_BUILD_BATCH_SIZE', default=2000)
+GEO_SYNC_INTERVAL = env.float('GEO_SYNC_INTERVAL', default=1.0)  # günlük kontrol aralığı (saniye)
+GEO_JOURNAL_TIMEOUT = env.int('GEO_JOURNAL_TIMEOUT', default=3600)  # günlük kayıtlarının ömrü (saniye)
+
+# Parola doğrulama havuzu: 'process' (varsayılan) veya 'thread'; PASSWORD_HASHER_WORKERS=0 ise istek içinde çalışır
+PASSWORD_HASHER_POOL = env('PASSWORD_HASHER_POOL', default='process')
+PASSWORD_HASHER_WORKERS = env.int('PASSWORD_HASHER_WORKERS', default=2)
+PASSWORD_HASHER_MAX_PENDING = env.int('PASSWORD_HASHER_MAX_PENDING', default=32)  # kuyruk dolarsa giriş reddedilir
+
 # CORS Ayarları
 CORS_ALLOW_ALL_ORIGINS = True  # Geliştirme sırasında tüm alan adlarına izin verilebilir
@@ -0,0 +1,266 @@
+import hashlib
+import json
+import threading
+import time
+import fakeredis
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AnonymousUser
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.db import connection
+from django.test import AsyncRequestFactory, RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from orders.models import Order, OrderItem
+from restaurants.models import Restaurant, MenuItem, MenuItemCategory
+from users.models import User
+from yemeksepeti_clone.cache import bump_versions, get_cache, get_version, invalidate_restaurant, is_shared_cache, read_through
+from yemeksepeti_clone.mysql_pool.pool import ConnectionPool, PoolTimeout
+from yemeksepeti_clone.routers import ReplicaRouter, choose_replica, current_replica, pin_if_recently_written, read_from_replica
+from yemeksepeti_clone.views import AsyncGraphQLView, CachedGraphQLView
+
+RESTAURANTS_QUERY = '{ allRestaurants(first: 10) { edges { node { name } } } }'
+
+
+class GraphQLViewTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        Restaurant.objects.create(name="Restoran", address="Adres", phone="5551234567")
+
+    def post(self, body, **headers):
+        return self.client.post('/graphql/', json.dumps(body), content_type='application/json', **headers)
+
+    def test_persisted_query_by_hash(self):
+        """Hash ile gönderilen sorgu, daha önce kaydedilmiş dokümanı çalıştırmalı"""
+        sha256_hash = hashlib.sha256(RESTAURANTS_QUERY.encode()).hexdigest()
+        extensions = {'persistedQuery': {'version': 1, 'sha256Hash': sha256_hash}}
+
+        response = self.post({'extensions': extensions})
+        self.assertEqual(response.json()['errors'][0]['message'], 'PersistedQueryNotFound')
+
+        response = self.post({'query': RESTAURANTS_QUERY, 'extensions': extensions})
+        self.assertEqual(response.status_code, 200)
+
+        response = self.post({'extensions': extensions})
+        self.assertEqual(response.json()['data']['allRestaurants']['edges'][0]['node']['name'], "Restoran")
+
+    def test_persisted_query_hash_mismatch(self):
+        """Hash dokümanla uyuşmuyorsa istek reddedilmeli"""
+        extensions = {'persistedQuery': {'version': 1, 'sha256Hash': '0' * 64}}
+        response = self.post({'query': RESTAURANTS_QUERY, 'extensions': extensions})
+        self.assertEqual(response.status_code, 400)
+
+    def test_anonymous_query_returns_etag_and_304(self):
+        """Anonim okuma yanıtı ETag taşımalı ve If-None-Match ile 304 dönmeli"""
+        response = self.post({'query': RESTAURANTS_QUERY})
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        with self.assertNumQueries(0):
+            response = self.post({'query': RESTAURANTS_QUERY}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        Restaurant.objects.create(name="Yeni Restoran", address="Adres", phone="5551234567")
+        invalidate_restaurant()
+        response = self.post({'query': RESTAURANTS_QUERY}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_mutations_are_not_cached(self):
+        """Mutasyon yanıtları önbelleğe alınmamalı ve ETag taşımamalı"""
+        response = self.post({'query': 'mutation { signIn(email: "yok@example.com", password: "x") { token } }'})
+        self.assertFalse(response.has_header('ETag'))
+
+
+class AsyncGraphQLViewTestCase(TestCase):
+    nested_query = '{ allRestaurants(first: 10) { edges { node { name menuItems { name category { name } restaurant { name } } } } } }'
+
+    def setUp(self):
+        cache.clear()
+        category = MenuItemCategory.objects.create(name="Kebap")
+        for i in range(3):
+            restaurant = Restaurant.objects.create(name=f"Restoran {i}", address="Adres", phone="5551234567")
+            for j in range(2):
+                MenuItem.objects.create(restaurant=restaurant, category=category, name=f"Yemek {j}", price=10)
+        self.user = User.objects.create_user(email="musteri@example.com", password="Parola123!", firstName="Ali", lastName="Veli", is_customer=True)
+
+    async def post(self, query, user=None):
+        request = AsyncRequestFactory().post('/graphql/', json.dumps({'query': query}), content_type='application/json')
+        request.user = user or AnonymousUser()
+        response = await AsyncGraphQLView.as_view()(request)
+        return response.status_code, json.loads(response.content)
+
+    def test_nested_query_runs_async(self):
+        """Async görünüm iç içe sorguları senkron görünümle aynı sorgu sayısında çözmeli"""
+        with CaptureQueriesContext(connection) as captured:
+            status, data = async_to_sync(self.post)(self.nested_query)
+        self.assertEqual(status, 200)
+        restaurants = [edge['node'] for edge in data['data']['allRestaurants']['edges']]
+        self.assertEqual(len(restaurants), 3)
+        for restaurant in restaurants:
+            self.assertEqual(len(restaurant['menuItems']), 2)
+            self.assertTrue(all(item['restaurant']['name'] == restaurant['name'] for item in restaurant['menuItems']))
+        self.assertEqual(len(captured), 2)
+
+    async def test_authenticated_reads_and_mutations(self):
+        """Yetki gerektiren okumalar async, mutasyonlar senkron akışta çalışmalı"""
+        status, data = await self.post('mutation { createOrder { order { id } } }', self.user)
+        self.assertIsNone(data.get('errors'))
+        order_id = int(data['data']['createOrder']['order']['id'])
+        await OrderItem.objects.acreate(order_id=order_id, product_name="Yemek", quantity=2, price=15)
+
+        status, data = await self.post('{ order(id: %d) { totalPrice items { productName order { id } } user { email } } }' % order_id, self.user)
+        self.assertIsNone(data.get('errors'))
+        self.assertEqual(data['data']['order']['totalPrice'], '30.00')
+        self.assertEqual(data['data']['order']['user']['email'], "musteri@example.com")
+
+        status, data = await self.post('{ order(id: %d) { id } }' % order_id)
+        self.assertIsNotNone(data.get('errors'))
+
+
+class FakeConnection:
+    def __init__(self, healthy=True):
+        self.healthy = healthy
+        self.closed = False
+
+    def ping(self, reconnect):
+        if not self.healthy:
+            raise OSError("bağlantı koptu")
+
+    def close(self):
+        self.closed = True
+
+
+class ConnectionPoolTestCase(TestCase):
+    def test_connections_are_reused(self):
+        """Bırakılan bağlantı sonraki istekte yeniden açılmadan kullanılmalı"""
+        pool = ConnectionPool(max_size=2)
+        connection, reused = pool.acquire(FakeConnection)
+        self.assertFalse(reused)
+        pool.release(connection)
+        self.assertEqual(pool.acquire(FakeConnection), (connection, True))
+        metrics = pool.metrics()
+        self.assertEqual((metrics['opened'], metrics['reused'], metrics['in_use']), (1, 1, 1))
+
+    def test_pool_is_bounded(self):
+        """Havuz doluyken istek beklemeli, süre dolarsa hata vermeli"""
+        pool = ConnectionPool(max_size=1, timeout=0.05)
+        connection, _ = pool.acquire(FakeConnection)
+        with self.assertRaises(PoolTimeout):
+            pool.acquire(FakeConnection)
+
+        # Bekleyen istek, başka bir iş parçacığının bıraktığı bağlantıyı almalı
+        pool.timeout = 1.0
+        threading.Timer(0.02, pool.release, args=(connection,)).start()
+        self.assertEqual(pool.acquire(FakeConnection), (connection, True))
+        metrics = pool.metrics()
+        self.assertEqual((metrics['timeouts'], metrics['waits']), (1, 1))
+        self.assertGreater(metrics['wait_seconds'], 0)
+
+    def test_broken_and_expired_connections_are_replaced(self):
+        """Ping'e cevap vermeyen, süresi dolan veya hatalı bırakılan bağlantı kapatılmalı"""
+        pool = ConnectionPool(max_size=2, check_idle=0)
+        broken, _ = pool.acquire(lambda: FakeConnection(healthy=False))
+        pool.release(broken)
+        connection, reused = pool.acquire(FakeConnection)
+        self.assertFalse(reused)
+        self.assertTrue(broken.closed)
+        self.assertEqual(pool.metrics()['health_check_failures'], 1)
+
+        pool.release(connection, reusable=False)
+        self.assertTrue(connection.closed)
+
+        pool = ConnectionPool(max_size=2, max_lifetime=0.01)
+        connection, _ = pool.acquire(FakeConnection)
+        time.sleep(0.02)
+        pool.release(connection)
+        self.assertTrue(connection.closed)
+        self.assertEqual(pool.metrics()['idle'], 0)
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1'])
+class ReplicaRoutingTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email="musteri@example.com", password="Parola123!", firstName="Ali", lastName="Veli", is_customer=True)
+        self.other = User.objects.create_user(email="diger@example.com", password="Parola123!", firstName="Ayşe", lastName="Veli", is_customer=True)
+
+    def request(self, user):
+        request = RequestFactory().post('/graphql/')
+        request.user = user
+        return request
+
+    def test_queries_read_from_replica_and_writes_go_to_primary(self):
+        """Query işlemi sırasında okumalar replikaya, yazmalar her zaman birincile gitmeli"""
+        router = ReplicaRouter()
+        self.assertIsNone(router.db_for_read(Order))
+        with read_from_replica(choose_replica(self.request(self.user))):
+            self.assertEqual(router.db_for_read(Order), 'replica_1')
+            self.assertEqual(router.db_for_write(Order), 'default')
+        self.assertIsNone(router.db_for_read(Order))
+        self.assertFalse(router.allow_migrate('replica_1', 'orders'))
+
+    def test_mutation_makes_user_read_from_primary(self):
+        """Mutasyondan sonra sadece o kullanıcının okumaları birincilden yapılmalı"""
+        request = RequestFactory().post(
+            '/graphql/', json.dumps({'query': 'mutation { createOrder { order { id } } }'}), content_type='application/json'
+        )
+        request.user = self.user
+        response = CachedGraphQLView.as_view()(request)
+        self.assertIsNone(json.loads(response.content).get('errors'))
+
+        self.assertIsNone(choose_replica(self.request(self.user)))
+        self.assertEqual(choose_replica(self.request(self.other)), 'replica_1')
+
+    def test_recently_invalidated_scope_is_read_from_primary(self):
+        """Önbellek sürümü yeni artan kapsam replikadan okunup önbelleğe yazılmamalı"""
+        invalidate_restaurant(5)
+        with read_from_replica('replica_1'):
+            pin_if_recently_written(['restaurant:6'])
+            self.assertEqual(current_replica(), 'replica_1')
+            pin_if_recently_written(['restaurant:5'])
+            self.assertIsNone(current_replica())
+
+
+class SharedCacheTestCase(TestCase):
+    def test_local_cache_is_not_shared(self):
+        """İşlem içi önbellek paylaşılan sayılmamalı (gunicorn tek işçiyle başlar)"""
+        self.assertFalse(is_shared_cache())
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://localhost:6379/1'}}):
+            self.assertTrue(is_shared_cache())
+
+
+# Redis protokolünü işlem içinde taklit eden sunucu; gerçek RedisCache istemcisi ve sürücüsü kullanılır
+REDIS_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': 'redis://localhost:6379/1',
+        'OPTIONS': {'connection_class': fakeredis.FakeConnection},
+    },
+}
+
+
+@override_settings(CACHES=REDIS_CACHES)
+class RedisCacheTestCase(TestCase):
+    def setUp(self):
+        get_cache().clear()
+
+    def test_read_through_computes_once(self):
+        """Redis önbelleğinde değer bir kez hesaplanmalı, None değeri de önbelleğe alınmalı"""
+        calls = []
+        for _ in range(3):
+            self.assertEqual(read_through('gql:test:value', lambda: calls.append(1) or {'ad': 'Köşe'}), {'ad': 'Köşe'})
+            self.assertIsNone(read_through('gql:test:none', lambda: calls.append(1)))
+        self.assertEqual(len(calls), 2)
+
+    def test_bump_versions_is_shared_between_clients(self):
+        """Sürüm artışı aynı Redis'e bağlı başka bir istemciden görülmeli; silinen sayaç yeniden başlatılmalı"""
+        self.assertTrue(is_shared_cache())
+        version = get_version('restaurant:5')
+        bump_versions('restaurant:5')
+        # Başka bir işçinin kendi bağlantı havuzuyla açtığı istemci
+        other = caches.create_connection(settings.GRAPHQL_CACHE_ALIAS)
+        self.assertEqual(other.get('gql:version:restaurant:5'), version + 1)
+
+        get_cache().delete('gql:version:restaurant:5')
+        bump_versions('restaurant:5')
+        self.assertGreater(get_version('restaurant:5'), version)
@@ -14,16 +14,20 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
-from graphene_django.views import GraphQLView
 from django.views.decorators.csrf import csrf_exempt
-from .views import home  # Ana sayfa görünümünü import ediyoruz
+from .views import home, database_metrics, AsyncGraphQLView, CachedGraphQLView  # Ana sayfa ve GraphQL görünümlerini import ediyoruz
+
+# ASGI sunucusunda (GRAPHQL_ASYNC) okuma sorguları olay döngüsünde, async resolver'larla çalışır
+GraphQLView = AsyncGraphQLView if settings.GRAPHQL_ASYNC else CachedGraphQLView
 
 urlpatterns = [
     path("admin/", admin.site.urls),
-    path("graphql/", csrf_exempt(GraphQLView.as_view(graphiql=True))),  # GraphQL endpoint
+    path("graphql/", csrf_exempt(GraphQLView.as_view(graphiql=True))),  # GraphQL endpoint (persisted query + yanıt önbelleği)
     path("", home, name="home"),  # Ana sayfa yönlendirmesi
+    path("metrics/database/", database_metrics, name="database_metrics"),  # Bağlantı havuzu metrikleri (sadece staff)
     path("users/", include('users.urls')),  # Users uygulamasının URL'leri
     path("orders/", include('orders.urls')),  # Orders uygulamasının URL'leri
     path("restaurants/", include('restaurants.urls')),  # Restaurants uygulamasının URL'leri
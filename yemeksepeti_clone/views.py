@@ -1,5 +1,305 @@
-from django.http import HttpResponse
+import hashlib
+import json
+import os
+from functools import lru_cache
+from inspect import isawaitable
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.db import connection, transaction
+from django.http import HttpResponse, HttpResponseBadRequest, JsonResponse, HttpResponseNotAllowed, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags, quote_etag
+from graphene_django.constants import MUTATION_ERRORS_FLAG
+from graphene_django.settings import graphene_settings
+from graphene_django.utils.utils import set_rollback
+from graphene_django.views import GraphQLView, HttpError
+from graphql import ExecutionResult, OperationType, execute, get_operation_ast, parse, validate_schema
+from graphql.validation import validate
+from graphql_jwt.utils import get_http_authorization
+from yemeksepeti_clone.cache import get_cache, get_version
+from yemeksepeti_clone.mysql_pool.pool import pool_metrics
+from yemeksepeti_clone.permissions import get_permissions
+from yemeksepeti_clone.routers import choose_replica, read_from_replica, stick_to_primary
 
 
 def home(request):
     return HttpResponse("Welcome to Yemeksepeti Clone!")
+
+
+# Bu işçinin veritabanı bağlantı havuzu sayaçları (açılan, yeniden kullanılan, bekleme süresi...)
+@staff_member_required
+def database_metrics(request):
+    return JsonResponse({'pid': os.getpid(), 'pools': pool_metrics()})
+
+
+# Ayrıştırılmış ve doğrulanmış sorgular işlem içinde saklanır; aynı doküman tekrar parse/validate edilmez
+@lru_cache(maxsize=settings.GRAPHQL_DOCUMENT_CACHE_SIZE)
+def get_document(schema, query):
+    try:
+        document = parse(query)
+    except Exception as e:
+        return None, [e]
+    return document, validate(schema, document)
+
+
+# Kalıcı sorgular (persisted queries): istemci dokümanı bir kez gönderir, sonra sadece sha256 hash'ini yollar
+def resolve_persisted_query(query, sha256_hash):
+    cache = get_cache()
+    key = f'gql:persisted:{sha256_hash}'
+    if query:
+        if hashlib.sha256(query.encode()).hexdigest() != sha256_hash:
+            raise HttpError(HttpResponseBadRequest("provided sha does not match query"))
+        cache.set(key, query, timeout=None)
+        return query
+    query = cache.get(key)
+    if query is None:
+        raise HttpError(HttpResponse(status=200), "PersistedQueryNotFound")
+    return query
+
+
+class CachedGraphQLView(GraphQLView):
+    def get_graphql_params(self, request, data):
+        query, variables, operation_name, id = super().get_graphql_params(request, data)
+        extensions = request.GET.get("extensions") or data.get("extensions")
+        if extensions and isinstance(extensions, str):
+            try:
+                extensions = json.loads(extensions)
+            except ValueError:
+                raise HttpError(HttpResponseBadRequest("Extensions are invalid JSON."))
+        persisted_query = (extensions or {}).get("persistedQuery")
+        if persisted_query:
+            query = resolve_persisted_query(query, persisted_query.get("sha256Hash"))
+        return query, variables, operation_name, id
+
+    # Sadece anonim kullanıcıların okuma (query) işlemleri bütün olarak önbelleğe alınır
+    def get_response_cache_key(self, request, query, variables, operation_name, show_graphiql):
+        if show_graphiql or self.batch or not query:
+            return None
+        if request.user.is_authenticated or get_http_authorization(request):
+            return None
+        document, errors = get_document(self.schema.graphql_schema, query)
+        if errors:
+            return None
+        operation_ast = get_operation_ast(document, operation_name)
+        if operation_ast is None or operation_ast.operation != OperationType.QUERY:
+            return None
+        # Herkese açık veriler restoran ve menülerdir; bunlara yapılan her yazma 'restaurants' sürümünü artırır
+        payload = json.dumps([query, variables, operation_name, get_version('restaurants')], sort_keys=True)
+        return f'gql:response:{hashlib.sha256(payload.encode()).hexdigest()}'
+
+    def get_response(self, request, data, show_graphiql=False):
+        query, variables, operation_name, id = self.get_graphql_params(request, data)
+
+        cache_key = self.get_response_cache_key(request, query, variables, operation_name, show_graphiql)
+        if cache_key:
+            cached = get_cache().get(cache_key)
+            if cached is not None:
+                result, request.graphql_etag = cached
+                return result, 200
+
+        execution_result = self.execute_graphql_request(
+            request, data, query, variables, operation_name, show_graphiql
+        )
+
+        if getattr(request, MUTATION_ERRORS_FLAG, False) is True:
+            set_rollback()
+
+        status_code = 200
+        if execution_result:
+            response = {}
+
+            if execution_result.errors:
+                set_rollback()
+                response["errors"] = [
+                    self.format_error(e) for e in execution_result.errors
+                ]
+
+            if execution_result.errors and any(
+                not getattr(e, "path", None) for e in execution_result.errors
+            ):
+                status_code = 400
+            else:
+                response["data"] = execution_result.data
+
+            if self.batch:
+                response["id"] = id
+                response["status"] = status_code
+
+            result = self.json_encode(request, response, pretty=show_graphiql)
+
+            if cache_key and not execution_result.errors:
+                request.graphql_etag = quote_etag(hashlib.sha256(result.encode()).hexdigest())
+                get_cache().set(cache_key, (result, request.graphql_etag), timeout=settings.GRAPHQL_RESPONSE_CACHE_TIMEOUT)
+        else:
+            result = None
+
+        return result, status_code
+
+    # GraphQLView.execute_graphql_request ile aynı akış; tek fark parse/validate sonucunun get_document önbelleğinden gelmesi
+    def execute_graphql_request(
+        self, request, data, query, variables, operation_name, show_graphiql=False
+    ):
+        if not query:
+            if show_graphiql:
+                return None
+            raise HttpError(HttpResponseBadRequest("Must provide query string."))
+
+        schema = self.schema.graphql_schema
+
+        schema_validation_errors = validate_schema(schema)
+        if schema_validation_errors:
+            return ExecutionResult(data=None, errors=schema_validation_errors)
+
+        document, errors = get_document(schema, query)
+        if errors:
+            return ExecutionResult(data=None, errors=errors)
+
+        operation_ast = get_operation_ast(document, operation_name)
+
+        if (
+            request.method.lower() == "get"
+            and operation_ast is not None
+            and operation_ast.operation != OperationType.QUERY
+        ):
+            if show_graphiql:
+                return None
+
+            raise HttpError(
+                HttpResponseNotAllowed(
+                    ["POST"],
+                    "Can only perform a {} operation from a POST request.".format(
+                        operation_ast.operation.value
+                    ),
+                )
+            )
+
+        try:
+            execute_options = {
+                "root_value": self.get_root_value(request),
+                "context_value": self.get_context(request),
+                "variable_values": variables,
+                "operation_name": operation_name,
+                "middleware": self.get_middleware(request),
+            }
+            if self.execution_context_class:
+                execute_options["execution_context_class"] = self.execution_context_class
+
+            if operation_ast is not None and operation_ast.operation == OperationType.QUERY:
+                with read_from_replica(choose_replica(request)):
+                    return execute(schema, document, **execute_options)
+
+            if (
+                operation_ast is not None
+                and operation_ast.operation == OperationType.MUTATION
+                and (
+                    graphene_settings.ATOMIC_MUTATIONS is True
+                    or connection.settings_dict.get("ATOMIC_MUTATIONS", False) is True
+                )
+            ):
+                with transaction.atomic():
+                    result = execute(schema, document, **execute_options)
+                    if getattr(request, MUTATION_ERRORS_FLAG, False) is True:
+                        transaction.set_rollback(True)
+            else:
+                result = execute(schema, document, **execute_options)
+
+            if operation_ast is not None and operation_ast.operation == OperationType.MUTATION:
+                stick_to_primary(request.user)
+            return result
+        except Exception as e:
+            return ExecutionResult(errors=[e])
+
+    def dispatch(self, request, *args, **kwargs):
+        response = super().dispatch(request, *args, **kwargs)
+        return self.apply_etag(request, response)
+
+    def apply_etag(self, request, response):
+        etag = getattr(request, 'graphql_etag', None)
+        if etag and response.status_code == 200:
+            if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+                response = HttpResponseNotModified()
+            response['ETag'] = etag
+            patch_vary_headers(response, ('Authorization',))
+        return response
+
+
+class AsyncGraphQLView(CachedGraphQLView):
+    """
+    ASGI altında okuma (query) işlemlerini olay döngüsünde çalıştırır: resolver'lar ORM'e async
+    erişir (afirst, async for), yavaş istemciler iş parçacığı tutmaz. Mutasyonlar, toplu (batch)
+    istekler ve GraphiQL senkron akışla bir iş parçacığında çalışır.
+    """
+
+    view_is_async = True
+
+    async def dispatch(self, request, *args, **kwargs):
+        prepared = await sync_to_async(self.prepare_query)(request)
+        if prepared is None:
+            return await sync_to_async(super().dispatch)(request, *args, **kwargs)
+
+        document, variables, operation_name, cache_key, cached, replica = prepared
+        if cached is not None:
+            result, request.graphql_etag = cached
+            status_code = 200
+        else:
+            with read_from_replica(replica):
+                result, status_code = await self.execute_async(request, document, variables, operation_name, cache_key)
+        response = HttpResponse(status=status_code, content=result, content_type="application/json")
+        return self.apply_etag(request, response)
+
+    # Senkron hazırlık (iş parçacığında): gövde, kalıcı sorgu, doğrulama, kullanıcı/yetki, yanıt önbelleği ve replika seçimi.
+    # Async yola uygun olmayan istekler için None döner.
+    def prepare_query(self, request):
+        if request.method.lower() not in ("get", "post") or self.batch:
+            return None
+        try:
+            data = self.parse_body(request)
+            if self.graphiql and self.can_display_graphiql(request, data):
+                return None
+            query, variables, operation_name, id = self.get_graphql_params(request, data)
+        except HttpError:
+            return None
+        if not query:
+            return None
+        document, errors = get_document(self.schema.graphql_schema, query)
+        if errors:
+            return None
+        operation_ast = get_operation_ast(document, operation_name)
+        if operation_ast is None or operation_ast.operation != OperationType.QUERY:
+            return None
+
+        # Kullanıcı ve rolleri burada çözülür; resolver'lar olay döngüsünde veritabanına gitmez
+        get_permissions(request)
+        cache_key = self.get_response_cache_key(request, query, variables, operation_name, False)
+        cached = get_cache().get(cache_key) if cache_key else None
+        return document, variables, operation_name, cache_key, cached, choose_replica(request)
+
+    async def execute_async(self, request, document, variables, operation_name, cache_key):
+        request.graphql_async = True
+        execution_result = execute(
+            self.schema.graphql_schema,
+            document,
+            root_value=self.get_root_value(request),
+            context_value=self.get_context(request),
+            variable_values=variables,
+            operation_name=operation_name,
+            middleware=self.get_middleware(request),
+        )
+        if isawaitable(execution_result):
+            execution_result = await execution_result
+
+        response = {}
+        status_code = 200
+        if execution_result.errors:
+            response["errors"] = [self.format_error(e) for e in execution_result.errors]
+        if execution_result.errors and any(not getattr(e, "path", None) for e in execution_result.errors):
+            status_code = 400
+        else:
+            response["data"] = execution_result.data
+        result = self.json_encode(request, response)
+
+        if cache_key and not execution_result.errors:
+            request.graphql_etag = quote_etag(hashlib.sha256(result.encode()).hexdigest())
+            await get_cache().aset(cache_key, (result, request.graphql_etag), timeout=settings.GRAPHQL_RESPONSE_CACHE_TIMEOUT)
+        return result, status_code